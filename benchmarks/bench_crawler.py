@@ -0,0 +1,192 @@
+"""
+Benchmark SublinkCrawler against a local synthetic site (no network needed)
+
+Usage:
+    python benchmarks/bench_crawler.py [--pages N] [--fanout N]
+        [--page-size BYTES] [--latency SECONDS] [--jitter SECONDS]
+        [--traps calendar,session] [--workers 1,8,32] [--delay-workers 8]
+        [--backend asyncio] [--parse-workers N] [--max-depth N] [--max-pages N]
+
+The site is served from this process; each crawl runs in a fresh process so
+its CPU time and peak memory are its own. For every worker count the table
+shows pages/sec, CPU time, peak RSS and whether the found links match the
+site's expected link set (trap URLs are counted separately).
+
+The --workers runs use request_delay=0; the --delay-workers runs keep the
+crawler's default request_delay, so they show how far the per-host rate
+ramps up on a healthy host.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic_site import TRAPS, SiteConfig, serve_site
+from src.tools.crawler.backends import CRAWLER_BACKENDS, DEFAULT_BACKEND
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cpu_seconds():
+    """CPU time of this process plus its finished children (the parse pool)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def crawl_once(backend, start_url, options, results):
+    """Crawl in a child process and report timings, memory and the links found"""
+    from src.tools.crawler.backends import create_crawler
+
+    crawler = create_crawler(backend)
+    cpu_started = cpu_seconds()
+    started = time.perf_counter()
+    links = crawler.crawl(start_url, **options)
+    elapsed = time.perf_counter() - started
+    results.put(
+        {
+            "links": links,
+            "seconds": elapsed,
+            "cpu": cpu_seconds() - cpu_started,
+            "peak_rss": peak_rss_bytes(),
+            "pages": crawler.get_metrics()["pages"],
+        }
+    )
+
+
+def run_crawl(backend, start_url, options):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=crawl_once, args=(backend, start_url, options, results)
+    )
+    process.start()
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"Crawl failed (exit code {process.exitcode})")
+    process.join()
+    return result
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000, help="Pages in the site")
+    parser.add_argument("--fanout", type=int, default=10, help="Site links per page")
+    parser.add_argument("--page-size", type=int, default=20000, help="Bytes per page")
+    parser.add_argument("--latency", type=float, default=0.02, help="Server delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random delay (s)")
+    parser.add_argument("--traps", default="", help=f"Link traps: {', '.join(TRAPS)}")
+    parser.add_argument("--seed", type=int, default=0, help="Site layout seed")
+    parser.add_argument("--workers", default="1,8,32", help="Worker counts to compare")
+    parser.add_argument(
+        "--delay-workers",
+        default="8",
+        help="Worker counts to run with the default request_delay",
+    )
+    parser.add_argument(
+        "--backend", default=DEFAULT_BACKEND, choices=sorted(CRAWLER_BACKENDS)
+    )
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parser processes")
+    parser.add_argument("--max-depth", type=int, default=10, help="Crawl depth")
+    parser.add_argument(
+        "--max-pages", type=int, default=None, help="Page budget (default: --pages)"
+    )
+    args = parser.parse_args()
+
+    traps = parse_list(args.traps)
+    unknown = set(traps) - set(TRAPS)
+    if unknown:
+        parser.error(f"unknown traps: {', '.join(sorted(unknown))}")
+
+    site = SiteConfig(
+        pages=args.pages,
+        fanout=args.fanout,
+        page_size=args.page_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        traps=traps,
+        seed=args.seed,
+    )
+    server, base_url = serve_site(site)
+    expected = site.expected_links(base_url, args.max_depth)
+    options = {
+        "url_prefix": base_url,
+        "max_depth": args.max_depth,
+        "max_pages": args.max_pages or args.pages,
+        "parse_workers": args.parse_workers,
+    }
+    # (workers, request_delay); None keeps the crawler's default delay
+    runs = [(workers, 0) for workers in parse_list(args.workers, int)]
+    runs += [(workers, None) for workers in parse_list(args.delay_workers, int)]
+
+    print(
+        f"Site: {args.pages} pages, fan-out {args.fanout}, {args.page_size} bytes, "
+        f"{args.latency * 1000:.0f} ms latency, traps: {', '.join(traps) or 'none'}"
+    )
+    print(f"Backend: {args.backend}, expected links: {len(expected)}")
+    print(
+        f"{'workers':>7} {'delay':>7} {'pages':>6} {'seconds':>8} {'pages/s':>8} "
+        f"{'CPU s':>7} {'CPU ms/pg':>9} {'peak MiB':>9} {'missing':>8} "
+        f"{'traps':>6} {'other':>6}"
+    )
+
+    failures = 0
+    try:
+        for workers, delay in runs:
+            run_options = dict(options, workers=workers)
+            if delay is not None:
+                run_options["request_delay"] = delay
+            result = run_crawl(args.backend, f"{base_url}/p/0", run_options)
+            found = set(result["links"])
+            missing = len(expected - found)
+            extra = found - expected
+            trap_links = {
+                link for link in extra if "/calendar/" in link or "?sid=" in link
+            }
+            other = len(extra) - len(trap_links)
+            peak = result["peak_rss"]
+            pages = max(1, result["pages"])
+            print(
+                f"{workers:>7} {'default' if delay is None else delay:>7} "
+                f"{result['pages']:>6} {result['seconds']:>8.2f} "
+                f"{result['pages'] / result['seconds']:>8.1f} {result['cpu']:>7.2f} "
+                f"{result['cpu'] / pages * 1000:>9.2f} "
+                f"{peak / 1024 / 1024 if peak else float('nan'):>9.1f} "
+                f"{missing:>8} {len(trap_links):>6} {other:>6}"
+            )
+            # Without traps the page budget covers the site: nothing may be missing
+            if other or (missing and not traps):
+                failures += 1
+    finally:
+        server.shutdown()
+
+    print("Link sets: " + ("correct" if not failures else f"{failures} runs incorrect"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark the crawler's link extractors on a corpus of saved HTML pages
+
+Usage:
+    python benchmarks/bench_link_extractors.py [CORPUS_DIR] [--repeat N]
+
+CORPUS_DIR holds saved pages (*.html / *.htm, searched recursively). Without
+it a synthetic corpus is generated. For every page all extractors must
+return the same set of hrefs; the timings are reported relative to the full
+BeautifulSoup parse.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools.crawler.link_extractors import LINK_EXTRACTORS
+
+
+def load_corpus(corpus_dir):
+    """Read every saved HTML page under corpus_dir as bytes"""
+    pages = []
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if name.lower().endswith((".html", ".htm")):
+                with open(os.path.join(root, name), "rb") as f:
+                    pages.append((name, f.read()))
+    return pages
+
+
+def synthetic_corpus(count=200, seed=0):
+    """Generate documentation-like pages with navigation, text and links"""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        parts = ["<!DOCTYPE html><html><head><title>Page %d</title></head><body>" % i]
+        parts.append("<nav>")
+        parts.extend(
+            '<a href="/docs/section-%d/">Section %d</a>' % (n, n) for n in range(40)
+        )
+        parts.append("</nav><main>")
+        for p in range(rng.randint(20, 60)):
+            parts.append(
+                '<p class="text">Paragraph %d with <b>markup</b> and a '
+                '<a href="page-%d.html#part-%d">link</a>.</p>'
+                % (p, rng.randint(0, 5000), p)
+            )
+            parts.append("<div><span>%s</span></div>" % ("lorem ipsum " * 20))
+        parts.append('<a href="https://example.com/external?q=%d&amp;x=1">ext</a>' % i)
+        parts.append("</main></body></html>")
+        pages.append(("synthetic-%d.html" % i, "".join(parts).encode("utf-8")))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus_dir", nargs="?", help="Directory of saved HTML pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir) if args.corpus_dir else synthetic_corpus()
+    if not pages:
+        print("No HTML pages found")
+        return 1
+    total_bytes = sum(len(content) for _, content in pages)
+    print(f"Corpus: {len(pages)} pages, {total_bytes / 1024 / 1024:.1f} MiB")
+
+    # Correctness: every extractor must agree with the full parse on every page
+    mismatches = 0
+    for name, content in pages:
+        expected = set(LINK_EXTRACTORS["soup"](content))
+        for extractor_name, extract in LINK_EXTRACTORS.items():
+            found = set(extract(content))
+            if found != expected:
+                mismatches += 1
+                print(
+                    f"MISMATCH {extractor_name} on {name}: "
+                    f"{len(found - expected)} extra, {len(expected - found)} missing"
+                )
+
+    # Timing: best of N passes over the whole corpus
+    timings = {}
+    for extractor_name, extract in LINK_EXTRACTORS.items():
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for _, content in pages:
+                extract(content)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[extractor_name] = best
+
+    baseline = timings["soup"]
+    print(f"{'extractor':<10} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+    for extractor_name, elapsed in timings.items():
+        print(
+            f"{extractor_name:<10} {elapsed:>9.3f} {len(pages) / elapsed:>9.0f} "
+            f"{baseline / elapsed:>7.1f}x"
+        )
+
+    print("Link sets: " + ("identical" if not mismatches else f"{mismatches} mismatches"))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark the crawler's link graph against a dict of sets of URLs
+
+Usage:
+    python benchmarks/bench_link_graph.py [--pages N] [--fanout N]
+        [--iterations N]
+
+Records the links of N synthetic pages (default 100,000), each linking to
+--fanout (default 20) pages chosen at random, in a LinkGraph and in a dict
+mapping each URL to the set of URLs it links to. Memory is the traced
+allocation of each structure, URL strings excluded (both share them).
+PageRank runs a fixed number of iterations on both (a plain loop over the
+dict for the latter) and the ranks must agree.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools.crawler.link_graph import DEFAULT_DAMPING, LinkGraph
+
+
+def synthetic_pages(count, fanout, seed=0):
+    """(url, links) of count pages, each linking to fanout random pages"""
+    rng = random.Random(seed)
+    urls = [
+        f"https://docs.example.com/section-{i % 97}/page-{i}.html" for i in range(count)
+    ]
+    return urls, [[urls[rng.randrange(count)] for _ in range(fanout)] for _ in urls]
+
+
+def dict_pagerank(graph, iterations, damping=DEFAULT_DAMPING):
+    """PageRank over a dict of sets, one Python step per link"""
+    count = len(graph)
+    rank = dict.fromkeys(graph, 1.0 / count)
+    for _ in range(iterations):
+        dangling = sum(rank[url] for url, links in graph.items() if not links)
+        jump = (1.0 - damping + damping * dangling) / count
+        updated = dict.fromkeys(graph, jump)
+        for url, links in graph.items():
+            if links:
+                share = damping * rank[url] / len(links)
+                for link in links:
+                    updated[link] += share
+        rank = updated
+    return rank
+
+
+def traced(build):
+    """Result of build() and the memory it allocated"""
+    tracemalloc.start()
+    result = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, memory
+
+
+def build_graph(urls, rows):
+    graph = LinkGraph()
+    for url, links in zip(urls, rows):
+        graph.add_page(url, links)
+    graph.csr()
+    return graph
+
+
+def build_dict(urls, rows):
+    graph = {url: set() for url in urls}
+    for url, links in zip(urls, rows):
+        graph[url].update(link for link in links if link != url)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=100_000, help="Pages")
+    parser.add_argument("--fanout", type=int, default=20, help="Links per page")
+    parser.add_argument(
+        "--iterations", type=int, default=10, help="PageRank iterations"
+    )
+    args = parser.parse_args()
+
+    urls, rows = synthetic_pages(args.pages, args.fanout)
+    graph, graph_memory = traced(lambda: build_graph(urls, rows))
+    links, dict_memory = traced(lambda: build_dict(urls, rows))
+    del rows
+
+    start = time.perf_counter()
+    rank = graph.pagerank(tolerance=0, max_iterations=args.iterations)
+    graph_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = dict_pagerank(links, args.iterations)
+    dict_seconds = time.perf_counter() - start
+
+    error = max(
+        abs(rank[graph.node_id(url)] - value) for url, value in expected.items()
+    )
+
+    print(
+        f"{len(graph)} pages, {graph.edge_count} links, "
+        f"{args.iterations} PageRank iterations"
+    )
+    print(f"{'graph':<12} {'MiB':>8} {'bytes/link':>11} {'PageRank s':>11}")
+    for name, memory, seconds in (
+        ("LinkGraph", graph_memory, graph_seconds),
+        ("dict of sets", dict_memory, dict_seconds),
+    ):
+        print(
+            f"{name:<12} {memory / 1024 / 1024:>8.1f} "
+            f"{memory / graph.edge_count:>11.1f} {seconds:>11.2f}"
+        )
+    print(f"Largest rank difference: {error:.2e}")
+
+    # Both must compute the same ranks
+    return 1 if error > 1e-9 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
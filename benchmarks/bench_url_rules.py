@@ -0,0 +1,140 @@
+"""
+Benchmark the crawler's include/exclude URL rules against a rule-by-rule loop
+
+Usage:
+    python benchmarks/bench_url_rules.py [--rules 10,100,1000,5000]
+        [--urls N] [--sample N]
+
+For each rule count, builds that many include prefixes across a few dozen
+hosts plus a glob and a regex exclude for every 50 prefixes, compiles them
+with UrlRules and checks N synthetic URLs (default 1,000,000) about half of
+which are included. The naive loop (str.startswith, fnmatch and re.search
+per rule) is timed on the first --sample URLs only, and both must agree on
+every sampled URL.
+"""
+
+import argparse
+import fnmatch
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools.crawler.url_rules import UrlRules
+
+HOSTS = 40
+
+
+def synthetic_rules(count):
+    """(include, exclude) rules: count prefixes, a glob and regex per 50"""
+    include = [
+        f"https://site-{i % HOSTS}.example.com/section-{i}/" for i in range(count)
+    ]
+    exclude = []
+    for i in range(0, count, 50):
+        exclude.append(f"glob:https://site-{i % HOSTS}.example.com/section-{i}/*/print")
+        exclude.append(f"re:/section-{i}/archive/\\d{{4}}/")
+    return include, exclude
+
+
+def synthetic_urls(count, sections):
+    """URLs under twice as many sections as there are include prefixes"""
+    for i in range(count):
+        section = i * 7919 % (2 * sections)
+        tail = ("archive/2019/", "print", "page.html")[i % 3]
+        yield (
+            f"https://site-{section % HOSTS}.example.com/section-{section}/"
+            f"topic-{i % 113}/{tail}"
+        )
+
+
+def naive_matcher(include, exclude):
+    """Check a URL against each rule in turn"""
+
+    def compile_side(rules):
+        checks = []
+        for rule in rules:
+            if rule.startswith("glob:"):
+                pattern = rule[5:]
+                checks.append(lambda url, p=pattern: fnmatch.fnmatchcase(url, p))
+            elif rule.startswith("re:"):
+                checks.append(re.compile(rule[3:]).search)
+            else:
+                checks.append(lambda url, p=rule: url.startswith(p))
+        return checks
+
+    includes = compile_side(include)
+    excludes = compile_side(exclude)
+
+    def matches(url):
+        return any(check(url) for check in includes) and not any(
+            check(url) for check in excludes
+        )
+
+    return matches
+
+
+def measure(count, urls, sample):
+    include, exclude = synthetic_rules(count)
+
+    start = time.perf_counter()
+    rules = UrlRules(include, exclude)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    passed = sum(1 for url in synthetic_urls(urls, count) if rules.matches(url))
+    compiled_seconds = time.perf_counter() - start
+
+    naive = naive_matcher(include, exclude)
+    sampled = list(synthetic_urls(min(sample, urls), count))
+    start = time.perf_counter()
+    expected = [naive(url) for url in sampled]
+    naive_seconds = time.perf_counter() - start
+    mismatches = sum(
+        1 for url, result in zip(sampled, expected) if rules.matches(url) != result
+    )
+
+    return {
+        "rules": len(include) + len(exclude),
+        "compile": compile_seconds,
+        "compiled_us": compiled_seconds / urls * 1e6,
+        "naive_us": naive_seconds / len(sampled) * 1e6,
+        "passed": passed,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", default="10,100,1000,5000", help="Prefix counts")
+    parser.add_argument("--urls", type=int, default=1_000_000, help="URLs checked")
+    parser.add_argument(
+        "--sample", type=int, default=10_000, help="URLs checked by the naive loop"
+    )
+    args = parser.parse_args()
+
+    print(f"{args.urls} URLs per rule set, naive loop on {args.sample}")
+    print(
+        f"{'rules':>6} {'compile ms':>11} {'us/URL':>8} {'URLs/s':>10} "
+        f"{'naive us/URL':>13} {'speed-up':>9} {'passed':>8} {'mismatch':>9}"
+    )
+    failures = 0
+    for count in (int(value) for value in args.rules.split(",")):
+        result = measure(count, args.urls, args.sample)
+        print(
+            f"{result['rules']:>6} {result['compile'] * 1000:>11.1f} "
+            f"{result['compiled_us']:>8.2f} {1e6 / result['compiled_us']:>10.0f} "
+            f"{result['naive_us']:>13.2f} "
+            f"{result['naive_us'] / result['compiled_us']:>8.1f}x "
+            f"{result['passed']:>8} {result['mismatches']:>9}"
+        )
+        failures += result["mismatches"]
+
+    # The compiled rules must decide every sampled URL like the naive loop
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
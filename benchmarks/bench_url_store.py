@@ -0,0 +1,107 @@
+"""
+Benchmark the crawler's URL stores: memory and speed at crawl scale
+
+Usage:
+    python benchmarks/bench_url_store.py [--urls N]
+
+Adds N synthetic URLs (default 1,000,000) to each store, then checks every
+one of them plus N unseen URLs. Memory is the traced allocation of the
+store itself (URL strings of the exact set included, since the set is what
+keeps them alive); the Bloom filter's false positive rate is measured on the
+unseen URLs.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tools.crawler.url_store import (
+    BloomFilter,
+    CompactUrlSet,
+    FingerprintSet,
+)
+
+
+def synthetic_urls(count, offset=0):
+    """Yield documentation-like URLs, fresh string objects on every call"""
+    for i in range(offset, offset + count):
+        yield (
+            f"https://docs.example.com/reference/section-{i % 97}/"
+            f"topic-{i // 97}/page-{i}.html?lang=en"
+        )
+
+
+def fill(factory, count):
+    """Create a store and add count synthetic URLs to it"""
+    store = factory()
+    for url in synthetic_urls(count):
+        store.add(url)
+    return store
+
+
+def measure(name, factory, count):
+    """Fill a store with count URLs and time lookups of seen and unseen URLs"""
+    # Memory: traced allocations of a filled store (tracing slows the adds,
+    # so the timings come from a second, untraced fill)
+    tracemalloc.start()
+    store = fill(factory, count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+
+    start = time.perf_counter()
+    store = fill(factory, count)
+    add_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    missing = sum(1 for url in synthetic_urls(count) if url not in store)
+    false_positives = sum(1 for url in synthetic_urls(count, count) if url in store)
+    lookup_seconds = time.perf_counter() - start
+
+    return {
+        "name": name,
+        "memory": memory,
+        "add": add_seconds,
+        "lookup": lookup_seconds,
+        "missing": missing,
+        "false_positives": false_positives,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=1_000_000, help="URLs per store")
+    args = parser.parse_args()
+    count = args.urls
+
+    stores = [
+        ("set", set),
+        ("fingerprint", FingerprintSet),
+        ("compact+urls", CompactUrlSet),
+        ("bloom", lambda: BloomFilter(count)),
+    ]
+    results = [measure(name, factory, count) for name, factory in stores]
+
+    print(f"{count} URLs, {2 * count} lookups per store")
+    print(
+        f"{'store':<13} {'MiB':>8} {'bytes/URL':>10} {'add s':>7} "
+        f"{'lookup s':>9} {'missing':>8} {'false +':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:<13} {result['memory'] / 1024 / 1024:>8.1f} "
+            f"{result['memory'] / count:>10.1f} {result['add']:>7.2f} "
+            f"{result['lookup']:>9.2f} {result['missing']:>8} "
+            f"{result['false_positives']:>8}"
+        )
+
+    # Every store must find every URL it was given
+    return 1 if any(result["missing"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
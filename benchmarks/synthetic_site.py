@@ -0,0 +1,165 @@
+"""
+Synthetic site - deterministic local website for crawler benchmarks
+
+Pages live at /p/<n>. Every page links to its children in a tree of the
+given fan-out (so the whole site is reachable in log(pages) levels) and to
+random pages for the rest of its fan-out. All links are derived from the
+page number and seed, so the set of links a crawl must find can be computed
+without crawling.
+
+Optional link traps:
+    calendar  /calendar/<n> always links to /calendar/<n + 1>
+    session   every page also links to session variants /p/<n>?sid=<page>,
+              which render the same page under a new URL
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+TRAP_CALENDAR = "calendar"
+TRAP_SESSION = "session"
+TRAPS = (TRAP_CALENDAR, TRAP_SESSION)
+
+# Every TRAP_EVERY-th page carries the trap links
+TRAP_EVERY = 10
+
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+class SiteConfig:
+    """Shape of the synthetic site"""
+
+    def __init__(
+        self,
+        pages=1000,
+        fanout=10,
+        page_size=10000,
+        latency=0.0,
+        jitter=0.0,
+        traps=(),
+        seed=0,
+    ):
+        self.pages = pages
+        self.fanout = fanout
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.traps = tuple(traps)
+        self.seed = seed
+
+    def links(self, index):
+        """Page numbers page ``index`` links to, in document order"""
+        first_child = index * self.fanout + 1
+        targets = list(range(first_child, min(first_child + self.fanout, self.pages)))
+        rng = random.Random(self.seed * 1_000_003 + index)
+        while len(targets) < self.fanout:
+            targets.append(rng.randrange(self.pages))
+        return targets
+
+    def trap_paths(self, index):
+        """Trap links on page ``index`` (paths, without the site root)"""
+        if index % TRAP_EVERY:
+            return []
+        paths = []
+        if TRAP_CALENDAR in self.traps:
+            paths.append(f"/calendar/{index}")
+        if TRAP_SESSION in self.traps:
+            paths.extend(f"/p/{target}?sid={index}" for target in self.links(index)[:3])
+        return paths
+
+    def expected_links(self, base_url, max_depth):
+        """
+        Site page URLs (traps excluded) a breadth-first crawl from /p/0 down
+        to max_depth reports, given enough page budget
+        """
+        depths = {0: 0}
+        frontier = [0]
+        found = set()
+        while frontier:
+            next_frontier = []
+            for index in frontier:
+                for target in self.links(index):
+                    found.add(target)
+                    if target not in depths:
+                        depths[target] = depths[index] + 1
+                        if depths[target] <= max_depth:
+                            next_frontier.append(target)
+            frontier = next_frontier
+        return {f"{base_url}/p/{index}" for index in found}
+
+    def render(self, path):
+        """Return the HTML for a path, or None if it is not part of the site"""
+        parts = urlsplit(path)
+        segments = parts.path.strip("/").split("/")
+        if len(segments) != 2 or not segments[1].isdigit():
+            return None
+        section, number = segments[0], int(segments[1])
+
+        if section == "calendar" and TRAP_CALENDAR in self.traps:
+            links = [f"/calendar/{number + 1}"]
+        elif section == "p" and number < self.pages:
+            links = [f"/p/{target}" for target in self.links(number)]
+            links.extend(self.trap_paths(number))
+        else:
+            return None
+
+        body = [f"<html><head><title>{path}</title></head><body><nav>"]
+        body.extend(f'<a href="{link}">{link}</a>' for link in links)
+        body.append("</nav><main>")
+        html = "".join(body)
+        filler = max(0, self.page_size - len(html) - 30)
+        html += "<p>" + (FILLER * (filler // len(FILLER) + 1))[:filler] + "</p>"
+        return (html + "</main></body></html>").encode("utf-8")
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Serves the pages of server.site (a SiteConfig)"""
+
+    # Keep-alive, so benchmarks see the crawler's connection reuse (without
+    # Nagle, headers and body written separately would stall on delayed ACKs)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        if site.latency or site.jitter:
+            time.sleep(site.latency + random.random() * site.jitter)
+
+        if self.path == "/robots.txt":
+            body = b"User-agent: *\nAllow: /\n"
+            content_type = "text/plain"
+        else:
+            body = site.render(self.path)
+            content_type = "text/html; charset=utf-8"
+            if body is None:
+                self.send_error(404)
+                return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_site(site, port=0):
+    """
+    Serve a site on 127.0.0.1 from a background thread
+
+    Returns:
+        (server, base URL); call server.shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), SiteHandler)
+    server.daemon_threads = True
+    server.site = site
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
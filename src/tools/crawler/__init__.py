@@ -1,4 +1,59 @@
 from .tool import CrawlerTool
 from .sublink_crawler import SublinkCrawler
+from .async_crawler import AsyncSublinkCrawler
+from .frontier import CrawlFrontier
+from .checkpoint import CrawlCheckpoint
+from .http_cache import HttpCache
+from .link_extractors import LINK_EXTRACTORS, get_link_extractor
+from .rate_limiter import HostScheduler
+from .sitemaps import SitemapReader
+from .parse_pool import ParsePool
+from .coordinator import CrawlCoordinator, SharedFrontier
+from .metrics import CrawlMetrics
+from .http_pool import CrawlerHTTPAdapter, DnsCache
+from .link_sinks import LINK_SINKS, open_link_sink
+from .near_duplicates import NearDuplicateIndex
+from .trap_detector import TrapDetector
+from .url_rules import UrlRules
+from .page_archive import ArchiveReader, PageArchive
+from .replay import ReplayCrawler
+from .link_graph import LinkGraph, load_link_graph
+from .url_store import BloomFilter, CompactUrlSet, FingerprintSet, URL_STORES
+from .backends import CRAWLER_BACKENDS, create_crawler
+from .distributed import run_local_workers
 
-__all__ = ['CrawlerTool', 'SublinkCrawler']
\ No newline at end of file
+__all__ = [
+    'CrawlerTool',
+    'SublinkCrawler',
+    'AsyncSublinkCrawler',
+    'CrawlFrontier',
+    'CrawlCheckpoint',
+    'HttpCache',
+    'LINK_EXTRACTORS',
+    'get_link_extractor',
+    'HostScheduler',
+    'SitemapReader',
+    'ParsePool',
+    'CrawlCoordinator',
+    'SharedFrontier',
+    'CrawlMetrics',
+    'CrawlerHTTPAdapter',
+    'DnsCache',
+    'LINK_SINKS',
+    'open_link_sink',
+    'NearDuplicateIndex',
+    'TrapDetector',
+    'UrlRules',
+    'PageArchive',
+    'ArchiveReader',
+    'ReplayCrawler',
+    'LinkGraph',
+    'load_link_graph',
+    'FingerprintSet',
+    'CompactUrlSet',
+    'BloomFilter',
+    'URL_STORES',
+    'CRAWLER_BACKENDS',
+    'create_crawler',
+    'run_local_workers',
+]
\ No newline at end of file
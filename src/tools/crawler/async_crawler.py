@@ -0,0 +1,219 @@
+"""
+Async Sublink Crawler - asyncio/aiohttp fetch backend for very wide crawls
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+from .sublink_crawler import (
+    SublinkCrawler,
+    PageResult,
+    BODY_CHUNK_SIZE,
+    CONNECT_TIMEOUT,
+    SKIP_NON_HTML,
+    SKIP_TOO_LARGE,
+    is_html_content_type,
+)
+from .http_pool import CONNECT_BACKOFF_FACTOR
+
+# Longest wait for in-flight requests to cancel when a crawl ends
+SHUTDOWN_TIMEOUT = 10
+
+
+class _AsyncFetcher:
+    """Event loop thread plus the aiohttp session used by one crawl"""
+
+    def __init__(self, loop, thread, client):
+        self.loop = loop
+        self.thread = thread
+        self.client = client
+
+
+class AsyncSublinkCrawler(SublinkCrawler):
+    """
+    SublinkCrawler whose pages are fetched by aiohttp on a single event loop
+    thread, so thousands of requests can be in flight without a thread each.
+    Blocking page work (link extraction, HTTP cache and archive writes) runs
+    on the loop's executor threads, so the loop itself only does I/O.
+
+    Traversal, filtering, callbacks and pause/stop are inherited unchanged,
+    which keeps results identical to the threaded crawler.
+    """
+
+    # Requests in flight on the event loop when crawl() is not given workers
+    default_workers = 100
+
+    async def _get_links_from_page_async(self, client, url):
+        """Fetch a single page and extract its links"""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            cached, headers = None, {}
+            if self.http_cache is not None:
+                cached, headers = await loop.run_in_executor(
+                    None, self._cache_lookup, url
+                )
+            async with await self._request_async(client, url, headers) as response:
+                result = PageResult(
+                    status=response.status, elapsed=time.monotonic() - started
+                )
+
+                # Unchanged since the last crawl: reuse the cached links
+                if cached and response.status == 304:
+                    self.http_cache.record_hit()
+                    result.links = cached.links
+                    return result
+
+                response.raise_for_status()
+
+                # Drop PDFs, archives, media etc. without downloading them
+                content_type = response.headers.get("Content-Type", "")
+                if not is_html_content_type(content_type):
+                    self._record_skip(
+                        SKIP_NON_HTML, f"Skipped non-HTML page ({content_type}): {url}"
+                    )
+                    return result
+
+                content = await self._read_body_async(response, url)
+                if content is None:
+                    return result
+
+            return await loop.run_in_executor(
+                None, self._finish_page, result, url, content, response.headers
+            )
+
+        except aiohttp.ClientResponseError as e:
+            self._log_error(f"Error fetching {url}: {str(e)}")
+            return self._failed_page(started, e.status, e.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._log_error(f"Error fetching {url}: {str(e) or type(e).__name__}")
+            return self._failed_page(started)
+        except Exception as e:
+            self._log_error(f"Error parsing {url}: {str(e)}")
+            return self._failed_page(started)
+
+    async def _request_async(self, client, url, headers):
+        """
+        Send a GET, retrying failed connection attempts with exponential backoff
+
+        Returns:
+            The response, to be used with ``async with``
+        """
+        attempt = 0
+        while True:
+            try:
+                return await client.get(url, headers=headers)
+            except aiohttp.ClientConnectorError:
+                self.pool_stats.add("connect_errors")
+                if attempt >= self.connect_retries:
+                    raise
+                await asyncio.sleep(CONNECT_BACKOFF_FACTOR * 2**attempt)
+                attempt += 1
+
+    async def _read_body_async(self, response, url):
+        """
+        Read a response body, giving up once it exceeds max_body_bytes
+
+        Returns:
+            The body as bytes, or None if the page was too large
+        """
+        if (
+            response.content_length is not None
+            and response.content_length > self.max_body_bytes
+        ):
+            self._record_skip(
+                SKIP_TOO_LARGE,
+                f"Skipped oversized page ({response.content_length} bytes): {url}",
+            )
+            return None
+
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(BODY_CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                self._record_skip(
+                    SKIP_TOO_LARGE,
+                    f"Skipped oversized page (over {self.max_body_bytes} bytes): {url}",
+                )
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _create_client(self, workers):
+        """Create the aiohttp session (must run on the event loop)"""
+        connector = aiohttp.TCPConnector(
+            limit=workers,
+            limit_per_host=self.pool_size or 0,
+            ttl_dns_cache=self.dns_cache.ttl,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=dict(self.session.headers),
+            trace_configs=[self._pool_trace_config()],
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=CONNECT_TIMEOUT, sock_read=self.read_timeout
+            ),
+        )
+
+    def _pool_trace_config(self):
+        """aiohttp tracing that feeds the crawl's PoolStats"""
+        stats = self.pool_stats
+
+        def counter(name):
+            async def count(session, context, params):
+                stats.add(name)
+
+            return count
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(counter("requests"))
+        trace_config.on_connection_create_end.append(counter("connections"))
+        trace_config.on_connection_reuseconn.append(counter("reused"))
+        trace_config.on_dns_cache_hit.append(counter("dns_hits"))
+        trace_config.on_dns_cache_miss.append(counter("dns_misses"))
+        return trace_config
+
+    async def _shutdown_client(self, client):
+        """Cancel outstanding fetches and close the aiohttp session"""
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await client.close()
+        await asyncio.get_running_loop().shutdown_default_executor()
+
+    def _open_fetcher(self, workers):
+        """Start an event loop thread with an aiohttp session on it"""
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(thread_name_prefix="crawler-page-work")
+        )
+        thread = threading.Thread(
+            target=loop.run_forever, name="crawler-event-loop", daemon=True
+        )
+        thread.start()
+        client = asyncio.run_coroutine_threadsafe(
+            self._create_client(workers), loop
+        ).result()
+        return _AsyncFetcher(loop, thread, client)
+
+    def _submit_fetch(self, fetcher, url):
+        """Schedule a page fetch on the event loop"""
+        return asyncio.run_coroutine_threadsafe(
+            self._get_links_from_page_async(fetcher.client, url), fetcher.loop
+        )
+
+    def _close_fetcher(self, fetcher):
+        """Close the aiohttp session and stop the event loop thread"""
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._shutdown_client(fetcher.client), fetcher.loop
+            ).result(timeout=SHUTDOWN_TIMEOUT)
+        finally:
+            fetcher.loop.call_soon_threadsafe(fetcher.loop.stop)
+            fetcher.thread.join()
+            fetcher.loop.close()
@@ -0,0 +1,22 @@
+"""
+Registry of crawl backends selectable from the crawler GUI
+"""
+
+from .sublink_crawler import SublinkCrawler
+from .async_crawler import AsyncSublinkCrawler
+
+DEFAULT_BACKEND = "threaded"
+
+CRAWLER_BACKENDS = {
+    "threaded": SublinkCrawler,
+    "asyncio": AsyncSublinkCrawler,
+}
+
+
+def create_crawler(backend=DEFAULT_BACKEND):
+    """Instantiate the crawler class registered under ``backend``"""
+    try:
+        crawler_class = CRAWLER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown crawl backend: {backend}")
+    return crawler_class()
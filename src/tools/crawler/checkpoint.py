@@ -0,0 +1,106 @@
+"""
+Crawl checkpoint - SQLite-backed crawl state for resuming interrupted crawls
+"""
+
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS found (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS frontier (
+    seq INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS frontier_url ON frontier (url);
+"""
+
+
+class CrawlCheckpoint:
+    """
+    Persistent crawl state: crawl parameters, visited pages, found links and
+    the pending frontier.
+
+    Each save only writes what changed since the previous one: visited pages
+    and found links are appended, a URL is added to the frontier table when
+    it is queued and removed when its page completes. Pages in flight or
+    waiting on their host therefore stay in the saved frontier until they
+    are done. Every save is a single transaction, so a crash leaves the last
+    complete checkpoint intact.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def start(self, params):
+        """Discard any previous state and record the parameters of a new crawl"""
+        with self.conn:
+            for table in ("params", "visited", "found", "frontier"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(
+                "INSERT INTO params (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in params.items()],
+            )
+
+    def save(self, new_visited, new_found, queued=(), completed=()):
+        """
+        Write a checkpoint
+
+        Args:
+            new_visited: URLs whose pages completed since the last save
+            new_found: Links found since the last save
+            queued: (url, depth) entries queued since the last save; a URL
+                already saved keeps its place at the lower of the depths
+            completed: URLs that left the frontier since the last save
+                (crawled or skipped)
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO visited (url) VALUES (?)",
+                ((url,) for url in new_visited),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO found (url) VALUES (?)",
+                ((url,) for url in new_found),
+            )
+            self.conn.executemany(
+                "INSERT INTO frontier (url, depth) VALUES (?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET depth = MIN(depth, excluded.depth)",
+                queued,
+            )
+            self.conn.executemany(
+                "DELETE FROM frontier WHERE url = ?", ((url,) for url in completed)
+            )
+
+    def load(self):
+        """
+        Read the saved crawl state
+
+        Returns:
+            Dictionary with params, visited, found and pending entries, or
+            None if the checkpoint holds no crawl
+        """
+        params = {
+            key: json.loads(value)
+            for key, value in self.conn.execute("SELECT key, value FROM params")
+        }
+        if not params:
+            return None
+
+        return {
+            "params": params,
+            "visited": {row[0] for row in self.conn.execute("SELECT url FROM visited")},
+            "found": {row[0] for row in self.conn.execute("SELECT url FROM found")},
+            "pending": list(
+                self.conn.execute("SELECT url, depth FROM frontier ORDER BY seq")
+            ),
+        }
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
@@ -0,0 +1,370 @@
+"""
+Crawl coordinator - SQLite work queue shared by distributed crawl workers
+"""
+
+import json
+import sqlite3
+from collections import deque
+from hashlib import blake2b
+from urllib.parse import urlsplit
+
+# URL states in the shared queue
+PENDING = 0
+CLAIMED = 1
+DONE = 2
+
+# URLs claimed from (and links written to) the coordinator at a time
+DEFAULT_BATCH_SIZE = 50
+
+# Seconds a worker waits for another worker's write lock
+BUSY_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    partition INTEGER NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_claim ON urls (partition, state);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state);
+CREATE TABLE IF NOT EXISTS found (url TEXT PRIMARY KEY);
+"""
+
+
+def host_partition(url, num_partitions):
+    """Stable partition of a URL's host; all URLs of a host share a partition"""
+    host = urlsplit(url).netloc.encode("utf-8", "surrogatepass")
+    digest = blake2b(host, digest_size=8).digest()
+    return int.from_bytes(digest, "little") % num_partitions
+
+
+class CrawlCoordinator:
+    """
+    Shared frontier, page budget and found links of a distributed crawl,
+    kept in one SQLite file that every worker process opens.
+
+    URLs are partitioned by host and each worker only claims URLs of its
+    own partition, so a host is only ever crawled by one worker and that
+    worker's politeness rules (rate limits, robots.txt) stay in force.
+    Discovered links of any partition are written back to the shared queue,
+    where INSERT OR IGNORE deduplicates them across workers. Workers on
+    other machines can share the file over a network filesystem that
+    supports SQLite locking.
+    """
+
+    def __init__(self, path, timeout=BUSY_TIMEOUT):
+        self.path = path
+        # Autocommit mode: transactions are opened explicitly with
+        # BEGIN IMMEDIATE so concurrent claims cannot interleave
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _begin(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _run(self, work):
+        """Run work() in a write transaction"""
+        self._begin()
+        try:
+            result = work()
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return result
+
+    def _counter(self, name):
+        row = self.conn.execute(
+            "SELECT value FROM counters WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _add_to_counter(self, name, delta):
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, delta),
+        )
+
+    def start(self, params):
+        """
+        Record the crawl parameters unless a crawl is already set up
+
+        Every worker calls this; the first one creates the crawl.
+
+        Returns:
+            The crawl parameters stored in the coordinator
+        """
+
+        def work():
+            stored = self.params()
+            if stored:
+                return stored
+            self.conn.executemany(
+                "INSERT INTO params (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in params.items()],
+            )
+            return params
+
+        return self._run(work)
+
+    def params(self):
+        """Return the stored crawl parameters (empty if no crawl was started)"""
+        return {
+            key: json.loads(value)
+            for key, value in self.conn.execute("SELECT key, value FROM params")
+        }
+
+    def sync(self, new_urls, done_urls, found_links):
+        """
+        Write a worker's progress in one transaction
+
+        Args:
+            new_urls: (url, depth, partition) entries discovered by the worker
+            done_urls: Claimed URLs the worker finished (their links are in
+                new_urls, so no other worker can finish the crawl early)
+            found_links: Links found on the finished pages
+        """
+
+        def work():
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, depth, partition) VALUES (?, ?, ?)",
+                new_urls,
+            )
+            self.conn.executemany(
+                f"UPDATE urls SET state = {DONE} WHERE url = ?",
+                ((url,) for url in done_urls),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO found (url) VALUES (?)",
+                ((url,) for url in found_links),
+            )
+
+        self._run(work)
+
+    def claim(self, partition, limit, max_pages):
+        """
+        Claim up to limit pending URLs of a partition, within the crawl's
+        global page budget
+
+        Returns:
+            List of (url, depth) in discovery order
+        """
+
+        def work():
+            # The "claimed" counter includes finished URLs: it is the number
+            # of pages of the global max_pages budget handed out so far
+            budget = max_pages - self._counter("claimed")
+            if budget <= 0:
+                return []
+            rows = self.conn.execute(
+                f"SELECT url, depth FROM urls WHERE partition = ? AND state = {PENDING} "
+                "ORDER BY rowid LIMIT ?",
+                (partition, min(limit, budget)),
+            ).fetchall()
+            self.conn.executemany(
+                f"UPDATE urls SET state = {CLAIMED} WHERE url = ?",
+                ((url,) for url, _ in rows),
+            )
+            self._add_to_counter("claimed", len(rows))
+            return rows
+
+        return self._run(work)
+
+    def release(self, urls):
+        """Return claimed but unfinished URLs to the queue (e.g. a stopped worker)"""
+
+        def work():
+            released = 0
+            for url in urls:
+                released += self.conn.execute(
+                    f"UPDATE urls SET state = {PENDING} "
+                    f"WHERE url = ? AND state = {CLAIMED}",
+                    (url,),
+                ).rowcount
+            self._add_to_counter("claimed", -released)
+
+        self._run(work)
+
+    def release_partition(self, partition):
+        """Return every claimed URL of a partition to the queue (worker restart)"""
+
+        def work():
+            released = self.conn.execute(
+                f"UPDATE urls SET state = {PENDING} "
+                f"WHERE partition = ? AND state = {CLAIMED}",
+                (partition,),
+            ).rowcount
+            self._add_to_counter("claimed", -released)
+
+        self._run(work)
+
+    def active(self, max_pages):
+        """
+        True while some worker may still produce or claim work: a URL is
+        claimed, or one is pending and the page budget is not used up
+        """
+        if self.conn.execute(
+            f"SELECT 1 FROM urls WHERE state = {CLAIMED} LIMIT 1"
+        ).fetchone():
+            return True
+        if self._counter("claimed") >= max_pages:
+            return False
+        return bool(
+            self.conn.execute(
+                f"SELECT 1 FROM urls WHERE state = {PENDING} LIMIT 1"
+            ).fetchone()
+        )
+
+    def found_links(self):
+        """Return the links found by all workers, sorted"""
+        rows = self.conn.execute("SELECT url FROM found ORDER BY url")
+        return [row[0] for row in rows]
+
+    def stats(self):
+        """Return queue counts by state plus found links as a dictionary"""
+        counts = dict(
+            self.conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state")
+        )
+        return {
+            "pending": counts.get(PENDING, 0),
+            "claimed": counts.get(CLAIMED, 0),
+            "done": counts.get(DONE, 0),
+            "found": self.conn.execute("SELECT COUNT(*) FROM found").fetchone()[0],
+        }
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+class SharedFrontier:
+    """
+    Crawl frontier of one distributed crawl worker, with the CrawlFrontier
+    interface the crawl loop uses.
+
+    Pushed URLs are batched into the coordinator's queue (whatever their
+    partition); pop() serves URLs claimed from the worker's own partition.
+    complete() reports finished pages, and waiting() tells the crawl loop
+    to keep polling while other workers may still hand it URLs.
+    """
+
+    def __init__(
+        self,
+        coordinator,
+        partition,
+        num_partitions,
+        max_depth,
+        max_pages,
+        seen=None,
+        batch_size=DEFAULT_BATCH_SIZE,
+    ):
+        self.coordinator = coordinator
+        self.partition = partition
+        self.num_partitions = num_partitions
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.batch_size = batch_size
+        self._queue = deque()
+        self._seen = set() if seen is None else seen
+
+        # Claimed URLs not finished yet, and progress not yet written
+        self._claimed = set()
+        self._new_urls = []
+        self._done = []
+        self._found = []
+
+        # Counters
+        self.queued = 0
+        self.duplicates = 0
+        self.skipped = 0
+
+    def push(self, url, depth):
+        """Queue a URL in the shared frontier; False if seen or too deep"""
+        if depth > self.max_depth:
+            self.skipped += 1
+            return False
+
+        if url in self._seen:
+            self.duplicates += 1
+            return False
+
+        self._seen.add(url)
+        self._new_urls.append((url, depth, host_partition(url, self.num_partitions)))
+        self.queued += 1
+        if len(self._new_urls) >= self.batch_size:
+            self.flush()
+        return True
+
+    def mark_seen(self, url):
+        """Record a URL as seen without queueing it"""
+        self._seen.add(url)
+
+    def complete(self, url, links=()):
+        """Record that a popped URL is finished and which links it yielded"""
+        self._claimed.discard(url)
+        self._done.append(url)
+        self._found.extend(links)
+        if len(self._done) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write pushed URLs, finished pages and found links to the coordinator"""
+        if self._new_urls or self._done or self._found:
+            self.coordinator.sync(self._new_urls, self._done, self._found)
+            self._new_urls = []
+            self._done = []
+            self._found = []
+
+    def _refill(self):
+        self.flush()
+        claimed = self.coordinator.claim(
+            self.partition, self.batch_size, self.max_pages
+        )
+        for url, depth in claimed:
+            self._seen.add(url)
+            self._claimed.add(url)
+            self._queue.append((url, depth))
+
+    def waiting(self):
+        """True while other workers may still produce URLs for this worker"""
+        self.flush()
+        return self.coordinator.active(self.max_pages)
+
+    def pop(self):
+        """Remove and return the next claimed (url, depth) to crawl"""
+        return self._queue.popleft()
+
+    def pending(self):
+        """Return the locally claimed (url, depth) entries in crawl order"""
+        return list(self._queue)
+
+    def close(self):
+        """Write outstanding progress and hand unfinished claims back"""
+        self.flush()
+        if self._claimed:
+            self.coordinator.release(self._claimed)
+            self._claimed.clear()
+        self._queue.clear()
+
+    def __len__(self):
+        if not self._queue:
+            self._refill()
+        return len(self._queue)
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    def stats(self):
+        """Return the frontier counters as a dictionary"""
+        return {
+            "pending": len(self._queue),
+            "queued": self.queued,
+            "duplicates": self.duplicates,
+            "skipped": self.skipped,
+        }
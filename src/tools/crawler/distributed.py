@@ -0,0 +1,110 @@
+"""
+Distributed crawl - run several crawl worker processes on this machine
+"""
+
+import multiprocessing
+import os
+
+from .backends import DEFAULT_BACKEND, create_crawler
+from .coordinator import CrawlCoordinator
+
+
+def _worker_archive_path(path, worker_index):
+    """pages.warc.gz -> pages.worker<N>.warc.gz"""
+    root, extension = os.path.splitext(path)
+    if extension == ".gz":
+        root, inner = os.path.splitext(root)
+        extension = inner + extension
+    return f"{root}.worker{worker_index}{extension}"
+
+
+def _run_worker(
+    backend, start_url, coordinator_path, worker_index, num_workers, quiet, options
+):
+    """Process entry point: crawl one partition of the distributed crawl"""
+    crawler = create_crawler(backend)
+    if options.get("export_path"):
+        # Each worker streams the links it finds to its own file
+        root, extension = os.path.splitext(options["export_path"])
+        options = dict(options, export_path=f"{root}.worker{worker_index}{extension}")
+    if options.get("archive_path"):
+        # ... and archives the pages it fetches in its own WARC file
+        options = dict(
+            options,
+            archive_path=_worker_archive_path(options["archive_path"], worker_index),
+        )
+    if not quiet:
+
+        def log(message):
+            print(f"[worker {worker_index}] {message}", flush=True)
+
+        crawler.set_progress_callback(log)
+        crawler.set_error_callback(log)
+
+    crawler.crawl(
+        start_url,
+        coordinator_path=coordinator_path,
+        worker_index=worker_index,
+        num_workers=num_workers,
+        **options,
+    )
+
+
+def run_local_workers(
+    start_url,
+    coordinator_path,
+    num_workers,
+    backend=DEFAULT_BACKEND,
+    quiet=False,
+    **options,
+):
+    """
+    Crawl start_url with num_workers local processes sharing one coordinator
+
+    Workers on other machines join the same crawl by calling
+    SublinkCrawler.crawl() with the same coordinator_path, num_workers and
+    their own worker_index.
+
+    Args:
+        start_url: Starting URL for crawling
+        coordinator_path: SQLite file coordinating the workers (an existing
+            crawl in it is continued)
+        num_workers: Number of worker processes
+        backend: Crawl backend each worker uses (see CRAWLER_BACKENDS)
+        quiet: Do not print the workers' progress
+        **options: Further SublinkCrawler.crawl() arguments
+
+    Returns:
+        Sorted list of the links found by all workers
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for worker_index in range(num_workers):
+        process = context.Process(
+            target=_run_worker,
+            args=(
+                backend,
+                start_url,
+                coordinator_path,
+                worker_index,
+                num_workers,
+                quiet,
+                options,
+            ),
+            name=f"crawler-worker-{worker_index}",
+        )
+        process.start()
+        processes.append(process)
+
+    for process in processes:
+        process.join()
+
+    failed = [process.name for process in processes if process.exitcode]
+    if failed:
+        raise RuntimeError(f"Crawl workers failed: {', '.join(failed)}")
+
+    coordinator = CrawlCoordinator(coordinator_path)
+    try:
+        return coordinator.found_links()
+    finally:
+        coordinator.close()
@@ -0,0 +1,116 @@
+"""
+Crawl frontier - queue of URLs waiting to be crawled
+"""
+
+from collections import deque
+
+
+class CrawlFrontier:
+    """
+    Breadth-first crawl frontier with deduplication at enqueue time.
+
+    Every URL is queued at most once, so the queue holds one entry per unique
+    URL instead of one per link pointing at it. Pages are expanded in FIFO
+    order, but with concurrent workers (or a parse pool) they complete out of
+    order, so a URL can be seen at a shallower depth after it was queued. Its
+    depth is then lowered while it waits: a URL is crawled at the shallowest
+    depth it was seen at before it was popped.
+
+    The seen check can be any set-like store with add() and membership, such
+    as the compact stores in url_store. With track_changes, the URLs queued
+    and completed are also collected for take_changes(), so a checkpoint can
+    save only what changed.
+    """
+
+    def __init__(self, max_depth, seen=None, track_changes=False):
+        self.max_depth = max_depth
+        self._queue = deque()
+        # Depth of every queued URL
+        self._depths = {}
+        self._seen = set() if seen is None else seen
+        self._track_changes = track_changes
+        self._queued_changes = []
+        self._completed_changes = []
+
+        # Counters
+        self.queued = 0
+        self.duplicates = 0
+        self.skipped = 0
+
+    def push(self, url, depth):
+        """
+        Queue a URL for crawling
+
+        Returns:
+            True if the URL was queued, False if it was already seen or is
+            deeper than max_depth
+        """
+        if depth > self.max_depth:
+            self.skipped += 1
+            return False
+
+        if url in self._seen:
+            self.duplicates += 1
+            if depth < self._depths.get(url, depth):
+                self._depths[url] = depth
+                if self._track_changes:
+                    self._queued_changes.append((url, depth))
+            return False
+
+        self._seen.add(url)
+        self._queue.append(url)
+        self._depths[url] = depth
+        if self._track_changes:
+            self._queued_changes.append((url, depth))
+        self.queued += 1
+        return True
+
+    def mark_seen(self, url):
+        """Record a URL as seen without queueing it (e.g. already crawled)"""
+        self._seen.add(url)
+
+    def complete(self, url, links=()):
+        """Record that a popped URL is finished (crawled or skipped)"""
+        if self._track_changes:
+            self._completed_changes.append(url)
+
+    def take_changes(self):
+        """
+        Return and reset the changes since the last call (with track_changes)
+
+        Returns:
+            (queued, completed): (url, depth) entries queued or moved to a
+            shallower depth, and the URLs completed
+        """
+        changes = (self._queued_changes, self._completed_changes)
+        self._queued_changes = []
+        self._completed_changes = []
+        return changes
+
+    def waiting(self):
+        """True while URLs may still arrive from elsewhere (never, locally)"""
+        return False
+
+    def pop(self):
+        """Remove and return the next (url, depth) to crawl"""
+        url = self._queue.popleft()
+        return url, self._depths.pop(url)
+
+    def pending(self):
+        """Return the queued (url, depth) entries in crawl order"""
+        return [(url, self._depths[url]) for url in self._queue]
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    def stats(self):
+        """Return the frontier counters as a dictionary"""
+        return {
+            "pending": len(self._queue),
+            "queued": self.queued,
+            "duplicates": self.duplicates,
+            "skipped": self.skipped,
+        }
@@ -8,6 +8,32 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from ...core import BaseToolFrame
+from .backends import CRAWLER_BACKENDS, DEFAULT_BACKEND, create_crawler
+from .sublink_crawler import SITEMAPS_ONLY, SITEMAPS_SEED
+from .metrics import METRICS_JSON, METRICS_PROMETHEUS
+from .progress_log import ProgressLog
+from .url_rules import RULE_PREFIX, UrlRules, parse_rule
+
+# Milliseconds between metrics refreshes while a crawl runs
+METRICS_REFRESH_MS = 1000
+
+# Milliseconds between progress log updates (about 10 frames per second)
+PROGRESS_FLUSH_MS = 100
+
+# Lines kept in the progress textbox
+PROGRESS_MAX_LINES = 500
+
+# Sitemap menu entries; "off" maps to sitemaps=None
+SITEMAP_CHOICES = ["off", SITEMAPS_SEED, SITEMAPS_ONLY]
+
+# Save dialog choices for link exports (the format follows the extension)
+LINK_FILETYPES = [
+    ("Text files", "*.txt"),
+    ("JSON Lines", "*.jsonl"),
+    ("CSV", "*.csv"),
+    ("SQLite", "*.db"),
+    ("All files", "*.*"),
+]
 
 
 class CrawlerToolFrame(BaseToolFrame):
@@ -15,7 +41,12 @@ class CrawlerToolFrame(BaseToolFrame):
         self.crawler = crawler
         self.crawler.set_progress_callback(self.update_progress)
         self.crawler.set_error_callback(self.show_error)
+        # Crawler instances per backend, created the first time one is selected
+        self.crawlers = {DEFAULT_BACKEND: crawler}
         self.found_links = []
+        self.progress_log = ProgressLog(PROGRESS_MAX_LINES)
+        # Export file the last crawl streamed its links to, if any
+        self.streamed_to = None
         self.crawl_thread = None
         super().__init__(parent, **kwargs)
 
@@ -86,15 +117,28 @@ class CrawlerToolFrame(BaseToolFrame):
         )
         self.start_url_entry.pack(fill="x", padx=10, pady=(0, 10))
 
-        # URL Prefix (optional)
+        # URL Prefix (optional); several rules separated by spaces
         ctk.CTkLabel(input_frame, text="URL Prefix Filter (optional):").pack(
             anchor="w", padx=10, pady=(5, 5)
         )
         self.url_prefix_entry = ctk.CTkEntry(
-            input_frame, placeholder_text="Leave empty to use start URL path"
+            input_frame,
+            placeholder_text="Leave empty to use start URL path; separate "
+            "several prefixes, glob: or re: rules with spaces",
         )
         self.url_prefix_entry.pack(fill="x", padx=10, pady=(0, 10))
 
+        # Exclude rules (optional)
+        ctk.CTkLabel(input_frame, text="Exclude Rules (optional):").pack(
+            anchor="w", padx=10, pady=(5, 5)
+        )
+        self.exclude_rules_entry = ctk.CTkEntry(
+            input_frame,
+            placeholder_text="e.g. https://example.com/archive/ glob:*/print/* "
+            "re:[?&]page=",
+        )
+        self.exclude_rules_entry.pack(fill="x", padx=10, pady=(0, 10))
+
         # Parameters frame
         params_frame = ctk.CTkFrame(input_frame)
         params_frame.pack(fill="x", padx=10, pady=(0, 10))
@@ -127,6 +171,52 @@ class CrawlerToolFrame(BaseToolFrame):
         )
         self.delay_entry.pack(side="left")
 
+        # Parameters - Row 2
+        params_row2 = ctk.CTkFrame(params_frame)
+        params_row2.pack(fill="x", padx=5, pady=5)
+
+        # Workers
+        ctk.CTkLabel(params_row2, text="Workers:").pack(side="left", padx=(10, 5))
+        self.workers_var = ctk.StringVar(value="")
+        self.workers_entry = ctk.CTkEntry(
+            params_row2, textvariable=self.workers_var, width=60
+        )
+        self.workers_entry.pack(side="left", padx=(0, 20))
+
+        # Per-host limit
+        ctk.CTkLabel(params_row2, text="Per-Host Limit:").pack(
+            side="left", padx=(0, 5)
+        )
+        self.per_host_limit_var = ctk.StringVar(value="")
+        self.per_host_limit_entry = ctk.CTkEntry(
+            params_row2,
+            textvariable=self.per_host_limit_var,
+            width=60,
+        )
+        self.per_host_limit_entry.pack(side="left", padx=(0, 20))
+
+        # Backend
+        ctk.CTkLabel(params_row2, text="Backend:").pack(side="left", padx=(0, 5))
+        self.backend_var = ctk.StringVar(value=DEFAULT_BACKEND)
+        self.backend_menu = ctk.CTkOptionMenu(
+            params_row2,
+            variable=self.backend_var,
+            values=list(CRAWLER_BACKENDS),
+            width=110,
+        )
+        self.backend_menu.pack(side="left", padx=(0, 20))
+
+        # Sitemaps
+        ctk.CTkLabel(params_row2, text="Sitemaps:").pack(side="left", padx=(0, 5))
+        self.sitemaps_var = ctk.StringVar(value=SITEMAP_CHOICES[0])
+        self.sitemaps_menu = ctk.CTkOptionMenu(
+            params_row2,
+            variable=self.sitemaps_var,
+            values=SITEMAP_CHOICES,
+            width=80,
+        )
+        self.sitemaps_menu.pack(side="left")
+
         # User Agent
         ctk.CTkLabel(input_frame, text="User Agent (optional):").pack(
             anchor="w", padx=10, pady=(5, 5)
@@ -136,6 +226,21 @@ class CrawlerToolFrame(BaseToolFrame):
         )
         self.user_agent_entry.pack(fill="x", padx=10, pady=(0, 10))
 
+        # Stream links to a file while crawling
+        ctk.CTkLabel(input_frame, text="Stream Links To (optional):").pack(
+            anchor="w", padx=10, pady=(5, 5)
+        )
+        export_row = ctk.CTkFrame(input_frame, fg_color="transparent")
+        export_row.pack(fill="x", padx=10, pady=(0, 10))
+        self.export_path_entry = ctk.CTkEntry(
+            export_row,
+            placeholder_text="Write links as they are found (.txt, .jsonl, .csv, .db)",
+        )
+        self.export_path_entry.pack(side="left", fill="x", expand=True)
+        ctk.CTkButton(
+            export_row, text="Browse...", width=90, command=self.choose_export_path
+        ).pack(side="left", padx=(10, 0))
+
         # Control buttons
         button_frame = ctk.CTkFrame(self)
         button_frame.pack(fill="x", padx=10, pady=(0, 10))
@@ -163,6 +268,14 @@ class CrawlerToolFrame(BaseToolFrame):
         )
         self.export_button.pack(side="right", padx=10, pady=10)
 
+        self.export_metrics_button = ctk.CTkButton(
+            button_frame,
+            text="Export Metrics",
+            command=self.export_metrics,
+            state="disabled",
+        )
+        self.export_metrics_button.pack(side="right", padx=(10, 0), pady=10)
+
         # Progress section
         progress_frame = ctk.CTkFrame(self)
         progress_frame.pack(fill="x", padx=10, pady=(0, 10))
@@ -172,7 +285,19 @@ class CrawlerToolFrame(BaseToolFrame):
         )
 
         self.progress_text = ctk.CTkTextbox(progress_frame, height=100)
-        self.progress_text.pack(fill="x", padx=10, pady=(0, 10))
+        self.progress_text.pack(fill="x", padx=10, pady=(0, 5))
+
+        # Page, skip and error counts with the page being crawled
+        self.progress_status_label = ctk.CTkLabel(
+            progress_frame, text="", anchor="w", justify="left"
+        )
+        self.progress_status_label.pack(fill="x", padx=10, pady=(0, 5))
+
+        # Live crawl metrics (rate, latency, bytes, queue depth)
+        self.metrics_label = ctk.CTkLabel(
+            progress_frame, text="", anchor="w", justify="left"
+        )
+        self.metrics_label.pack(fill="x", padx=10, pady=(0, 10))
         # Bind context menu to progress_text
         self.progress_text_context_menu = self._create_context_menu(self.progress_text)
         self.progress_text.bind(
@@ -219,13 +344,28 @@ class CrawlerToolFrame(BaseToolFrame):
         )
 
     def get_options(self) -> Dict[str, Any]:
+        include_rules = self.url_prefix_entry.get().split()
+        # A single plain prefix is the URL prefix; globs and regexes stay rules
+        single_prefix = (
+            len(include_rules) == 1 and parse_rule(include_rules[0])[0] == RULE_PREFIX
+        )
         return {
             "start_url": self.start_url_entry.get().strip(),
-            "url_prefix": self.url_prefix_entry.get().strip() or None,
+            "url_prefix": include_rules[0] if single_prefix else None,
+            "include_rules": None if single_prefix else include_rules or None,
+            "exclude_rules": self.exclude_rules_entry.get().split() or None,
             "max_depth": int(self.max_depth_var.get()),
             "max_pages": int(self.max_pages_var.get()),
             "request_delay": float(self.delay_var.get()),
             "user_agent": self.user_agent_entry.get().strip() or None,
+            "workers": int(self.workers_var.get().strip() or 0) or None,
+            "per_host_limit": int(self.per_host_limit_var.get().strip() or 0)
+            or None,
+            "backend": self.backend_var.get(),
+            "sitemaps": None
+            if self.sitemaps_var.get() == SITEMAP_CHOICES[0]
+            else self.sitemaps_var.get(),
+            "export_path": self.export_path_entry.get().strip() or None,
         }
 
     def set_options(self, options: Dict[str, Any]) -> None:
@@ -235,6 +375,12 @@ class CrawlerToolFrame(BaseToolFrame):
         if "url_prefix" in options and options["url_prefix"]:
             self.url_prefix_entry.delete(0, "end")
             self.url_prefix_entry.insert(0, options["url_prefix"])
+        if "include_rules" in options and options["include_rules"]:
+            self.url_prefix_entry.delete(0, "end")
+            self.url_prefix_entry.insert(0, " ".join(options["include_rules"]))
+        if "exclude_rules" in options and options["exclude_rules"]:
+            self.exclude_rules_entry.delete(0, "end")
+            self.exclude_rules_entry.insert(0, " ".join(options["exclude_rules"]))
         if "max_depth" in options:
             self.max_depth_var.set(str(options["max_depth"]))
         if "max_pages" in options:
@@ -244,12 +390,27 @@ class CrawlerToolFrame(BaseToolFrame):
         if "user_agent" in options and options["user_agent"]:
             self.user_agent_entry.delete(0, "end")
             self.user_agent_entry.insert(0, options["user_agent"])
+        if "workers" in options:
+            self.workers_var.set(str(options["workers"] or ""))
+        if "per_host_limit" in options:
+            self.per_host_limit_var.set(str(options["per_host_limit"] or ""))
+        if "backend" in options and options["backend"] in CRAWLER_BACKENDS:
+            self.backend_var.set(options["backend"])
+        if "sitemaps" in options:
+            self.sitemaps_var.set(options["sitemaps"] or SITEMAP_CHOICES[0])
+        if "export_path" in options and options["export_path"]:
+            self.export_path_entry.delete(0, "end")
+            self.export_path_entry.insert(0, options["export_path"])
 
     def clear(self) -> None:
         self.progress_text.delete("1.0", "end")
+        self.progress_log.reset()
+        self.progress_status_label.configure(text="")
         self.results_textbox.delete("1.0", "end")
         self.results_label.configure(text="Found Links (0):")
         self.found_links = []
+        self.streamed_to = None
+        self.metrics_label.configure(text="")
         self.export_button.configure(state="disabled")
         self.copy_button.configure(state="disabled")
 
@@ -284,6 +445,35 @@ class CrawlerToolFrame(BaseToolFrame):
             messagebox.showerror("Error", "Request delay must be a non-negative number")
             return False
 
+        try:
+            workers = int(self.workers_var.get().strip() or 0)
+            if workers < 0:
+                raise ValueError()
+        except ValueError:
+            messagebox.showerror(
+                "Error", "Workers must be empty (backend default) or a positive integer"
+            )
+            return False
+
+        try:
+            per_host_limit = int(self.per_host_limit_var.get().strip() or 0)
+            if per_host_limit < 0:
+                raise ValueError()
+        except ValueError:
+            messagebox.showerror(
+                "Error", "Per-host limit must be empty or a non-negative integer"
+            )
+            return False
+
+        try:
+            UrlRules(
+                self.url_prefix_entry.get().split(),
+                self.exclude_rules_entry.get().split(),
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False
+
         return True
 
     def start_crawl(self):
@@ -295,6 +485,7 @@ class CrawlerToolFrame(BaseToolFrame):
         self.start_button.configure(state="disabled")
         self.stop_button.configure(state="normal")
         self.export_button.configure(state="disabled")
+        self.export_metrics_button.configure(state="disabled")
         self.copy_button.configure(state="disabled")
 
         # Clear previous results
@@ -302,30 +493,75 @@ class CrawlerToolFrame(BaseToolFrame):
 
         # Get options
         options = self.get_options()
+        self._select_backend(options.pop("backend"))
 
         # Start crawling in separate thread
         self.crawl_thread = threading.Thread(target=self._run_crawl, args=(options,))
         self.crawl_thread.daemon = True
         self.crawl_thread.start()
+        self.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
+    def _refresh_metrics(self):
+        """Show the running crawl's metrics, repeating until the crawl ends"""
+        self.metrics_label.configure(text=self.crawler.metrics.summary())
+        if self.crawl_thread is not None and self.crawl_thread.is_alive():
+            self.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
+    def _select_backend(self, backend: str):
+        """Switch to the crawler for the chosen backend"""
+        if backend not in self.crawlers:
+            crawler = create_crawler(backend)
+            crawler.set_progress_callback(self.update_progress)
+            crawler.set_error_callback(self.show_error)
+            self.crawlers[backend] = crawler
+        self.crawler = self.crawlers[backend]
+
+    def choose_export_path(self):
+        """Pick the file links are streamed to during the crawl"""
+        filename = filedialog.asksaveasfilename(
+            title="Stream Links To",
+            defaultextension=".txt",
+            filetypes=LINK_FILETYPES,
+        )
+        if filename:
+            self.export_path_entry.delete(0, "end")
+            self.export_path_entry.insert(0, filename)
 
     def _run_crawl(self, options: Dict[str, Any]):
         """Run crawl in separate thread"""
+        if options["export_path"]:
+            # The links go to the export file as they are found; the crawler
+            # only keeps their fingerprints and returns none
+            options["keep_links"] = False
+            self.streamed_to = options["export_path"]
         try:
             self.found_links = self.crawler.crawl(**options)
             self.master.after(0, self._crawl_completed)
         except Exception as e:
-            self.master.after(0, lambda: self.show_error(f"Crawl error: {str(e)}"))
+            message = f"Crawl error: {str(e)}"
+            self.master.after(0, lambda: self._show_error_ui(message))
             self.master.after(0, self._crawl_completed)
 
     def _crawl_completed(self):
         """Handle crawl completion"""
+        self._flush_progress()
         self.start_button.configure(state="normal")
         self.stop_button.configure(state="disabled")
+        self.export_metrics_button.configure(state="normal")
+        self.metrics_label.configure(text=self.crawler.metrics.summary())
 
         if self.found_links:
             self.export_button.configure(state="normal")
             self.copy_button.configure(state="normal")
 
+        if self.streamed_to:
+            count = len(self.crawler.found_links)
+            self.results_label.configure(text=f"Found Links ({count}):")
+            self.results_textbox.insert(
+                "end", f"{count} links streamed to {self.streamed_to}\n"
+            )
+            return
+
         # Update results display
         self.results_label.configure(text=f"Found Links ({len(self.found_links)}):")
         self._display_formatted_links()
@@ -356,13 +592,29 @@ class CrawlerToolFrame(BaseToolFrame):
         filename = filedialog.asksaveasfilename(
             title="Save Links",
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=LINK_FILETYPES,
         )
 
         if filename:
             if self.crawler.export_links_to_file(self.found_links, filename):
                 pass
 
+    def export_metrics(self):
+        """Export the last crawl's metrics as JSON or Prometheus text"""
+        filename = filedialog.asksaveasfilename(
+            title="Save Metrics",
+            defaultextension=".json",
+            filetypes=[
+                ("JSON", "*.json"),
+                ("Prometheus text", "*.prom"),
+                ("All files", "*.*"),
+            ],
+        )
+
+        if filename:
+            format = METRICS_PROMETHEUS if filename.endswith(".prom") else METRICS_JSON
+            self.crawler.export_metrics(filename, format)
+
     def copy_links_to_clipboard(self):
         """Copy all found links to clipboard"""
         if not self.found_links:
@@ -383,16 +635,33 @@ class CrawlerToolFrame(BaseToolFrame):
             messagebox.showerror("Error", f"Failed to copy to clipboard: {str(e)}")
 
     def update_progress(self, message: str):
-        """Update progress display"""
-        self.master.after(0, lambda: self._update_progress_ui(message))
-
-    def _update_progress_ui(self, message: str):
-        """Update progress UI (must run on main thread)"""
-        self.progress_text.insert("end", f"{message}\n")
-        self.progress_text.see("end")
+        """Queue a progress message (called from the crawl thread)"""
+        if self.progress_log.post(message):
+            self.master.after(PROGRESS_FLUSH_MS, self._flush_progress)
+
+    def _flush_progress(self):
+        """Show queued progress messages (must run on main thread)"""
+        lines, dropped = self.progress_log.drain()
+        if dropped:
+            lines.insert(0, f"... {dropped} messages skipped ...")
+        if lines:
+            self.progress_text.insert("end", "\n".join(lines) + "\n")
+            # Keep only the last PROGRESS_MAX_LINES lines
+            line_count = int(self.progress_text.index("end-1c").split(".")[0]) - 1
+            if line_count > PROGRESS_MAX_LINES:
+                self.progress_text.delete(
+                    "1.0", f"{line_count - PROGRESS_MAX_LINES + 1}.0"
+                )
+            self.progress_text.see("end")
+        self.progress_status_label.configure(text=self.progress_log.summary())
 
     def show_error(self, message: str):
         """Show error message"""
+        if self.crawl_thread is not None and self.crawl_thread.is_alive():
+            # Errors during a crawl (often one per failed page) go to the log
+            if self.progress_log.post(message, error=True):
+                self.master.after(PROGRESS_FLUSH_MS, self._flush_progress)
+            return
         self.master.after(0, lambda: self._show_error_ui(message))
 
     def _show_error_ui(self, message: str):
@@ -0,0 +1,162 @@
+"""
+HTTP cache - on-disk conditional-GET cache of extracted page links
+"""
+
+import sqlite3
+import threading
+import time
+
+# Default cap on stored link data (bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Entries evicted per batch once the cache is over its size limit
+EVICTION_BATCH = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    links TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+class CacheEntry:
+    """Validators and extracted links stored for one URL"""
+
+    def __init__(self, etag, last_modified, links):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.links = links
+
+    def conditional_headers(self):
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    SQLite-backed cache mapping normalized URLs to their ETag/Last-Modified
+    validators and the links extracted from the page.
+
+    A crawl sends the validators with each request and, when the server
+    replies 304 Not Modified, reuses the cached links instead of downloading
+    and parsing the page again. Stored link data is capped at max_bytes; the
+    least recently used entries are evicted first. Safe to share between
+    crawler worker threads.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, url):
+        """Return the CacheEntry for a URL (marking it recently used), or None"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, links FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url)
+            )
+
+        etag, last_modified, links = row
+        return CacheEntry(
+            etag, last_modified, set(links.split("\n")) if links else set()
+        )
+
+    def put(self, url, etag, last_modified, links):
+        """Store a page's validators and links; pages without validators are skipped"""
+        if not etag and not last_modified:
+            return
+
+        data = "\n".join(sorted(links))
+        size = len(data) + len(url)
+        with self._lock, self.conn:
+            old = self.conn.execute(
+                "SELECT size FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(url, etag, last_modified, links, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, data, size, time.time()),
+            )
+            self.total_bytes += size
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (lock held)"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT url, size FROM entries ORDER BY last_used LIMIT ?",
+                (EVICTION_BATCH,),
+            ).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self.total_bytes -= size
+                self.evictions += 1
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def record_hit(self):
+        """Count a 304 response answered from the cache"""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        """Count a page that had to be downloaded in full"""
+        with self._lock:
+            self.misses += 1
+
+    def reset_stats(self):
+        """Zero the hit/miss/store/eviction counters (e.g. at the start of a crawl)"""
+        with self._lock:
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+    def stats(self):
+        """Return the cache counters as a dictionary"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes": self.total_bytes,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,262 @@
+"""
+HTTP pool - connection pooling, connect retries and DNS caching for crawls
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    NameResolutionError,
+    NewConnectionError,
+)
+from urllib3.util.retry import Retry
+
+# Compressed transfer encodings requested from servers (both are decoded by
+# requests/urllib3 and aiohttp without optional packages)
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Seconds a resolved host address is reused
+DEFAULT_DNS_TTL = 300
+
+# Times a failed connection attempt is retried, with exponential backoff
+DEFAULT_CONNECT_RETRIES = 2
+CONNECT_BACKOFF_FACTOR = 0.5
+
+
+class PoolStats:
+    """Connection reuse, DNS cache and transfer counters of a crawl's HTTP pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Connections opened by the current thread, to tell whether one of
+        # its requests needed a new connection
+        self._thread = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+            self.reused = 0
+            self.connect_errors = 0
+            self.dns_hits = 0
+            self.dns_misses = 0
+            self.wire_bytes = 0
+            self.body_bytes = 0
+
+    def add(self, name, amount=1):
+        """Increase a counter (thread-safe)"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def connection_opened(self):
+        """Count a new connection opened by the current thread"""
+        self.add("connections")
+        self._thread.connections = self.thread_connections() + 1
+
+    def thread_connections(self):
+        """Connections the current thread has opened"""
+        return getattr(self._thread, "connections", 0)
+
+    def record_body(self, wire_bytes, body_bytes):
+        """Record a body's size as transferred and after decompression"""
+        with self._lock:
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+
+    def stats(self):
+        """Return the counters as a dictionary"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reused": self.reused,
+                "connect_errors": self.connect_errors,
+                "dns_hits": self.dns_hits,
+                "dns_misses": self.dns_misses,
+                "wire_bytes": self.wire_bytes,
+                "body_bytes": self.body_bytes,
+            }
+
+    def summary(self):
+        """One-line description for the crawl summary"""
+        stats = self.stats()
+        requests = stats["requests"]
+        reused = stats["reused"] / requests * 100 if requests else 0.0
+        line = (
+            f"HTTP pool: {requests} requests over {stats['connections']} connections "
+            f"({reused:.0f}% reused), DNS cache {stats['dns_hits']} hits / "
+            f"{stats['dns_misses']} lookups, {stats['connect_errors']} connect errors"
+        )
+        if stats["body_bytes"]:
+            line += (
+                f", {stats['wire_bytes'] / 1024 / 1024:.1f} MiB transferred for "
+                f"{stats['body_bytes'] / 1024 / 1024:.1f} MiB of pages"
+            )
+        return line + "."
+
+
+class DnsCache:
+    """
+    Host name -> addresses cache shared by a crawl's connections, so every new
+    connection to a host does not repeat the resolver round trip
+    """
+
+    def __init__(self, ttl=DEFAULT_DNS_TTL, stats=None):
+        self.ttl = ttl
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def resolve(self, host, port):
+        """
+        Return the addresses of host in resolver order
+
+        Raises:
+            socket.gaierror: The name does not resolve (failures are not cached)
+        """
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            if self.stats:
+                self.stats.add("dns_hits")
+            return entry[1]
+
+        addresses = []
+        for *_, sockaddr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        if self.stats:
+            self.stats.add("dns_misses")
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _CrawlerConnectionMixin:
+    """Resolves through the adapter's DnsCache and counts new connections"""
+
+    dns_cache = None
+    pool_stats = None
+
+    def _new_conn(self):
+        host = self._dns_host
+        if self.dns_cache is None:
+            addresses = [host]
+        else:
+            try:
+                addresses = self.dns_cache.resolve(host, self.port)
+            except socket.gaierror as e:
+                raise NameResolutionError(self.host, self, e) from e
+
+        try:
+            # Like socket.create_connection, try each address in turn
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError):
+                    if self.pool_stats:
+                        self.pool_stats.add("connect_errors")
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+
+        if self.pool_stats:
+            self.pool_stats.connection_opened()
+        return sock
+
+
+class CrawlerHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter for crawl sessions: per-host pool size, bounded connect
+    retries with exponential backoff, DNS caching and reuse statistics.
+
+    Args:
+        pool_hosts: Number of per-host connection pools kept open
+        pool_size: Connections kept per host (at least the host's concurrency)
+        connect_retries: Retries of a failed connection attempt (responses and
+            read errors are never retried here)
+        dns_cache: DnsCache for new connections (None resolves every time)
+        stats: PoolStats updated by the adapter
+    """
+
+    def __init__(
+        self,
+        pool_hosts,
+        pool_size,
+        connect_retries=DEFAULT_CONNECT_RETRIES,
+        dns_cache=None,
+        stats=None,
+    ):
+        self.dns_cache = dns_cache
+        self.stats = stats if stats is not None else PoolStats()
+        retries = Retry(
+            total=connect_retries,
+            connect=connect_retries,
+            read=0,
+            status=0,
+            other=0,
+            redirect=False,
+            backoff_factor=CONNECT_BACKOFF_FACTOR,
+            raise_on_status=False,
+        )
+        super().__init__(
+            pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=retries
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attributes = {"dns_cache": self.dns_cache, "pool_stats": self.stats}
+        http_connection = type(
+            "CrawlerHTTPConnection",
+            (_CrawlerConnectionMixin, HTTPConnection),
+            attributes,
+        )
+        https_connection = type(
+            "CrawlerHTTPSConnection",
+            (_CrawlerConnectionMixin, HTTPSConnection),
+            attributes,
+        )
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type(
+                "CrawlerHTTPConnectionPool",
+                (HTTPConnectionPool,),
+                {"ConnectionCls": http_connection},
+            ),
+            "https": type(
+                "CrawlerHTTPSConnectionPool",
+                (HTTPSConnectionPool,),
+                {"ConnectionCls": https_connection},
+            ),
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.add("requests")
+        # Connections are opened on the thread sending the request, so a
+        # response that came without a new one came over a kept-alive one
+        opened = self.stats.thread_connections()
+        response = super().send(request, **kwargs)
+        if self.stats.thread_connections() == opened:
+            self.stats.add("reused")
+        return response
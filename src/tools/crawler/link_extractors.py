@@ -0,0 +1,82 @@
+"""
+Link extractors - pull raw <a href> values out of HTML content
+
+Each extractor takes the raw page content (bytes) and returns the list of
+href attribute values of its <a> tags in document order. Resolving,
+normalizing and validating the hrefs is left to the crawler.
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+from lxml import etree
+
+DEFAULT_EXTRACTOR = "lxml"
+
+
+class _HrefCollector:
+    """lxml parser target that records <a href> values without building a tree"""
+
+    def __init__(self):
+        self.hrefs = []
+
+    def start(self, tag, attrib):
+        if tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                self.hrefs.append(href)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.hrefs
+
+
+def extract_hrefs_soup(content):
+    """Full BeautifulSoup parse of the page (slowest, most forgiving)"""
+    soup = BeautifulSoup(content, "html.parser")
+    return [link_tag["href"] for link_tag in soup.find_all("a", href=True)]
+
+
+def extract_hrefs_strainer(content):
+    """BeautifulSoup parse that only builds <a href> elements"""
+    soup = BeautifulSoup(
+        content, "html.parser", parse_only=SoupStrainer("a", href=True)
+    )
+    return [link_tag["href"] for link_tag in soup.find_all("a", href=True)]
+
+
+def extract_hrefs_lxml(content):
+    """
+    Streaming lxml parse: libxml2 reports start tags to a collector and no
+    tree is built. The content is decoded the way BeautifulSoup would decode
+    it, so both see the same hrefs. Falls back to the full BeautifulSoup parse
+    for content lxml rejects (e.g. empty documents).
+    """
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    if not markup:
+        return extract_hrefs_soup(content)
+
+    parser = etree.HTMLParser(target=_HrefCollector())
+    try:
+        parser.feed(markup)
+        return parser.close()
+    except etree.LxmlError:
+        return extract_hrefs_soup(content)
+
+
+LINK_EXTRACTORS = {
+    "lxml": extract_hrefs_lxml,
+    "strainer": extract_hrefs_strainer,
+    "soup": extract_hrefs_soup,
+}
+
+
+def get_link_extractor(name=DEFAULT_EXTRACTOR):
+    """Return the href extraction function registered under ``name``"""
+    try:
+        return LINK_EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown link extractor: {name}")
@@ -0,0 +1,391 @@
+"""
+Link graph - which crawled page links to which, held as integer IDs in
+compact arrays, with in-degree, click depth and PageRank scores
+"""
+
+import csv
+import heapq
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from itertools import accumulate, chain, islice, repeat
+from operator import add, mul, sub
+
+GRAPH_BINARY = "binary"
+GRAPH_EDGES = "edges"
+GRAPH_SCORES = "scores"
+LINK_GRAPH_FORMATS = (GRAPH_BINARY, GRAPH_EDGES, GRAPH_SCORES)
+
+# Formats picked by file extension when none is given
+EXTENSION_FORMATS = {
+    ".csr": GRAPH_BINARY,
+    ".bin": GRAPH_BINARY,
+    ".csv": GRAPH_SCORES,
+}
+
+# Binary file: header, then the CSR offsets (uint64), targets (uint32) and
+# crawl depths (int32, -1 if unknown), then the URLs of the nodes in ID
+# order, UTF-8 and newline-separated. All numbers are little-endian.
+MAGIC = b"CSRGRAPH"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sIQQQ")
+
+DEFAULT_DAMPING = 0.85
+DEFAULT_TOLERANCE = 1e-6
+DEFAULT_MAX_ITERATIONS = 100
+
+
+def graph_format_for_path(path):
+    """Guess the link graph format from a file name (edge list by default)"""
+    return EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), GRAPH_EDGES)
+
+
+def _write_array(f, values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def _read_array(f, typecode, count):
+    values = array(typecode)
+    values.fromfile(f, count)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class LinkGraph:
+    """
+    Directed graph of the links between crawled pages.
+
+    Every URL gets an integer ID (0 is the root, the start of the crawl)
+    and the links of each page are appended to one flat
+    array("I") of target IDs, so a link costs 4 bytes instead of a string
+    reference in a set per page. csr() compacts the rows into compressed
+    sparse row form: targets ordered by source ID, with offsets[i] to
+    offsets[i + 1] the links of node i.
+
+    Scores are computed over whole arrays: in-degree by counting the
+    targets, depth by a breadth-first search from the root and PageRank by
+    power iteration, where each iteration is a few map()/accumulate()
+    passes over the edges rather than a Python loop per link. URLs found
+    but never crawled are nodes without links of their own.
+
+    Args:
+        root: URL depths are measured from, given ID 0 (defaults to the
+            first page added)
+    """
+
+    def __init__(self, root=None):
+        self.urls = []
+        self._ids = {}
+        # Row of each node in _edges (pages added later append new rows)
+        self._starts = array("Q")
+        self._lengths = array("I")
+        self._edges = array("I")
+        # Depth each page was crawled at (-1 if not crawled)
+        self._crawl_depths = array("i")
+        self._csr = None
+        if root is not None:
+            self._node(root)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, url):
+        return url in self._ids
+
+    @property
+    def edge_count(self):
+        return sum(self._lengths)
+
+    def node_id(self, url):
+        """ID of a URL, or None if it is not in the graph"""
+        return self._ids.get(url)
+
+    def _node(self, url):
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self.urls)
+            self.urls.append(url)
+            self._starts.append(0)
+            self._lengths.append(0)
+            self._crawl_depths.append(-1)
+        return node
+
+    def add_page(self, url, links, depth=None):
+        """
+        Record the links of a crawled page (replacing any recorded before)
+
+        Repeated links and links to the page itself are dropped.
+
+        Args:
+            url: Page URL
+            links: URLs the page links to
+            depth: Depth the page was crawled at, if known
+        """
+        source = self._node(url)
+        if depth is not None:
+            self._crawl_depths[source] = depth
+        targets = [self._node(link) for link in dict.fromkeys(links) if link != url]
+        self._starts[source] = len(self._edges)
+        self._lengths[source] = len(targets)
+        self._edges.extend(targets)
+        self._csr = None
+
+    def csr(self):
+        """
+        The graph in compressed sparse row form
+
+        Returns:
+            (offsets, targets): array("Q") of len(self) + 1 row offsets and
+            array("I") of target IDs
+        """
+        if self._csr is None:
+            targets = array("I")
+            edges = self._edges
+            for start, length in zip(self._starts, self._lengths):
+                if length:
+                    targets.extend(edges[start : start + length])
+            offsets = array("Q", accumulate(self._lengths, initial=0))
+            # The compacted rows replace the crawl-ordered ones
+            self._edges = targets
+            self._starts = offsets[:-1]
+            self._csr = (offsets, targets)
+        return self._csr
+
+    def out_degree(self):
+        """Links of each page, as array("I") indexed by node ID"""
+        return array("I", self._lengths)
+
+    def in_degree(self):
+        """Links to each page, as array("I") indexed by node ID"""
+        counts = array("I", bytes(4 * len(self)))
+        for node, links in Counter(self.csr()[1]).items():
+            counts[node] = links
+        return counts
+
+    def depths(self):
+        """
+        Fewest links to follow from the root (node 0) to each page
+
+        The search starts from the root and from every page at the depth it
+        was crawled at, so pages reached through links the graph did not
+        record (crawled before a resume, or by another distributed worker)
+        still get their depth.
+
+        Returns:
+            array("i") indexed by node ID; -1 for pages not reachable
+        """
+        offsets, targets = self.csr()
+        depths = array("i", self._crawl_depths)
+        if not depths:
+            return depths
+        depths[0] = 0
+        # Pages by depth, searched shallowest first
+        levels = defaultdict(list)
+        for node, depth in enumerate(depths):
+            if depth >= 0:
+                levels[depth].append(node)
+        depth = 0
+        while levels:
+            level = [node for node in levels.pop(depth, ()) if depths[node] == depth]
+            depth += 1
+            for node in chain.from_iterable(
+                targets[offsets[source] : offsets[source + 1]] for source in level
+            ):
+                if depths[node] < 0 or depths[node] > depth:
+                    depths[node] = depth
+                    levels[depth].append(node)
+        return depths
+
+    def pagerank(
+        self,
+        damping=DEFAULT_DAMPING,
+        tolerance=DEFAULT_TOLERANCE,
+        max_iterations=DEFAULT_MAX_ITERATIONS,
+    ):
+        """
+        PageRank of every page by power iteration
+
+        The rank of pages without links (including found but uncrawled
+        pages) is spread over all pages, so the ranks sum to 1.
+
+        Args:
+            damping: Probability of following a link rather than jumping
+            tolerance: Stop when the ranks change by less than this in total
+            max_iterations: Most iterations
+
+        Returns:
+            array("d") indexed by node ID
+        """
+        count = len(self)
+        if not count:
+            return array("d")
+        offsets, targets = self.csr()
+        out_degree = self._lengths
+
+        # Edges grouped by target: their sources, with row offsets per target
+        sources = array(
+            "I", chain.from_iterable(map(repeat, range(count), out_degree))
+        )
+        by_target = sorted(range(len(targets)), key=targets.__getitem__)
+        in_sources = array("I", map(sources.__getitem__, by_target))
+        del sources, by_target
+        in_offsets = array("Q", accumulate(self.in_degree(), initial=0))
+
+        share = array("d", (1.0 / degree if degree else 0.0 for degree in out_degree))
+        dangling = array("I", (node for node in range(count) if not out_degree[node]))
+        rank = array("d", [1.0 / count]) * count
+        for _ in range(max_iterations):
+            contributions = list(map(mul, rank, share))
+            # Sum the contributions arriving at each page as differences
+            # of a running total over the edges grouped by target
+            totals = array(
+                "d",
+                accumulate(map(contributions.__getitem__, in_sources), initial=0.0),
+            )
+            incoming = map(
+                sub,
+                map(totals.__getitem__, islice(in_offsets, 1, None)),
+                map(totals.__getitem__, in_offsets),
+            )
+            jump = 1.0 - damping + damping * sum(map(rank.__getitem__, dangling))
+            updated = array(
+                "d", map(add, repeat(jump / count), map(mul, repeat(damping), incoming))
+            )
+            change = sum(map(abs, map(sub, updated, rank)))
+            rank = updated
+            if change < tolerance:
+                break
+        return rank
+
+    def report(self, count=None, **pagerank_options):
+        """
+        Scores of the pages, highest PageRank first
+
+        Args:
+            count: Return only this many pages (None for all)
+            pagerank_options: Passed to pagerank()
+
+        Returns:
+            List of dicts (url, rank, in_degree, out_degree, depth)
+        """
+        rank = self.pagerank(**pagerank_options)
+        in_degree = self.in_degree()
+        depths = self.depths()
+        nodes = range(len(self))
+        if count is None:
+            nodes = sorted(nodes, key=rank.__getitem__, reverse=True)
+        else:
+            nodes = heapq.nlargest(count, nodes, key=rank.__getitem__)
+        return [
+            {
+                "url": self.urls[node],
+                "rank": rank[node],
+                "in_degree": in_degree[node],
+                "out_degree": self._lengths[node],
+                "depth": depths[node],
+            }
+            for node in nodes
+        ]
+
+    def nbytes(self):
+        """Bytes used by the ID arrays (not counting the URL strings)"""
+        return sum(
+            values.itemsize * len(values)
+            for values in (
+                self._starts, self._lengths, self._edges, self._crawl_depths
+            )
+        )
+
+    def stats(self):
+        return {
+            "pages": len(self),
+            "links": self.edge_count,
+            "bytes": self.nbytes(),
+        }
+
+    def save(self, path):
+        """Write the graph to a compact binary file (see load_link_graph)"""
+        offsets, targets = self.csr()
+        urls = "\n".join(self.urls).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(
+                _HEADER.pack(MAGIC, FORMAT_VERSION, len(self), len(targets), len(urls))
+            )
+            _write_array(f, offsets)
+            _write_array(f, targets)
+            _write_array(f, self._crawl_depths)
+            f.write(urls)
+
+    def export(self, path, format=None):
+        """
+        Write the graph to a file
+
+        Args:
+            path: Output file
+            format: "binary" (see save()), "edges" (one "source<TAB>target"
+                URL pair per line) or "scores" (CSV of report()); None picks
+                it from the file extension
+        """
+        format = format or graph_format_for_path(path)
+        if format == GRAPH_BINARY:
+            self.save(path)
+        elif format == GRAPH_EDGES:
+            offsets, targets = self.csr()
+            urls = self.urls
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                for source, url in enumerate(urls):
+                    row = targets[offsets[source] : offsets[source + 1]]
+                    f.writelines(f"{url}\t{urls[target]}\n" for target in row)
+        elif format == GRAPH_SCORES:
+            rows = self.report()
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(
+                    f, fieldnames=["url", "rank", "in_degree", "out_degree", "depth"]
+                )
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            raise ValueError(f"Unknown link graph format: {format}")
+
+
+def load_link_graph(path):
+    """
+    Read a graph written by LinkGraph.save()
+
+    Raises:
+        ValueError: The file is not a link graph
+    """
+    graph = LinkGraph()
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Not a link graph file: {path}")
+        magic, version, nodes, edges, url_bytes = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Not a link graph file: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported link graph version: {version}")
+        try:
+            offsets = _read_array(f, "Q", nodes + 1)
+            targets = _read_array(f, "I", edges)
+            crawl_depths = _read_array(f, "i", nodes)
+        except EOFError:
+            raise ValueError(f"Truncated link graph file: {path}")
+        urls = f.read(url_bytes).decode("utf-8")
+
+    graph.urls = urls.split("\n") if nodes else []
+    if len(graph.urls) != nodes:
+        raise ValueError(f"Truncated link graph file: {path}")
+    graph._ids = {url: node for node, url in enumerate(graph.urls)}
+    graph._starts = offsets[:-1]
+    graph._lengths = array("I", map(sub, islice(offsets, 1, None), offsets))
+    graph._edges = targets
+    graph._crawl_depths = crawl_depths
+    graph._csr = (offsets, targets)
+    return graph
@@ -0,0 +1,259 @@
+"""
+Link sinks - stream discovered links to a file while the crawl runs
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+EXPORT_BRACKET = "bracket"
+EXPORT_JSONL = "jsonl"
+EXPORT_CSV = "csv"
+EXPORT_SQLITE = "sqlite"
+
+# Seconds between flushes of buffered links to the output file
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# Buffered links that force a flush before the interval is up
+MAX_BUFFERED = 1000
+
+
+class LinkSink(ABC):
+    """
+    Base class of the link sinks: buffers (url, source, depth) rows and
+    writes them out every flush_interval seconds, so the output file is
+    usable while the crawl runs and no link list has to be kept for export.
+
+    Args:
+        path: Output file
+        flush_interval: Seconds between flushes (0 flushes every write)
+        append: Add to an existing file (a resumed crawl) instead of
+            replacing it
+    """
+
+    format = None
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, append=False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.append = append
+        self.count = 0
+        self._rows = []
+        self._last_flush = time.monotonic()
+        self._open()
+
+    def write(self, links, source=None, depth=None):
+        """
+        Queue the new links found on a page (source, at depth) and flush if
+        the interval is up. An empty list still runs the interval check.
+        """
+        for link in links:
+            self._rows.append((link, source, depth))
+        if self._rows and (
+            len(self._rows) >= MAX_BUFFERED
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered links to the file"""
+        if self._rows:
+            self._write_rows(self._rows)
+            self.count += len(self._rows)
+            self._rows = []
+        self._sync()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush the remaining links and close the file"""
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _resuming(self):
+        """True when appending to a file that already has content"""
+        return self.append and os.path.exists(self.path) and os.path.getsize(self.path)
+
+    @abstractmethod
+    def _open(self):
+        """Open (or create) the output file"""
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        """Write (url, source, depth) rows"""
+
+    @abstractmethod
+    def _sync(self):
+        """Make the rows written so far durable"""
+
+    @abstractmethod
+    def _close(self):
+        """Close the output file"""
+
+
+class _TextSink(LinkSink):
+    """Sink writing to a text file, flushed to the OS on every flush()"""
+
+    def _open(self):
+        resuming = self._resuming()
+        self._file = open(
+            self.path, "a" if self.append else "w", encoding="utf-8", newline=""
+        )
+        if not resuming:
+            self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _sync(self):
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class BracketSink(_TextSink):
+    """The crawler's bracket format: one [url] per line"""
+
+    format = EXPORT_BRACKET
+
+    def _open(self):
+        # Links of the earlier run when appending, counted in the total
+        self.previous_count = self._trim_footer() if self._resuming() else 0
+        super()._open()
+
+    def _trim_footer(self):
+        """Remove the total line of an earlier run; returns its number of links"""
+        count = 0
+        links_end = 0
+        with open(self.path, "rb+") as f:
+            for line in f:
+                if line.startswith(b"["):
+                    count += 1
+                    links_end = f.tell()
+            f.seek(links_end)
+            if f.read().strip().startswith(b"(Total: "):
+                f.truncate(links_end)
+        return count
+
+    def _write_header(self):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._file.write("# Sublinks found by Crawler Toolbox\n")
+        self._file.write(f"# Generated on: {timestamp}\n\n")
+
+    def _write_rows(self, rows):
+        self._file.writelines(f"[{url}]\n" for url, _, _ in rows)
+
+    def close(self):
+        self.flush()
+        # The total is only known now, so it goes at the end
+        total = self.previous_count + self.count
+        if total > 3:
+            self._file.write(f"\n(Total: {total} links)\n")
+        self._close()
+
+
+class JsonlSink(_TextSink):
+    """One JSON object per line: {"url", "source", "depth"}"""
+
+    format = EXPORT_JSONL
+
+    def _write_rows(self, rows):
+        self._file.writelines(
+            json.dumps({"url": url, "source": source, "depth": depth}) + "\n"
+            for url, source, depth in rows
+        )
+
+
+class CsvSink(_TextSink):
+    """CSV with url, source and depth columns"""
+
+    format = EXPORT_CSV
+
+    def _open(self):
+        super()._open()
+        self._writer = csv.writer(self._file)
+
+    def _write_header(self):
+        csv.writer(self._file).writerow(["url", "source", "depth"])
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+
+class SqliteSink(LinkSink):
+    """SQLite table links (url, source, depth), one transaction per flush"""
+
+    format = EXPORT_SQLITE
+
+    def _open(self):
+        if not self.append and os.path.exists(self.path):
+            os.remove(self.path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS links "
+            "(url TEXT PRIMARY KEY, source TEXT, depth INTEGER)"
+        )
+
+    def _write_rows(self, rows):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO links (url, source, depth) VALUES (?, ?, ?)", rows
+        )
+
+    def _sync(self):
+        self._conn.commit()
+
+    def _close(self):
+        self._conn.close()
+
+
+LINK_SINKS = {
+    EXPORT_BRACKET: BracketSink,
+    EXPORT_JSONL: JsonlSink,
+    EXPORT_CSV: CsvSink,
+    EXPORT_SQLITE: SqliteSink,
+}
+
+# Formats picked by file extension when none is given
+EXTENSION_FORMATS = {
+    ".jsonl": EXPORT_JSONL,
+    ".ndjson": EXPORT_JSONL,
+    ".csv": EXPORT_CSV,
+    ".db": EXPORT_SQLITE,
+    ".sqlite": EXPORT_SQLITE,
+    ".sqlite3": EXPORT_SQLITE,
+}
+
+
+def export_format_for_path(path):
+    """Guess the export format from a file name (bracket text by default)"""
+    return EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), EXPORT_BRACKET)
+
+
+def open_link_sink(
+    path, format=None, flush_interval=DEFAULT_FLUSH_INTERVAL, append=False
+):
+    """
+    Open a link sink for path
+
+    Args:
+        path: Output file
+        format: One of LINK_SINKS; None picks it from the file extension
+        flush_interval: Seconds between flushes to the file
+        append: Add to an existing file instead of replacing it
+    """
+    format = format or export_format_for_path(path)
+    try:
+        sink_class = LINK_SINKS[format]
+    except KeyError:
+        raise ValueError(f"Unknown export format: {format}")
+    return sink_class(path, flush_interval, append)
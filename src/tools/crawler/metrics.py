@@ -0,0 +1,247 @@
+"""
+Crawl metrics - latency histograms, throughput and queue depth of a crawl
+"""
+
+import json
+import math
+import threading
+import time
+from collections import Counter
+
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+METRICS_JSON = "json"
+METRICS_PROMETHEUS = "prometheus"
+METRICS_FORMATS = (METRICS_JSON, METRICS_PROMETHEUS)
+
+# Status label for requests that got no HTTP response
+NO_RESPONSE = "error"
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style: cumulative counts per bound)"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.bounds) and value > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Return [(upper bound, observations <= bound)], ending with +Inf"""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        # In the +Inf bucket: the best estimate is the largest finite bound
+        return self.bounds[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": [
+                ["+Inf" if bound == math.inf else bound, count]
+                for bound, count in self.cumulative()
+            ],
+        }
+
+
+class CrawlMetrics:
+    """
+    Structured telemetry of one crawl, safe to update from fetch workers.
+
+    The crawl loop records every completed request (latency, status, bytes)
+    and the queue depths; link extraction records its parse time. snapshot()
+    returns everything as a dictionary, to_json() and to_prometheus() render
+    it for export.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start measuring a new crawl"""
+        with self._lock:
+            self.started = time.monotonic()
+            self.finished = None
+            self.fetch_latency = Histogram(LATENCY_BUCKETS)
+            self.parse_time = Histogram(PARSE_BUCKETS)
+            self.status_counts = Counter()
+            self.pages = 0
+            self.bytes_downloaded = 0
+            self.frontier_size = 0
+            self.in_flight = 0
+            self.parsing = 0
+            self.parked = 0
+
+    def finish(self):
+        """Stop the clock used for pages per second"""
+        with self._lock:
+            self.finished = time.monotonic()
+
+    def record_fetch(self, elapsed, status, size):
+        """Record a completed request: latency, HTTP status (None if none) and body bytes"""
+        with self._lock:
+            self.pages += 1
+            self.fetch_latency.observe(elapsed)
+            self.status_counts[str(status) if status else NO_RESPONSE] += 1
+            self.bytes_downloaded += size
+
+    def record_parse(self, seconds):
+        """Record the time spent extracting one page's links"""
+        with self._lock:
+            self.parse_time.observe(seconds)
+
+    def set_queues(self, frontier, in_flight, parsing=0, parked=0):
+        """Update the queue depth gauges"""
+        with self._lock:
+            self.frontier_size = frontier
+            self.in_flight = in_flight
+            self.parsing = parsing
+            self.parked = parked
+
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dictionary"""
+        with self._lock:
+            elapsed = self.elapsed()
+            return {
+                "elapsed_seconds": elapsed,
+                "pages": self.pages,
+                "pages_per_second": self.pages / elapsed if elapsed > 0 else 0.0,
+                "bytes_downloaded": self.bytes_downloaded,
+                "status_counts": dict(self.status_counts),
+                "fetch_latency_seconds": self.fetch_latency.snapshot(),
+                "parse_seconds": self.parse_time.snapshot(),
+                "frontier_size": self.frontier_size,
+                "in_flight": self.in_flight,
+                "parsing": self.parsing,
+                "parked": self.parked,
+            }
+
+    def to_json(self):
+        """Render the metrics as a JSON document"""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        def histogram(name, help_text, data):
+            samples = [
+                (f'_bucket{{le="{bound}"}}', count) for bound, count in data["buckets"]
+            ]
+            samples.append(("_sum", data["sum"]))
+            samples.append(("_count", data["count"]))
+            metric(name, "histogram", help_text, samples)
+
+        histogram(
+            "crawler_fetch_latency_seconds",
+            "Time from request to response headers.",
+            snapshot["fetch_latency_seconds"],
+        )
+        histogram(
+            "crawler_parse_seconds",
+            "Time spent extracting the links of a page.",
+            snapshot["parse_seconds"],
+        )
+        metric(
+            "crawler_pages_total",
+            "counter",
+            "Completed page requests.",
+            [("", snapshot["pages"])],
+        )
+        metric(
+            "crawler_downloaded_bytes_total",
+            "counter",
+            "Page body bytes downloaded.",
+            [("", snapshot["bytes_downloaded"])],
+        )
+        metric(
+            "crawler_responses_total",
+            "counter",
+            "Completed requests by HTTP status.",
+            [
+                (f'{{status="{status}"}}', count)
+                for status, count in sorted(snapshot["status_counts"].items())
+            ],
+        )
+        for name, key, help_text in (
+            ("crawler_pages_per_second", "pages_per_second", "Average crawl rate."),
+            ("crawler_frontier_size", "frontier_size", "URLs queued for crawling."),
+            ("crawler_in_flight", "in_flight", "Requests in progress."),
+            ("crawler_parsing", "parsing", "Pages waiting for the parse pool."),
+            ("crawler_parked", "parked", "URLs waiting on a host's rate limit."),
+        ):
+            metric(name, "gauge", help_text, [("", snapshot[key])])
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One-line human readable summary (used by the GUI)"""
+        snapshot = self.snapshot()
+        latency = snapshot["fetch_latency_seconds"]
+        p50 = latency["p50"]
+        p95 = latency["p95"]
+        statuses = ", ".join(
+            f"{status}: {count}"
+            for status, count in sorted(snapshot["status_counts"].items())
+        )
+        return (
+            f"{snapshot['pages']} pages, {snapshot['pages_per_second']:.1f}/s | "
+            f"latency p50 {p50 * 1000 if p50 is not None else 0:.0f} ms, "
+            f"p95 {p95 * 1000 if p95 is not None else 0:.0f} ms | "
+            f"parse {snapshot['parse_seconds']['sum']:.1f} s | "
+            f"{snapshot['bytes_downloaded'] / 1024 / 1024:.1f} MiB | "
+            f"frontier {snapshot['frontier_size']}, in flight {snapshot['in_flight']}"
+            + (f" | {statuses}" if statuses else "")
+        )
+
+    def export(self, path, format=METRICS_JSON):
+        """Write the metrics to a file as JSON or Prometheus text"""
+        if format == METRICS_JSON:
+            content = self.to_json()
+        elif format == METRICS_PROMETHEUS:
+            content = self.to_prometheus()
+        else:
+            raise ValueError(f"Unknown metrics format: {format}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
@@ -0,0 +1,132 @@
+"""
+Near duplicates - SimHash fingerprints of page text and an index to find
+pages that differ from an earlier one in only a few bits
+
+Print views, session-parameter mirrors and faceted navigation produce many
+URLs with (nearly) the same content. Each page's visible text is reduced to
+a 64-bit SimHash over word shingles; pages whose fingerprints are within a
+small Hamming distance are treated as duplicates.
+"""
+
+import re
+from hashlib import blake2b
+
+FINGERPRINT_BITS = 64
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Fingerprints at most this many bits apart are near-duplicates
+DEFAULT_MAX_DISTANCE = 3
+
+# Pages with fewer words are not fingerprinted (too little text to compare)
+MIN_WORDS = 20
+
+_SKIPPED_BLOCKS = re.compile(
+    rb"<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(rb"<[^>]*>")
+_WORD = re.compile(r"\w+")
+
+# Offset of each digest byte's 256 counters in the SimHash accumulator
+_BYTE_OFFSETS = tuple(range(0, 8 * 256, 256))
+
+# Set bits of every byte value
+_BYTE_BITS = tuple(
+    tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)
+)
+
+
+def page_words(content):
+    """Lower-cased words of a page's text (markup, scripts and styles removed)"""
+    text = _TAG.sub(b" ", _SKIPPED_BLOCKS.sub(b" ", content))
+    return _WORD.findall(text.decode("utf-8", "replace").lower())
+
+
+def simhash(words, shingle_size=SHINGLE_SIZE):
+    """
+    64-bit SimHash of the word shingles of a text
+
+    Instead of adding +-1 for each of the 64 bits of every shingle hash, the
+    hashes' bytes are counted per position (8 counter increments per
+    shingle); the bit sums are derived from the byte counts at the end.
+    """
+    counts = [0] * (8 * 256)
+    shingles = 0
+    for index in range(max(1, len(words) - shingle_size + 1)):
+        shingle = " ".join(words[index : index + shingle_size]).encode("utf-8")
+        digest = blake2b(shingle, digest_size=8).digest()
+        for offset, byte in zip(_BYTE_OFFSETS, digest):
+            counts[offset + byte] += 1
+        shingles += 1
+
+    fingerprint = 0
+    for position, offset in enumerate(_BYTE_OFFSETS):
+        bit_sums = [0] * 8
+        for byte in range(256):
+            count = counts[offset + byte]
+            if count:
+                for bit in _BYTE_BITS[byte]:
+                    bit_sums[bit] += count
+        for bit in range(8):
+            # The bit is set when most shingle hashes have it set
+            if 2 * bit_sums[bit] > shingles:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def page_fingerprint(content):
+    """SimHash of a page's text, or None if the page has too little text"""
+    words = page_words(content)
+    if len(words) < MIN_WORDS:
+        return None
+    return simhash(words)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    Fingerprints of the pages crawled so far, searchable by Hamming distance.
+
+    The 64 bits are split into max_distance + 1 bands: two fingerprints at
+    most max_distance bits apart agree exactly in at least one band, so a
+    lookup only compares against fingerprints sharing a band value.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = -(-FINGERPRINT_BITS // bands)
+        self._bands = [
+            (start, (1 << min(width, FINGERPRINT_BITS - start)) - 1)
+            for start in range(0, FINGERPRINT_BITS, width)
+        ]
+        self._tables = [{} for _ in self._bands]
+        self._count = 0
+
+    def find(self, fingerprint):
+        """
+        Return (url, distance) of an indexed page near fingerprint, or None
+        """
+        best = None
+        for (start, mask), table in zip(self._bands, self._tables):
+            for other, url in table.get(fingerprint >> start & mask, ()):
+                distance = hamming_distance(fingerprint, other)
+                if distance <= self.max_distance and (
+                    best is None or distance < best[1]
+                ):
+                    best = (url, distance)
+        return best
+
+    def add(self, fingerprint, url):
+        """Index a page's fingerprint"""
+        entry = (fingerprint, url)
+        for (start, mask), table in zip(self._bands, self._tables):
+            table.setdefault(fingerprint >> start & mask, []).append(entry)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,376 @@
+"""
+Page archive - compressed, append-only WARC files of the pages a crawl
+downloads, with an offset index for reading single pages back
+"""
+
+import gzip
+import os
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+WARC_VERSION = "WARC/1.1"
+
+# The offset index is kept next to the archive: <archive path>.idx
+INDEX_SUFFIX = ".idx"
+
+# Seconds between flushes of the archive and its index
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+COMPRESSION_LEVEL = 6
+
+# Bytes read at a time when scanning an archive
+READ_SIZE = 1 << 20
+
+# Response headers about the transfer encoding; the archive stores the
+# decoded body, so they are replaced by its actual Content-Length
+_TRANSFER_HEADERS = frozenset(
+    ("content-encoding", "transfer-encoding", "content-length")
+)
+
+SOFTWARE = "Crawler Toolbox/1.0"
+
+
+def index_path(path):
+    """Path of the offset index of an archive"""
+    return path + INDEX_SUFFIX
+
+
+class ArchiveRecord:
+    """A page read back from an archive"""
+
+    def __init__(self, url, status, headers, body, date, offset=None, length=None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.date = date
+        self.offset = offset
+        self.length = length
+
+    def header(self, name, default=None):
+        """Value of a response header (case-insensitive)"""
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+
+class IndexEntry:
+    """One line of an archive's offset index"""
+
+    def __init__(self, url, offset, length, status, date):
+        self.url = url
+        self.offset = offset
+        self.length = length
+        self.status = status
+        self.date = date
+
+
+class PageArchive:
+    """
+    Writes fetched pages as WARC response records, each compressed as its
+    own gzip member (the usual .warc.gz layout), so a record can be read
+    from its offset without decompressing the records before it.
+
+    Every record's offset and compressed length are appended to the index
+    file (tab-separated: offset, length, status, date, url). Pages are
+    compressed by the calling thread; only the file writes are serialized.
+    The archive is only ever appended to; rebuild_index() recreates a lost
+    or incomplete index.
+
+    Args:
+        path: Archive file (by convention ending in .warc.gz)
+        append: Add to an existing archive (a resumed crawl) instead of
+            replacing it
+        flush_interval: Seconds between flushes to the OS
+    """
+
+    def __init__(self, path, append=False, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        resuming = append and os.path.exists(path) and os.path.getsize(path)
+        mode = "a" if append else "w"
+        self._file = open(path, mode + "b")
+        self._index = open(index_path(path), mode, encoding="utf-8", newline="\n")
+        self._last_flush = time.monotonic()
+        if not resuming:
+            self._file.write(_compress(_warcinfo_record()))
+
+    def write(self, url, status, headers, body):
+        """
+        Archive a downloaded page
+
+        Args:
+            url: Page URL
+            status: HTTP status code
+            headers: Response headers (mapping or (name, value) pairs)
+            body: Decoded response body (bytes)
+        """
+        date = _warc_date()
+        data = _compress(_response_record(url, status, headers, body, date))
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(data)
+            self._index.write(f"{offset}\t{len(data)}\t{status}\t{date}\t{url}\n")
+            self.count += 1
+            self.bytes_written += len(data)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        # The archive first, so the index never points past its end
+        self._file.flush()
+        self._index.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _compress(record):
+    return gzip.compress(record, COMPRESSION_LEVEL, mtime=0)
+
+
+def _warc_date():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _warc_record(warc_type, headers, block):
+    lines = [
+        WARC_VERSION,
+        f"WARC-Type: {warc_type}",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    lines.append(f"Content-Length: {len(block)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+    return head + block + b"\r\n\r\n"
+
+
+def _warcinfo_record():
+    block = f"software: {SOFTWARE}\r\nformat: WARC File Format 1.1\r\n".encode()
+    return _warc_record(
+        "warcinfo",
+        [("WARC-Date", _warc_date()), ("Content-Type", "application/warc-fields")],
+        block,
+    )
+
+
+def _response_record(url, status, headers, body, date):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    items = headers.items() if hasattr(headers, "items") else headers
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines.extend(
+        f"{name}: {value}"
+        for name, value in items
+        if name.lower() not in _TRANSFER_HEADERS
+    )
+    lines.append(f"Content-Length: {len(body)}")
+    block = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8", "replace") + body
+    return _warc_record(
+        "response",
+        [
+            ("WARC-Date", date),
+            ("WARC-Target-URI", url),
+            ("Content-Type", "application/http; msgtype=response"),
+        ],
+        block,
+    )
+
+
+def _parse_headers(lines):
+    headers = []
+    for line in lines:
+        name, _, value = line.partition(":")
+        headers.append((name.strip(), value.strip()))
+    return headers
+
+
+def parse_record(data):
+    """
+    Parse an uncompressed WARC record
+
+    Returns:
+        ArchiveRecord for a response record, None for other record types
+
+    Raises:
+        ValueError: The data is not a WARC record
+    """
+    head, separator, rest = data.partition(b"\r\n\r\n")
+    lines = head.decode("utf-8", "replace").split("\r\n")
+    if not separator or not lines[0].startswith("WARC/"):
+        raise ValueError("Not a WARC record")
+    warc_headers = {name.lower(): value for name, value in _parse_headers(lines[1:])}
+    if warc_headers.get("warc-type") != "response":
+        return None
+
+    block = rest[: int(warc_headers.get("content-length", len(rest)))]
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    http_lines = http_head.decode("utf-8", "replace").split("\r\n")
+    status = int(http_lines[0].split(" ", 2)[1])
+    return ArchiveRecord(
+        warc_headers.get("warc-target-uri"),
+        status,
+        _parse_headers(http_lines[1:]),
+        body,
+        warc_headers.get("warc-date"),
+    )
+
+
+def read_record(path, offset, length):
+    """Read the record at offset (of compressed length) from an archive"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = parse_record(gzip.decompress(f.read(length)))
+    if record is not None:
+        record.offset = offset
+        record.length = length
+    return record
+
+
+def read_index(path):
+    """
+    Read an archive's offset index
+
+    Returns:
+        List of IndexEntry in archive order
+    """
+    entries = []
+    with open(index_path(path), encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t", 4)
+            if len(fields) != 5:
+                # A line cut short by a crash
+                continue
+            offset, length, status, date, url = fields
+            entries.append(IndexEntry(url, int(offset), int(length), int(status), date))
+    return entries
+
+
+class ArchiveReader:
+    """
+    Random access to the pages of an archive by URL, through its index
+
+    Safe to use from several threads: only the file reads are serialized,
+    decompression and parsing run in the calling thread. If a URL was
+    archived more than once (a resumed crawl), the latest record is used.
+
+    Args:
+        path: Archive file with its index next to it
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {entry.url: entry for entry in read_index(path)}
+        self._lock = threading.Lock()
+        self._file = open(path, "rb")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def get(self, url):
+        """
+        Return the archived page of a URL, or None if it was not archived
+
+        Raises:
+            OSError, ValueError, zlib.error: The record cannot be read
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        with self._lock:
+            self._file.seek(entry.offset)
+            data = self._file.read(entry.length)
+        record = parse_record(gzip.decompress(data))
+        if record is not None:
+            record.offset = entry.offset
+            record.length = entry.length
+        return record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_records(path, start=0, end=None):
+    """
+    Yield the response records of an archive by scanning it
+
+    Args:
+        path: Archive file
+        start: Offset of the first record to read
+        end: Stop at the first record starting at or after this offset
+
+    A record cut short at the end of the file (a crashed crawl) is ignored.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        pending = b""
+        while end is None or offset < end:
+            record_start = offset
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            chunks = []
+            while not decompressor.eof:
+                if not pending:
+                    pending = f.read(READ_SIZE)
+                    if not pending:
+                        return
+                chunks.append(decompressor.decompress(pending))
+                offset += len(pending) - len(decompressor.unused_data)
+                pending = decompressor.unused_data
+            record = parse_record(b"".join(chunks))
+            if record is not None:
+                record.offset = record_start
+                record.length = offset - record_start
+                yield record
+
+
+def rebuild_index(path):
+    """
+    Recreate an archive's index from the archive itself
+
+    Returns:
+        Number of records indexed
+    """
+    count = 0
+    with open(index_path(path), "w", encoding="utf-8", newline="\n") as index:
+        for record in iter_records(path):
+            index.write(
+                f"{record.offset}\t{record.length}\t{record.status}\t"
+                f"{record.date}\t{record.url}\n"
+            )
+            count += 1
+    return count
@@ -0,0 +1,97 @@
+"""
+Parse pool - extract links from fetched pages in worker processes
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .link_extractors import get_link_extractor
+from .near_duplicates import page_fingerprint
+from ...utils.url_utils import resolve_link
+
+# Pages waiting for (or in) the parsers per parser process, unless the crawl
+# sets its own limit
+QUEUE_PER_WORKER = 4
+
+# Settings of the crawl this worker process parses for (set by _init_worker)
+_extract_hrefs = None
+_canonical_urls = True
+_strip_params = frozenset()
+_fingerprint_pages = False
+
+
+def _init_worker(link_extractor, canonical_urls, strip_params, fingerprint_pages):
+    global _extract_hrefs, _canonical_urls, _strip_params, _fingerprint_pages
+    _extract_hrefs = get_link_extractor(link_extractor)
+    _canonical_urls = canonical_urls
+    _strip_params = strip_params
+    _fingerprint_pages = fingerprint_pages
+
+
+def _parse_page(url, content):
+    """
+    Extract, resolve and normalize the links of one page (runs in a worker)
+
+    Returns:
+        (set of links, seconds spent parsing, SimHash of the page text or None)
+    """
+    started = time.perf_counter()
+    links = set()
+    for href in _extract_hrefs(content):
+        link = resolve_link(url, href, _canonical_urls, _strip_params)
+        if link:
+            links.add(link)
+    elapsed = time.perf_counter() - started
+    fingerprint = page_fingerprint(content) if _fingerprint_pages else None
+    return links, elapsed, fingerprint
+
+
+class ParsePool:
+    """
+    Process pool that turns fetched page bodies into link sets, so HTML
+    parsing runs on all cores instead of under the crawl's GIL.
+
+    The crawl loop hands pages over with submit() and stops dispatching
+    fetches while max_queued pages are waiting for a parser, which bounds the
+    page bodies held in memory and keeps fetching from outrunning parsing.
+    """
+
+    def __init__(
+        self,
+        workers,
+        link_extractor,
+        canonical_urls=True,
+        strip_params=frozenset(),
+        max_queued=None,
+        fingerprint_pages=False,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued or workers * QUEUE_PER_WORKER
+        # Worker processes are spawned, not forked: the crawl runs next to
+        # GUI and fetcher threads whose state a fork would copy mid-flight
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                link_extractor,
+                canonical_urls,
+                frozenset(strip_params),
+                fingerprint_pages,
+            ),
+        )
+
+    def submit(self, url, content):
+        """
+        Queue a page for parsing
+
+        Returns:
+            concurrent.futures.Future of (set of links, parse seconds,
+            page fingerprint or None)
+        """
+        return self._executor.submit(_parse_page, url, content)
+
+    def shutdown(self):
+        """Stop the worker processes, abandoning pages not yet parsed"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
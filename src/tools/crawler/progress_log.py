@@ -0,0 +1,109 @@
+"""
+Progress log - coalesces crawler progress messages for display in a GUI
+"""
+
+import threading
+from collections import Counter, deque
+
+# Lines of progress kept (older lines are dropped)
+DEFAULT_MAX_LINES = 500
+
+# Per-page messages that are counted instead of logged: prefix -> counter
+COUNTED_MESSAGES = (
+    ("Crawling [", "pages"),
+    ("Skipped by", "skipped"),
+    ("Skipped non-HTML", "skipped"),
+    ("Skipped oversized", "skipped"),
+    ("Skipped, host is failing", "skipped"),
+    ("Skipped, not in archive", "skipped"),
+    ("Near-duplicate of", "duplicates"),
+)
+
+ERROR_PREFIX = "ERROR: "
+
+
+class ProgressLog:
+    """
+    Thread-safe buffer between the crawl thread and the progress widget.
+
+    The crawl thread post()s messages; the GUI drain()s them at its own
+    frame rate. Per-page messages (see COUNTED_MESSAGES) only update
+    counters and the status line, everything else becomes a log line. At
+    most max_lines lines are buffered, so a burst between two frames cannot
+    grow without bound.
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES):
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._scheduled = False
+        self.counters = Counter()
+        self.status = ""
+
+    def post(self, message, error=False):
+        """
+        Add a message from any thread
+
+        Returns:
+            True if the caller should schedule a drain (none is pending yet)
+        """
+        with self._lock:
+            if error:
+                self.counters["errors"] += 1
+                self._append(ERROR_PREFIX + message)
+            else:
+                for prefix, counter in COUNTED_MESSAGES:
+                    if message.startswith(prefix):
+                        self.counters[counter] += 1
+                        if counter == "pages":
+                            self.status = message
+                        break
+                else:
+                    self._append(message)
+
+            schedule = not self._scheduled
+            self._scheduled = True
+            return schedule
+
+    def _append(self, line):
+        if len(self._lines) == self.max_lines:
+            self._dropped += 1
+        self._lines.append(line)
+
+    def drain(self):
+        """
+        Take the buffered lines (called from the GUI thread)
+
+        Returns:
+            (lines, number of lines dropped since the last drain)
+        """
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped = self._dropped
+            self._dropped = 0
+            self._scheduled = False
+            return lines, dropped
+
+    def summary(self):
+        """One-line status: the counters and the page crawled last"""
+        with self._lock:
+            parts = [
+                f"{self.counters['pages']} pages",
+                f"{self.counters['skipped']} skipped",
+                f"{self.counters['duplicates']} duplicates",
+                f"{self.counters['errors']} errors",
+            ]
+            if self.status:
+                parts.append(self.status)
+            return " | ".join(parts)
+
+    def reset(self):
+        """Forget buffered lines, counters and status (a new crawl)"""
+        with self._lock:
+            self._lines.clear()
+            self._dropped = 0
+            self.counters.clear()
+            self.status = ""
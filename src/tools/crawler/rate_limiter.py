@@ -0,0 +1,490 @@
+"""
+Host scheduler - per-host politeness for the crawler
+
+Each host gets a token bucket and an adaptive concurrency limit. The bucket
+starts at one request per request_delay; while responses are fast and
+healthy the interval shrinks (down to the robots.txt Crawl-delay, which is
+never undercut) and the concurrency limit grows. When the host slows down
+or fails the interval goes back to request_delay, and 429/503 answers back
+it off further. A circuit breaker pauses a host while most of its recent
+requests time out or fail with 5xx errors, and probes it to see whether it
+has recovered.
+
+robots.txt files are downloaded on worker threads, so a slow or unreachable
+one holds up only its own host.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+# acquire() result when the host has no free concurrency slot; the host is
+# retried as soon as one of its requests completes
+WAIT_FOR_SLOT = math.inf
+
+# Status codes that mean "slow down"
+BACKOFF_STATUSES = (429, 503)
+
+# Backoff used when a 429/503 carries no usable Retry-After
+DEFAULT_BACKOFF = 5.0
+MAX_BACKOFF = 300.0
+
+# Interval factor per healthy response: halving until the first sign of
+# trouble, then a slower ramp
+SLOW_START_FACTOR = 0.5
+HEALTHY_FACTOR = 0.9
+
+# Concurrency a host starts with (capped by the crawl's per-host limit)
+INITIAL_CONCURRENCY = 2
+
+# A response is healthy while the smoothed latency stays within this factor
+# of the best smoothed latency seen for the host, or within LATENCY_SLACK
+# seconds of it (a few milliseconds more on a fast host is noise)
+HEALTHY_LATENCY_FACTOR = 2.0
+LATENCY_SLACK = 0.05
+LATENCY_SMOOTHING = 0.3
+
+ROBOTS_TIMEOUT = 10
+# robots.txt files downloaded at once
+ROBOTS_WORKERS = 4
+
+# Circuit breaker: a host's circuit opens when at least failure_limit of its
+# last ERROR_WINDOW requests failed (no response or 5xx) and they are at least
+# ERROR_RATE_LIMIT of them. After the cooldown a single probe request goes
+# through: success closes the circuit, failure opens it again for twice as
+# long (up to MAX_HOST_COOLDOWN).
+DEFAULT_FAILURE_LIMIT = 5
+ERROR_WINDOW = 20
+ERROR_RATE_LIMIT = 0.5
+DEFAULT_HOST_COOLDOWN = 30.0
+MAX_HOST_COOLDOWN = 600.0
+
+# Circuit openings in a row (no probe succeeding in between) after which a
+# host counts as failing: its URLs are skipped once nothing else is left
+MAX_CIRCUIT_TRIPS = 3
+
+# Circuit states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) to seconds, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def parse_crawl_delay(lines, user_agent):
+    """
+    Find the Crawl-delay (seconds) that applies to user_agent in robots.txt lines
+
+    RobotFileParser only understands whole seconds, so fractional delays such
+    as "Crawl-delay: 0.5" are read here. Agent matching follows
+    RobotFileParser: a group applies if its name is part of the user agent's
+    product token; "*" is the fallback.
+    """
+    product = user_agent.split("/")[0].lower()
+    delays = {}
+    group = []
+    in_rules = False
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = (part.strip() for part in line.split(":", 1))
+        field = field.lower()
+        if field == "user-agent":
+            if in_rules:
+                group = []
+                in_rules = False
+            group.append(value.lower())
+        else:
+            in_rules = True
+            if field == "crawl-delay":
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in group:
+                    delays.setdefault(agent, delay)
+
+    for agent, delay in delays.items():
+        if agent != "*" and agent in product:
+            return delay
+    return delays.get("*")
+
+
+class HostState:
+    """Token bucket, adaptive concurrency and robots.txt rules for one host"""
+
+    def __init__(self, interval, max_concurrency, robots=None, min_interval=0.0):
+        self.interval = interval
+        self.base_interval = interval
+        self.min_interval = min_interval
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+
+        self.active = 0
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(INITIAL_CONCURRENCY, max_concurrency)
+        self.slow_start = True
+        self.healthy_streak = 0
+
+        self.latency = None
+        self.best_latency = None
+        self.robots = robots
+
+        # Circuit breaker
+        self.circuit = CIRCUIT_CLOSED
+        # Recent outcomes (True for a failure) while the circuit is closed
+        self.outcomes = deque(maxlen=ERROR_WINDOW)
+        self.trips = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def refill(self, now):
+        """Add the tokens earned since the last refill (bucket size is one request)"""
+        if self.interval <= 0:
+            self.tokens = 1.0
+        else:
+            elapsed = now - self.refilled_at
+            self.tokens = min(1.0, self.tokens + elapsed / self.interval)
+        self.refilled_at = now
+
+
+class HostScheduler:
+    """
+    Decides when a request to a host may start.
+
+    The crawl loop calls host_ready() and allowed() before queueing a URL
+    for a host, acquire() before dispatching it and release() when the
+    response is in. All calls come from the crawl loop thread; robots.txt
+    files are fetched on a small thread pool with the crawler's session.
+    """
+
+    def __init__(
+        self,
+        session,
+        request_delay=0.0,
+        max_concurrency=1,
+        respect_robots=True,
+        log=None,
+        failure_limit=DEFAULT_FAILURE_LIMIT,
+        cooldown=DEFAULT_HOST_COOLDOWN,
+    ):
+        self.session = session
+        self.request_delay = request_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.respect_robots = respect_robots
+        self.log = log
+        self.failure_limit = failure_limit
+        self.cooldown = cooldown
+        self.hosts = {}
+        self._lock = threading.Lock()
+        # Hosts whose robots.txt is being fetched, and the threads doing it
+        self._robots_pending = {}
+        self._robots_executor = None
+
+        # Counters
+        self.backoffs = 0
+        self.robots_blocked = 0
+        self.circuit_trips = 0
+
+    def _user_agent(self):
+        return self.session.headers.get("User-Agent", "*")
+
+    def _fetch_robots(self, scheme, host):
+        """
+        Download and parse robots.txt; unreachable files allow everything
+
+        Returns:
+            (RobotFileParser, crawl delay in seconds or None)
+        """
+        robots = RobotFileParser(f"{scheme}://{host}/robots.txt")
+        crawl_delay = None
+        try:
+            response = self.session.get(robots.url, timeout=ROBOTS_TIMEOUT)
+        except requests.RequestException:
+            robots.allow_all = True
+            return robots, crawl_delay
+
+        # Same rules as RobotFileParser.read(): auth errors forbid the whole
+        # site, any other error means there are no rules
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            robots.allow_all = True
+        else:
+            lines = response.text.splitlines()
+            robots.parse(lines)
+            crawl_delay = parse_crawl_delay(lines, self._user_agent())
+            if crawl_delay is None:
+                rate = robots.request_rate(self._user_agent())
+                if rate and rate.requests:
+                    crawl_delay = rate.seconds / rate.requests
+        return robots, crawl_delay
+
+    def _new_host(self, robots=None, crawl_delay=None):
+        """HostState starting at request_delay, never faster than crawl_delay"""
+        crawl_delay = crawl_delay or 0.0
+        return HostState(
+            max(self.request_delay, crawl_delay),
+            self.max_concurrency,
+            robots,
+            min_interval=crawl_delay,
+        )
+
+    def _set_up_host(self, scheme, host):
+        """Fetch a host's robots.txt (on a worker thread) and add its HostState"""
+        try:
+            robots, crawl_delay = self._fetch_robots(scheme, host)
+        except Exception as e:
+            # Unreadable robots.txt: no rules, as if it were unreachable
+            robots, crawl_delay = None, None
+            if self.log:
+                self.log(f"Could not read robots.txt of {host}: {e}")
+        if crawl_delay and self.log:
+            self.log(f"robots.txt crawl delay for {host}: {crawl_delay:g}s")
+
+        state = self._new_host(robots, crawl_delay)
+        with self._lock:
+            self.hosts[host] = state
+            del self._robots_pending[host]
+
+    def host_ready(self, url):
+        """
+        Make sure a URL's host is set up, starting its robots.txt download
+
+        Returns:
+            None if the host is ready for allowed() and acquire(), otherwise
+            a Future that completes once its robots.txt is in (the same one
+            for every URL of the host)
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc
+        with self._lock:
+            if host in self.hosts:
+                return None
+            future = self._robots_pending.get(host)
+            if future is not None:
+                return future
+            if not self.respect_robots:
+                self.hosts[host] = self._new_host()
+                return None
+            if self._robots_executor is None:
+                self._robots_executor = ThreadPoolExecutor(
+                    ROBOTS_WORKERS, thread_name_prefix="crawler-robots"
+                )
+            future = self._robots_executor.submit(
+                self._set_up_host, parsed.scheme, host
+            )
+            self._robots_pending[host] = future
+            return future
+
+    def allowed(self, url):
+        """Check robots.txt permission for a URL whose host is ready"""
+        state = self.hosts[urlparse(url).netloc]
+        if state.robots is None or state.robots.can_fetch(self._user_agent(), url):
+            return True
+        self.robots_blocked += 1
+        return False
+
+    def close(self):
+        """Stop the robots.txt downloads still running"""
+        if self._robots_executor is not None:
+            self._robots_executor.shutdown(wait=False, cancel_futures=True)
+            self._robots_executor = None
+
+    def acquire(self, host, now=None):
+        """
+        Try to start a request to a host
+
+        Returns:
+            0 if the request may start now (a slot and a token are taken),
+            otherwise the number of seconds to wait, or WAIT_FOR_SLOT if the
+            host is at its concurrency limit
+        """
+        state = self.hosts[host]
+        now = time.monotonic() if now is None else now
+
+        if state.circuit == CIRCUIT_OPEN:
+            if now < state.open_until:
+                return state.open_until - now
+            # Cooldown over: let a single probe request through
+            state.circuit = CIRCUIT_HALF_OPEN
+        if state.circuit == CIRCUIT_HALF_OPEN and state.active:
+            return WAIT_FOR_SLOT
+
+        if state.active >= state.concurrency:
+            return WAIT_FOR_SLOT
+        if now < state.blocked_until:
+            return state.blocked_until - now
+
+        state.refill(now)
+        if state.tokens < 1.0:
+            return (1.0 - state.tokens) * state.interval
+
+        state.tokens -= 1.0
+        state.active += 1
+        return 0
+
+    def release(self, host, elapsed, status=None, retry_after=None, now=None):
+        """Record a finished request and adapt the host's rate and concurrency"""
+        state = self.hosts[host]
+        now = time.monotonic() if now is None else now
+        state.active -= 1
+        self._track_failures(host, state, now, status is None or status >= 500)
+
+        if status in BACKOFF_STATUSES:
+            self._back_off(host, state, now, retry_after)
+            return
+
+        if status is None or status >= 500:
+            # Host is failing: back to the starting rate
+            state.slow_start = False
+            state.interval = max(state.interval, state.base_interval)
+            return
+        if status >= 400:
+            # Client errors say nothing about how fast the host is
+            return
+
+        if state.latency is None:
+            state.latency = elapsed
+        else:
+            state.latency += LATENCY_SMOOTHING * (elapsed - state.latency)
+        if state.best_latency is None or state.latency < state.best_latency:
+            state.best_latency = state.latency
+
+        if state.latency > max(
+            HEALTHY_LATENCY_FACTOR * state.best_latency,
+            state.best_latency + LATENCY_SLACK,
+        ):
+            # Host is slowing down: ease off before it starts refusing us
+            state.healthy_streak = 0
+            state.slow_start = False
+            state.concurrency = max(1, state.concurrency - 1)
+            state.interval = max(state.interval, state.base_interval)
+            return
+
+        # Healthy: shorten the interval (past request_delay, but never below
+        # the Crawl-delay) and ramp concurrency up, doubling until the first
+        # sign of trouble, one at a time afterwards
+        factor = SLOW_START_FACTOR if state.slow_start else HEALTHY_FACTOR
+        state.interval = max(state.min_interval, state.interval * factor)
+        state.healthy_streak += 1
+        if state.healthy_streak >= state.concurrency:
+            state.healthy_streak = 0
+            if state.slow_start:
+                state.concurrency = min(state.max_concurrency, state.concurrency * 2)
+            else:
+                state.concurrency = min(state.max_concurrency, state.concurrency + 1)
+
+    def _track_failures(self, host, state, now, failed):
+        """Circuit breaker: open the host's circuit while most requests fail"""
+        state.requests += 1
+        state.errors += failed
+        if state.circuit == CIRCUIT_OPEN or not self.failure_limit:
+            # Requests sent before the circuit opened say nothing new
+            return
+
+        if state.circuit == CIRCUIT_HALF_OPEN:
+            if failed:
+                self._open_circuit(host, state, now, "probe request failed")
+            else:
+                state.circuit = CIRCUIT_CLOSED
+                state.trips = 0
+                if self.log:
+                    self.log(f"{host} is responding again, circuit closed")
+            return
+
+        state.outcomes.append(failed)
+        failures = sum(state.outcomes)
+        if (
+            failures >= self.failure_limit
+            and failures >= ERROR_RATE_LIMIT * len(state.outcomes)
+        ):
+            self._open_circuit(
+                host,
+                state,
+                now,
+                f"{failures} of its last {len(state.outcomes)} requests failed",
+            )
+
+    def _open_circuit(self, host, state, now, reason):
+        """Pause a host for a cooldown that doubles each time in a row"""
+        state.trips += 1
+        self.circuit_trips += 1
+        cooldown = min(MAX_HOST_COOLDOWN, self.cooldown * 2 ** (state.trips - 1))
+        state.circuit = CIRCUIT_OPEN
+        state.open_until = now + cooldown
+        state.outcomes.clear()
+        if self.log:
+            self.log(f"{host}: {reason}, pausing it for {cooldown:g}s (circuit open)")
+
+    def failing(self, host):
+        """True if a host's circuit keeps opening without a probe succeeding"""
+        state = self.hosts.get(host)
+        return (
+            state is not None
+            and state.circuit != CIRCUIT_CLOSED
+            and state.trips >= MAX_CIRCUIT_TRIPS
+        )
+
+    def _back_off(self, host, state, now, retry_after):
+        """Halve concurrency and pause the host after a 429/503"""
+        self.backoffs += 1
+        state.slow_start = False
+        state.healthy_streak = 0
+        state.concurrency = max(1, state.concurrency // 2)
+        state.interval = min(
+            MAX_BACKOFF, max(state.interval * 2, state.base_interval, 0.5)
+        )
+
+        delay = retry_after if retry_after is not None else DEFAULT_BACKOFF
+        delay = min(MAX_BACKOFF, delay)
+        state.blocked_until = max(state.blocked_until, now + delay)
+        if self.log:
+            self.log(
+                f"Backing off {host} for {delay:g}s "
+                f"(concurrency {state.concurrency}, interval {state.interval:g}s)"
+            )
+
+    def stats(self):
+        """Return scheduler counters and per-host concurrency as a dictionary"""
+        return {
+            "hosts": len(self.hosts),
+            "backoffs": self.backoffs,
+            "robots_blocked": self.robots_blocked,
+            "circuit_trips": self.circuit_trips,
+            "circuits": {
+                host: state.circuit
+                for host, state in self.hosts.items()
+                if state.circuit != CIRCUIT_CLOSED
+            },
+            "error_rates": {
+                host: state.errors / state.requests
+                for host, state in self.hosts.items()
+                if state.requests
+            },
+            "concurrency": {
+                host: state.concurrency for host, state in self.hosts.items()
+            },
+        }
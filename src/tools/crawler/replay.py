@@ -0,0 +1,142 @@
+"""
+Replay Crawler - re-runs a crawl against a page archive instead of the network
+"""
+
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+
+from requests.structures import CaseInsensitiveDict
+
+from .page_archive import ArchiveReader
+from .sublink_crawler import (
+    SublinkCrawler,
+    PageResult,
+    SKIP_NON_HTML,
+    is_html_content_type,
+)
+
+SKIP_NOT_ARCHIVED = "not_archived"
+
+
+def default_parse_workers():
+    """One parser process per core (none on a single core machine)"""
+    cores = os.cpu_count() or 1
+    return cores if cores > 1 else 0
+
+
+class ReplayCrawler(SublinkCrawler):
+    """
+    SublinkCrawler whose pages come from a PageArchive written by an earlier
+    crawl(archive_path=...), so changed URL rules, normalization or link
+    extraction can be tried on a whole crawl without network access.
+
+    Traversal is the regular crawl loop. Pages missing from the archive
+    (newly included by the changed rules) count as 404 and are reported.
+    robots.txt, request delays and sitemaps need the network and are not
+    used: the captured crawl already applied them. Links are extracted by
+    one parser process per core unless parse_workers is given.
+
+    Args:
+        archive_path: Archive to replay (its .idx index must exist; see
+            page_archive.rebuild_index)
+    """
+
+    # Archive reads in flight (decompression runs outside the GIL)
+    default_workers = 8
+
+    def __init__(self, archive_path):
+        super().__init__()
+        self.archive_path = archive_path
+        self.reader = None
+
+    def crawl(self, start_url=None, **options):
+        """
+        Replay a crawl; takes the options of SublinkCrawler.crawl()
+
+        Args:
+            start_url: Defaults to the first page of the archive
+            max_pages: Defaults to the number of archived pages
+        """
+        if options.get("archive_path"):
+            raise ValueError("A replay reads an archive, it cannot write one")
+        if options.get("sitemaps"):
+            raise ValueError("Sitemaps are not archived and cannot be replayed")
+        options.update(request_delay=0, respect_robots=False)
+        options.setdefault("parse_workers", default_parse_workers())
+
+        with self._open_reader():
+            if start_url is None:
+                if not self.reader.entries:
+                    self._log_error(f"No pages in archive {self.archive_path}")
+                    return []
+                start_url = next(iter(self.reader.entries))
+            options.setdefault("max_pages", len(self.reader))
+            links = super().crawl(start_url, **options)
+        self._log_missing()
+        return links
+
+    def resume(self, checkpoint_path, **options):
+        """Continue a checkpointed crawl from the archive (see SublinkCrawler.resume)"""
+        if options.get("archive_path"):
+            raise ValueError("A replay reads an archive, it cannot write one")
+        options.update(request_delay=0, respect_robots=False)
+        with self._open_reader():
+            links = super().resume(checkpoint_path, **options)
+        self._log_missing()
+        return links
+
+    @contextmanager
+    def _open_reader(self):
+        self.reader = ArchiveReader(self.archive_path)
+        self._log_progress(
+            f"Replaying {len(self.reader)} archived pages from {self.archive_path}"
+        )
+        try:
+            yield self.reader
+        finally:
+            self.reader.close()
+            self.reader = None
+
+    def _log_missing(self):
+        missing = self.skip_counts[SKIP_NOT_ARCHIVED]
+        if missing:
+            self._log_progress(f"Pages not in the archive: {missing}")
+
+    def _replay_page(self, url):
+        """Read a page from the archive and extract its links"""
+        started = time.monotonic()
+        try:
+            record = self.reader.get(url)
+        except (OSError, ValueError, zlib.error) as e:
+            self._log_error(f"Error reading {url} from the archive: {str(e)}")
+            return self._failed_page(started)
+
+        if record is None:
+            self._record_skip(SKIP_NOT_ARCHIVED, f"Skipped, not in archive: {url}")
+            return PageResult(
+                status=HTTPStatus.NOT_FOUND, elapsed=time.monotonic() - started
+            )
+
+        result = PageResult(status=record.status, elapsed=time.monotonic() - started)
+        headers = CaseInsensitiveDict(record.headers)
+        content_type = headers.get("Content-Type", "")
+        if not is_html_content_type(content_type):
+            self._record_skip(
+                SKIP_NON_HTML, f"Skipped non-HTML page ({content_type}): {url}"
+            )
+            return result
+        try:
+            return self._finish_page(result, url, record.body, headers)
+        except Exception as e:
+            self._log_error(f"Error parsing {url}: {str(e)}")
+            return self._failed_page(started)
+
+    def _open_fetcher(self, workers):
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay")
+
+    def _submit_fetch(self, fetcher, url):
+        return fetcher.submit(self._replay_page, url)
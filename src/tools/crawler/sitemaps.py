@@ -0,0 +1,187 @@
+"""
+Sitemaps - discover and stream-parse sitemap.xml files for URL discovery
+"""
+
+import zlib
+from collections import deque
+from urllib.parse import urljoin, urlparse
+
+import requests
+from lxml import etree
+
+# Paths tried when robots.txt does not list any sitemap
+WELL_KNOWN_SITEMAPS = ("/sitemap.xml", "/sitemap_index.xml", "/sitemap.xml.gz")
+
+# Upper bound on sitemap files read for one site (index files included)
+MAX_SITEMAPS = 1000
+
+SITEMAP_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Namespaces of the <loc> elements that list pages and sitemaps (None for
+# sitemaps without one); extensions such as <image:loc> use their own
+SITEMAP_NAMESPACES = (
+    "http://www.sitemaps.org/schemas/sitemap/0.9",
+    "http://www.google.com/schemas/sitemap/0.84",
+    None,
+)
+SITEMAP_ENTRIES = ("url", "sitemap")
+
+
+class SitemapReader:
+    """
+    Finds a site's sitemaps and yields the page URLs they list.
+
+    Sitemaps are streamed and parsed incrementally, so multi-megabyte (and
+    gzipped) sitemaps are never held in memory; sitemap index files are
+    followed breadth-first.
+    """
+
+    def __init__(self, session, log=None, error=None, should_continue=None):
+        self.session = session
+        self.log = log
+        self.error = error
+        self.should_continue = should_continue or (lambda: True)
+
+        # Counters
+        self.sitemaps_read = 0
+        self.urls_listed = 0
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
+
+    def _error(self, message):
+        if self.error:
+            self.error(message)
+
+    def discover(self, start_url):
+        """
+        Return the sitemap URLs for start_url's site
+
+        Sitemaps listed in robots.txt are preferred; otherwise the well-known
+        locations that exist are returned.
+        """
+        parsed = urlparse(start_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+
+        try:
+            response = self.session.get(f"{root}/robots.txt", timeout=SITEMAP_TIMEOUT)
+            if response.ok:
+                lines = (line.strip() for line in response.text.splitlines())
+                listed = [
+                    line.split(":", 1)[1].strip()
+                    for line in lines
+                    if line.lower().startswith("sitemap:")
+                ]
+                listed = [urljoin(root, url) for url in listed if url]
+                if listed:
+                    return listed
+        except requests.RequestException:
+            pass
+
+        found = []
+        for path in WELL_KNOWN_SITEMAPS:
+            url = root + path
+            try:
+                # Only the status is needed; the body is left unread
+                with self.session.get(
+                    url, timeout=SITEMAP_TIMEOUT, stream=True
+                ) as response:
+                    if response.ok:
+                        found.append(url)
+            except requests.RequestException:
+                continue
+        return found
+
+    def _iter_chunks(self, response):
+        """Decoded body chunks of a sitemap response, gunzipping .gz sitemaps"""
+        # Content-Encoding: gzip is undone by requests; a gzipped sitemap file
+        # served as-is still starts with the gzip magic number
+        decompressor = None
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if decompressor is None:
+                if chunk[:2] != GZIP_MAGIC:
+                    decompressor = False
+                else:
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            yield decompressor.decompress(chunk) if decompressor else chunk
+        if decompressor:
+            yield decompressor.flush()
+
+    def _parse(self, response, sitemap_queue):
+        """
+        Stream one sitemap: page URLs are yielded, nested sitemaps (from a
+        sitemap index) are appended to sitemap_queue
+        """
+        parser = etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True, recover=True
+        )
+        location = None
+        for chunk in self._iter_chunks(response):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if not isinstance(element.tag, str):
+                    continue
+
+                tag = etree.QName(element)
+                name = tag.localname
+                if name == "loc":
+                    # Only the entry's own <loc>, not one of an extension
+                    # element inside it (<image:image><image:loc>...)
+                    parent = element.getparent()
+                    if (
+                        tag.namespace in SITEMAP_NAMESPACES
+                        and parent is not None
+                        and etree.QName(parent).localname in SITEMAP_ENTRIES
+                    ):
+                        location = (element.text or "").strip()
+                    continue
+                if name not in SITEMAP_ENTRIES:
+                    continue
+
+                if location:
+                    if name == "sitemap":
+                        sitemap_queue.append(location)
+                    else:
+                        self.urls_listed += 1
+                        yield location
+                location = None
+
+                # Free the entries parsed so far to keep memory flat
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    def iter_urls(self, sitemap_urls):
+        """Yield every page URL listed by the given sitemaps (following indexes)"""
+        sitemap_queue = deque(sitemap_urls)
+        seen = set()
+        while sitemap_queue and self.should_continue():
+            sitemap_url = sitemap_queue.popleft()
+            if sitemap_url in seen:
+                continue
+            if len(seen) >= MAX_SITEMAPS:
+                self._log(f"Sitemap limit ({MAX_SITEMAPS}) reached")
+                break
+            seen.add(sitemap_url)
+
+            self._log(f"Reading sitemap: {sitemap_url}")
+            try:
+                with self.session.get(
+                    sitemap_url, timeout=SITEMAP_TIMEOUT, stream=True
+                ) as response:
+                    response.raise_for_status()
+                    self.sitemaps_read += 1
+                    for url in self._parse(response, sitemap_queue):
+                        if not self.should_continue():
+                            return
+                        yield url
+            except requests.RequestException as e:
+                self._error(f"Error fetching sitemap {sitemap_url}: {str(e)}")
+            except (etree.LxmlError, zlib.error) as e:
+                self._error(f"Error parsing sitemap {sitemap_url}: {str(e)}")
@@ -2,25 +2,174 @@
 Sublink Crawler - Core crawling functionality
 """
 
+import csv
 import requests
-from bs4 import BeautifulSoup
 import time
 import threading
+import queue
+import heapq
+import posixpath
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
+from .frontier import CrawlFrontier
+from .checkpoint import CrawlCheckpoint
+from .coordinator import CrawlCoordinator, SharedFrontier
+from .metrics import METRICS_JSON, CrawlMetrics
+from .http_pool import (
+    ACCEPT_ENCODING,
+    DEFAULT_CONNECT_RETRIES,
+    DEFAULT_DNS_TTL,
+    CrawlerHTTPAdapter,
+    DnsCache,
+    PoolStats,
+)
+from .link_extractors import DEFAULT_EXTRACTOR, get_link_extractor
+from .sitemaps import SitemapReader
+from .parse_pool import ParsePool
+from .near_duplicates import DEFAULT_MAX_DISTANCE, NearDuplicateIndex, page_fingerprint
+from .url_rules import RULE_PREFIX, UrlRules, parse_rule
+from .page_archive import PageArchive
+from .link_graph import LinkGraph
+from .trap_detector import (
+    DEFAULT_MAX_QUERY_VALUES,
+    DEFAULT_MAX_SEQUENCE,
+    DEFAULT_MAX_URL_LENGTH,
+    TrapDetector,
+)
+from .link_sinks import (
+    DEFAULT_FLUSH_INTERVAL,
+    EXPORT_BRACKET,
+    export_format_for_path,
+    open_link_sink,
+)
+from .url_store import DEFAULT_BLOOM_CAPACITY, URL_STORE_EXACT, create_url_stores
+from .rate_limiter import (
+    BACKOFF_STATUSES,
+    DEFAULT_FAILURE_LIMIT,
+    DEFAULT_HOST_COOLDOWN,
+    WAIT_FOR_SLOT,
+    HostScheduler,
+    parse_retry_after,
+)
 from ...utils.url_utils import (
-    normalize_url,
-    is_valid_url,
-    resolve_relative_url,
-    url_matches_prefix,
+    DEFAULT_TRACKING_PARAMS,
+    canonicalize_url,
+    resolve_link,
+    get_domain_from_url,
     clean_url_for_display,
 )
 
+# requests' HTTPAdapter default; raised when more workers than this share a host
+DEFAULT_POOL_SIZE = 10
+
+# Completed pages between crawl checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 50
+
+# Fetch limits
+CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Content types parsed for links; anything else is dropped unread
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# URL extensions that are never HTML pages, skipped without a request
+DEFAULT_SKIP_EXTENSIONS = frozenset(
+    (
+        # Documents and data
+        ".pdf .doc .docx .xls .xlsx .ppt .pptx .odt .csv .epub "
+        # Archives and binaries
+        ".zip .gz .tgz .bz2 .xz .tar .rar .7z .exe .msi .dmg .iso .bin .apk .deb .rpm "
+        # Images
+        ".jpg .jpeg .png .gif .bmp .webp .svg .ico .tif .tiff "
+        # Audio and video
+        ".mp3 .wav .ogg .flac .m4a .mp4 .m4v .avi .mov .mkv .webm .wmv .flv "
+        # Web assets
+        ".css .js .woff .woff2 .ttf .otf .eot"
+    ).split()
+)
+
+# Times a page answered with 429/503 is retried before giving up on it
+MAX_BACKOFF_RETRIES = 3
+
+# Sitemap modes for crawl(sitemaps=...)
+SITEMAPS_SEED = "seed"
+SITEMAPS_ONLY = "only"
+
+# Skip reasons counted in SublinkCrawler.skip_counts
+SKIP_EXTENSION = "extension"
+SKIP_ROBOTS = "robots"
+SKIP_NON_HTML = "non_html"
+SKIP_TOO_LARGE = "too_large"
+SKIP_FAILING_HOST = "failing_host"
+
+
+def is_html_content_type(content_type):
+    """Check whether a Content-Type header denotes an HTML page (missing counts as HTML)"""
+    if not content_type:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type in HTML_CONTENT_TYPES
+
+
+def get_url_extension(url):
+    """Return the lower-cased file extension of a URL's path (e.g. ".pdf")"""
+    return posixpath.splitext(urlparse(url).path)[1].lower()
+
+
+class PageResult:
+    """
+    Outcome of fetching one page: its links plus what the server told us.
+
+    When the crawl parses in a ParsePool, a downloaded page comes back with
+    its body in content (and its response headers) instead of links.
+    """
+
+    def __init__(self, links=None, status=None, elapsed=0.0, retry_after=None):
+        self.links = links if links is not None else set()
+        self.status = status
+        self.elapsed = elapsed
+        self.retry_after = retry_after
+        self.size = 0
+        self.content = None
+        self.headers = None
+        self.fingerprint = None
+
 
 class SublinkCrawler:
+    # Pages fetched concurrently when crawl() is not given workers
+    default_workers = 1
+
     def __init__(self):
         self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
         self.crawled_urls = set()
         self.found_links = set()
+        self.frontier = None
+        self.http_cache = None
+        self.extract_hrefs = get_link_extractor(DEFAULT_EXTRACTOR)
+        self.canonical_urls = True
+        self.strip_params = DEFAULT_TRACKING_PARAMS
+        self.parse_pool = None
+        self.fingerprint_pages = False
+        self.duplicate_pages = []
+        self.trap_detector = None
+        self.link_graph = None
+        self.url_rules = None
+        self.link_sink = None
+        self.archive = None
+        self.keep_links = True
+        self.metrics = CrawlMetrics()
+        self.pool_stats = PoolStats()
+        self.dns_cache = DnsCache(DEFAULT_DNS_TTL, self.pool_stats)
+        self.pool_size = None
+        self.connect_retries = DEFAULT_CONNECT_RETRIES
+        self.read_timeout = DEFAULT_READ_TIMEOUT
+        self.max_body_bytes = DEFAULT_MAX_BODY_BYTES
+        self.skip_counts = Counter()
+        self._skip_lock = threading.Lock()
         self.is_running = False
         self.is_paused = False
         self.progress_callback = None
@@ -38,6 +187,10 @@ class SublinkCrawler:
         """Set callback function for error messages"""
         self.error_callback = callback
 
+    def set_http_cache(self, http_cache):
+        """Set the HttpCache used for conditional GETs (None disables caching)"""
+        self.http_cache = http_cache
+
     def _log_progress(self, message):
         """Send progress update to callback"""
         if self.progress_callback:
@@ -48,42 +201,258 @@ class SublinkCrawler:
         if self.error_callback:
             self.error_callback(message)
 
+    def _record_skip(self, reason, message):
+        """Count a page that was not fetched or parsed and report why"""
+        with self._skip_lock:
+            self.skip_counts[reason] += 1
+        self._log_progress(message)
+
+    def _read_body(self, response, url):
+        """
+        Read a streamed response body, giving up once it exceeds max_body_bytes
+
+        Returns:
+            The body as bytes, or None if the page was too large
+        """
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > self.max_body_bytes:
+            self._record_skip(
+                SKIP_TOO_LARGE, f"Skipped oversized page ({length} bytes): {url}"
+            )
+            return None
+
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(BODY_CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                self._record_skip(
+                    SKIP_TOO_LARGE,
+                    f"Skipped oversized page (over {self.max_body_bytes} bytes): {url}",
+                )
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _extract_links(self, url, content):
+        """Extract all valid absolute links from a page's HTML content"""
+        started = time.perf_counter()
+        links = set()
+
+        # href values of all <a> tags, from the crawl's link extractor
+        for href in self.extract_hrefs(content):
+            link = resolve_link(url, href, self.canonical_urls, self.strip_params)
+            if link:
+                links.add(link)
+
+        self.metrics.record_parse(time.perf_counter() - started)
+        return links
+
+    def _finish_page(self, result, url, content, headers):
+        """Extract a downloaded page's links, or leave them to the parse pool"""
+        result.size = len(content)
+        if self.archive is not None:
+            self.archive.write(url, result.status, headers, content)
+        if self.parse_pool is not None:
+            result.content = content
+            result.headers = headers
+            return result
+        result.links = self._extract_links(url, content)
+        if self.fingerprint_pages:
+            result.fingerprint = page_fingerprint(content)
+        self._cache_store(url, headers, result.links)
+        return result
+
+    def _cache_lookup(self, url):
+        """Return (cache entry, conditional request headers) for a URL"""
+        if self.http_cache is None:
+            return None, {}
+        cached = self.http_cache.get(url)
+        return cached, cached.conditional_headers() if cached else {}
+
+    def _cache_store(self, url, headers, links):
+        """Remember a downloaded page's validators and links"""
+        if self.http_cache is not None:
+            self.http_cache.record_miss()
+            self.http_cache.put(
+                url, headers.get("ETag"), headers.get("Last-Modified"), links
+            )
+
+    def _failed_page(self, started, status=None, headers=None):
+        """PageResult for a failed request, keeping its status and Retry-After"""
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        return PageResult(
+            status=status, elapsed=time.monotonic() - started, retry_after=retry_after
+        )
+
     def _get_links_from_page(self, url):
-        """Extract all links from a single page"""
+        """Fetch a single page and extract its links"""
+        started = time.monotonic()
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            cached, headers = self._cache_lookup(url)
+            with self.session.get(
+                url,
+                timeout=(CONNECT_TIMEOUT, self.read_timeout),
+                headers=headers,
+                stream=True,
+            ) as response:
+                result = PageResult(
+                    status=response.status_code, elapsed=time.monotonic() - started
+                )
+
+                # Unchanged since the last crawl: reuse the cached links
+                if cached and response.status_code == 304:
+                    self.http_cache.record_hit()
+                    result.links = cached.links
+                    return result
 
-            soup = BeautifulSoup(response.content, "html.parser")
-            links = set()
+                response.raise_for_status()
 
-            # Find all <a> tags with href attributes
-            for link_tag in soup.find_all("a", href=True):
-                href = link_tag["href"].strip()
-                if href:
-                    # Resolve relative URLs
-                    absolute_url = resolve_relative_url(url, href)
-                    normalized_url = normalize_url(absolute_url)
-                    if is_valid_url(normalized_url):
-                        links.add(normalized_url)
+                # Drop PDFs, archives, media etc. without downloading them
+                content_type = response.headers.get("Content-Type", "")
+                if not is_html_content_type(content_type):
+                    self._record_skip(
+                        SKIP_NON_HTML, f"Skipped non-HTML page ({content_type}): {url}"
+                    )
+                    return result
 
-            return links
+                content = self._read_body(response, url)
+                if content is None:
+                    return result
+                self.pool_stats.record_body(response.raw.tell(), len(content))
+
+            return self._finish_page(result, url, content, response.headers)
 
         except requests.RequestException as e:
             self._log_error(f"Error fetching {url}: {str(e)}")
-            return set()
+            if e.response is not None:
+                return self._failed_page(
+                    started, e.response.status_code, e.response.headers
+                )
+            return self._failed_page(started)
         except Exception as e:
             self._log_error(f"Error parsing {url}: {str(e)}")
-            return set()
+            return self._failed_page(started)
+
+    def _iter_sitemap_links(self, start_url):
+        """Yield normalized links passing url_rules listed in the site's sitemaps"""
+        reader = SitemapReader(
+            self.session,
+            log=self._log_progress,
+            error=self._log_error,
+            should_continue=lambda: self.is_running,
+        )
+        sitemap_urls = reader.discover(start_url)
+        if not sitemap_urls:
+            self._log_progress("No sitemaps found.")
+            return
+
+        for url in reader.iter_urls(sitemap_urls):
+            link = resolve_link(start_url, url, self.canonical_urls, self.strip_params)
+            if link and self.url_rules.matches(link):
+                yield link
+
+        self._log_progress(
+            f"Read {reader.sitemaps_read} sitemaps listing {reader.urls_listed} URLs."
+        )
+
+    def _canonical_prefix(self, prefix):
+        """Canonicalize a URL prefix like the links it is matched against"""
+        if not self.canonical_urls:
+            return prefix
+        canonical = canonicalize_url(prefix, self.strip_params)
+        if not urlparse(prefix).path:
+            # A bare "scheme://host" prefix stays a plain string prefix
+            canonical = canonical.rstrip("/")
+        return canonical
+
+    def _canonical_rule(self, rule):
+        """Canonicalize a prefix rule (globs and regexes are kept as written)"""
+        kind, pattern = parse_rule(rule)
+        if kind == RULE_PREFIX:
+            return self._canonical_prefix(pattern)
+        return rule
+
+    def _log_url_rules(self, url_prefix, include_rules, exclude_rules):
+        if include_rules:
+            self._log_progress(f"Include rules: {', '.join(include_rules)}")
+        else:
+            self._log_progress(f"URL prefix filter: {url_prefix}")
+        if exclude_rules:
+            self._log_progress(f"Exclude rules: {', '.join(exclude_rules)}")
+
+    def _configure_connection_pool(self, workers):
+        """Size the session's connection pools so concurrent workers can reuse connections"""
+        pool_hosts = max(workers, DEFAULT_POOL_SIZE)
+        adapter = CrawlerHTTPAdapter(
+            pool_hosts,
+            self.pool_size or pool_hosts,
+            self.connect_retries,
+            self.dns_cache,
+            self.pool_stats,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _open_fetcher(self, workers):
+        """Start the backend that fetches pages for the crawl loop"""
+        self._configure_connection_pool(workers)
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawler")
+
+    def _submit_fetch(self, fetcher, url):
+        """Schedule a page fetch; returns a concurrent.futures.Future of its PageResult"""
+        return fetcher.submit(self._get_links_from_page, url)
+
+    def _close_fetcher(self, fetcher):
+        """Shut the fetch backend down, abandoning pages still queued"""
+        fetcher.shutdown(wait=False, cancel_futures=True)
 
     def crawl(
         self,
         start_url,
         url_prefix=None,
+        include_rules=None,
+        exclude_rules=None,
         max_depth=2,
         max_pages=100,
         request_delay=1.0,
         user_agent=None,
+        workers=None,
+        per_host_limit=None,
+        link_extractor=DEFAULT_EXTRACTOR,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+        skip_extensions=DEFAULT_SKIP_EXTENSIONS,
+        respect_robots=True,
+        host_failure_limit=DEFAULT_FAILURE_LIMIT,
+        host_cooldown=DEFAULT_HOST_COOLDOWN,
+        sitemaps=None,
+        url_store=URL_STORE_EXACT,
+        bloom_capacity=DEFAULT_BLOOM_CAPACITY,
+        canonical_urls=True,
+        strip_params=DEFAULT_TRACKING_PARAMS,
+        parse_workers=0,
+        parse_queue=None,
+        near_duplicates=False,
+        near_duplicate_distance=DEFAULT_MAX_DISTANCE,
+        trap_detection=True,
+        max_url_length=DEFAULT_MAX_URL_LENGTH,
+        max_query_values=DEFAULT_MAX_QUERY_VALUES,
+        max_url_sequence=DEFAULT_MAX_SEQUENCE,
+        link_graph=False,
+        pool_size=None,
+        connect_retries=DEFAULT_CONNECT_RETRIES,
+        dns_ttl=DEFAULT_DNS_TTL,
+        checkpoint_path=None,
+        checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+        export_path=None,
+        export_format=None,
+        export_interval=DEFAULT_FLUSH_INTERVAL,
+        keep_links=True,
+        archive_path=None,
+        coordinator_path=None,
+        worker_index=0,
+        num_workers=1,
     ):
         """
         Main crawling function
@@ -91,14 +460,124 @@ class SublinkCrawler:
         Args:
             start_url: Starting URL for crawling
             url_prefix: Prefix pattern for filtering links (defaults to start_url path)
+            include_rules: Rules a link must match one of to be followed,
+                instead of url_prefix: URL prefixes, "glob:<pattern>" or
+                "re:<regex>" (see UrlRules)
+            exclude_rules: Rules of links never followed, even if included
             max_depth: Maximum crawl depth
             max_pages: Maximum number of pages to crawl
-            request_delay: Delay between requests in seconds
+            request_delay: Delay between requests to the same host in
+                seconds to start with; it shrinks while the host answers
+                quickly (never below the robots.txt Crawl-delay) and comes
+                back when the host slows down, fails or asks for backoff
             user_agent: Custom user agent string
+            workers: Number of pages fetched concurrently (defaults to
+                default_workers)
+            per_host_limit: Maximum concurrent requests to a single host; the
+                actual limit adapts to the host's latency and errors (None
+                means only ``workers`` caps it)
+            link_extractor: Name of the href extractor in LINK_EXTRACTORS
+                ("lxml", "strainer" or "soup")
+            read_timeout: Seconds to wait for data from the server
+            max_body_bytes: Pages larger than this are abandoned unparsed
+            skip_extensions: URL extensions (e.g. ".pdf") never fetched; links
+                to them are still reported
+            respect_robots: Honour robots.txt rules and Crawl-delay
+            host_failure_limit: Failed requests (timeouts, connection
+                errors, 5xx) among a host's last 20, if they are at least
+                half of them, after which the host is paused for
+                host_cooldown seconds and then probed with one request (0
+                disables this). URLs of a host still failing its probes
+                when nothing else is left to crawl are skipped
+            host_cooldown: Seconds a failing host is first paused for
+                (doubled each time a probe fails, up to 10 minutes)
+            sitemaps: Use the site's sitemaps (found via robots.txt or the
+                well-known paths): "seed" adds their URLs to the frontier
+                before crawling, "only" returns their URLs without crawling
+                (not in a distributed crawl)
+            url_store: How seen/visited/found URLs are held: "exact" (sets of
+                strings), "compact" (64-bit fingerprints; only found links
+                keep their strings) or "bloom" (compact, with a Bloom filter
+                as the seen check; a false positive skips a page)
+            bloom_capacity: Distinct URLs the Bloom filter is sized for
+            canonical_urls: Canonicalize links (lowercase scheme and host, no
+                default port, dot segments resolved, sorted query) so each
+                page is crawled once; False only drops fragments
+            strip_params: Query parameters removed from canonical links
+                (defaults to common tracking parameters such as utm_source)
+            parse_workers: Number of processes that extract links from
+                downloaded pages, leaving fetch workers to I/O only (0 parses
+                in the fetch workers)
+            parse_queue: Maximum pages downloaded but not yet parsed; fetching
+                pauses while the parsers catch up (defaults to 4 per parse
+                worker)
+            near_duplicates: Fingerprint the text of every page (SimHash) and
+                do not follow the links of pages that nearly duplicate a page
+                crawled before (their links are still reported); they are
+                listed in duplicate_pages
+            near_duplicate_distance: Most fingerprint bits (of 64) in which a
+                near-duplicate may differ from the original
+            trap_detection: Do not crawl links from generated URL spaces
+                (calendars, session IDs, repeating paths, overlong URLs); the
+                links are still returned, and the quarantined URL families
+                are listed by get_trap_report()
+            max_url_length: Longest URL queued (with trap_detection)
+            max_query_values: Distinct non-numeric values a query parameter
+                may take on one path before its URLs are quarantined (with
+                trap_detection)
+            max_url_sequence: Longest chain of pages linked one to the next
+                and differing only in numbers, like a calendar's "next month"
+                (with trap_detection)
+            link_graph: Record which page links to which in link_graph (a
+                LinkGraph of integer IDs in compact arrays) for in-degree,
+                depth and PageRank scores; see get_page_ranks() and
+                export_link_graph(). Only links that pass the URL rules are
+                recorded, and a resumed or distributed crawl records the
+                pages it crawls itself.
+            pool_size: Connections kept open per host for reuse (defaults to
+                the number of workers, at least 10)
+            connect_retries: Times a failed connection attempt is retried,
+                with exponential backoff (HTTP errors are not retried)
+            dns_ttl: Seconds resolved host addresses are cached
+            checkpoint_path: SQLite file to checkpoint crawl state to, so the
+                crawl can be continued later with resume()
+            checkpoint_interval: Number of completed pages between checkpoints
+            export_path: File that found links are streamed to as they are
+                discovered (see LINK_SINKS)
+            export_format: "bracket", "jsonl", "csv" or "sqlite" (None picks
+                it from the export_path extension)
+            export_interval: Seconds between flushes of the export file
+            keep_links: False returns no links and keeps only fingerprints
+                of the found links in memory (use with export_path)
+            archive_path: Compressed WARC file (e.g. "pages.warc.gz") that
+                every downloaded page is written to with its status and
+                headers, indexed in archive_path + ".idx" (see PageArchive)
+            coordinator_path: SQLite file of a distributed crawl (see
+                CrawlCoordinator). The crawl is shared with the other workers
+                using the same file: each crawls the hosts of its partition
+                and the links found by all workers are returned once the
+                whole crawl is done. Running the same worker again resumes
+                its part.
+            worker_index: This worker's partition, 0 to num_workers - 1
+            num_workers: Number of workers sharing the distributed crawl
         """
+        if coordinator_path:
+            if checkpoint_path:
+                raise ValueError(
+                    "A distributed crawl is checkpointed by its coordinator"
+                )
+            if not 0 <= worker_index < num_workers:
+                raise ValueError(
+                    f"Worker index must be between 0 and {num_workers - 1}"
+                )
+            if sitemaps == SITEMAPS_ONLY:
+                raise ValueError("A sitemap-only scan cannot be distributed")
+
+        seen, self.crawled_urls, self.found_links = create_url_stores(
+            url_store, bloom_capacity, keep_links
+        )
+        self.keep_links = keep_links
         self.is_running = True
-        self.crawled_urls.clear()
-        self.found_links.clear()
 
         # Set user agent if provided
         if user_agent:
@@ -108,65 +587,660 @@ class SublinkCrawler:
                 "Crawler Toolbox/1.0 (+https://github.com/crawler-toolbox)"
             )
 
-        # Use start_url as prefix if none provided
+        self.canonical_urls = canonical_urls
+        self.strip_params = frozenset(strip_params or ())
+
+        # Normalize start URL (and the prefixes, so links can match them)
         if url_prefix is None:
             url_prefix = start_url
+        # A glob or regex given as the prefix is kept as written
+        url_prefix = self._canonical_rule(url_prefix)
+        include_rules = [self._canonical_rule(rule) for rule in include_rules or ()]
+        exclude_rules = [self._canonical_rule(rule) for rule in exclude_rules or ()]
+        try:
+            self.url_rules = UrlRules(include_rules or [url_prefix], exclude_rules)
+        except ValueError:
+            self.is_running = False
+            raise
+        start_url = resolve_link("", start_url, canonical_urls, self.strip_params)
 
-        # Normalize start URL
-        start_url = normalize_url(start_url)
-
-        if not is_valid_url(start_url):
+        if not start_url:
             self._log_error("Invalid start URL provided")
             self.is_running = False
             return []
 
         self._log_progress(f"Starting crawl from: {start_url}")
-        self._log_progress(f"URL prefix filter: {url_prefix}")
+        self._log_url_rules(url_prefix, include_rules, exclude_rules)
+
+        if sitemaps not in (None, SITEMAPS_SEED, SITEMAPS_ONLY):
+            self.is_running = False
+            raise ValueError(f"Unknown sitemap mode: {sitemaps}")
+
+        if export_path:
+            self._open_link_sink(export_path, export_format, export_interval)
+        if archive_path:
+            # A distributed worker run again continues its archive
+            self._open_archive(archive_path, append=bool(coordinator_path))
+        try:
+            # Initialize the frontier with the start URL at depth 0
+            coordinator = None
+            if coordinator_path:
+                coordinator = CrawlCoordinator(coordinator_path)
+                self.frontier = SharedFrontier(
+                    coordinator,
+                    worker_index,
+                    num_workers,
+                    max_depth,
+                    max_pages,
+                    seen,
+                )
+            else:
+                self.frontier = CrawlFrontier(
+                    max_depth, seen, track_changes=bool(checkpoint_path)
+                )
+            self.frontier.push(start_url, 0)
+
+            seeded = []
+            if sitemaps:
+                # Sitemap URLs count as linked from the start page
+                for link in self._iter_sitemap_links(start_url):
+                    if link not in self.found_links:
+                        self.found_links.add(link)
+                        seeded.append(link)
+                    if sitemaps == SITEMAPS_SEED:
+                        self.frontier.push(link, 1)
+                if self.link_sink is not None:
+                    self.link_sink.write(seeded, start_url, 1)
+
+                if sitemaps == SITEMAPS_ONLY:
+                    if self.is_running:
+                        self._log_progress(
+                            f"Sitemap scan completed. Found {len(self.found_links)} unique links."
+                        )
+                    else:
+                        self._log_progress("Crawl stopped by user.")
+                    self.is_running = False
+                    return self._result_links()
 
-        # Initialize crawling queue with (url, depth) tuples
-        crawl_queue = [(start_url, 0)]
-        pages_crawled = 0
+            params = {
+                "start_url": start_url,
+                "url_prefix": url_prefix,
+                "include_rules": include_rules,
+                "exclude_rules": exclude_rules,
+                "max_depth": max_depth,
+                "max_pages": max_pages,
+                "request_delay": request_delay,
+                "user_agent": user_agent,
+                "workers": workers,
+                "per_host_limit": per_host_limit,
+                "link_extractor": link_extractor,
+                "read_timeout": read_timeout,
+                "max_body_bytes": max_body_bytes,
+                "skip_extensions": sorted(skip_extensions or ()),
+                "respect_robots": respect_robots,
+                "host_failure_limit": host_failure_limit,
+                "host_cooldown": host_cooldown,
+                "sitemaps": sitemaps,
+                "url_store": url_store,
+                "bloom_capacity": bloom_capacity,
+                "canonical_urls": canonical_urls,
+                "strip_params": sorted(self.strip_params),
+                "parse_workers": parse_workers,
+                "parse_queue": parse_queue,
+                "near_duplicates": near_duplicates,
+                "near_duplicate_distance": near_duplicate_distance,
+                "trap_detection": trap_detection,
+                "max_url_length": max_url_length,
+                "max_query_values": max_query_values,
+                "max_url_sequence": max_url_sequence,
+                "link_graph": link_graph,
+                "pool_size": pool_size,
+                "connect_retries": connect_retries,
+                "dns_ttl": dns_ttl,
+                "keep_links": keep_links,
+            }
 
-        while crawl_queue and self.is_running and pages_crawled < max_pages:
-            # Handle pause
-            while self.is_paused and self.is_running:
-                time.sleep(0.1)
+            if coordinator:
+                # Sitemap links are found links of the whole crawl
+                coordinator.sync([], [], seeded)
+                return self._crawl_distributed(
+                    params, coordinator, worker_index, num_workers
+                )
 
-            if not self.is_running:
-                break
+            checkpoint = None
+            if checkpoint_path:
+                checkpoint = CrawlCheckpoint(checkpoint_path)
+                checkpoint.start(params)
+                checkpoint.save([], seeded, *self.frontier.take_changes())
 
-            current_url, current_depth = crawl_queue.pop(0)
+            return self._crawl_loop(params, checkpoint, checkpoint_interval)
+        finally:
+            self._close_link_sink()
+            self._close_archive()
 
-            # Skip if already crawled
-            if current_url in self.crawled_urls:
-                continue
+    def _crawl_distributed(self, params, coordinator, worker_index, num_workers):
+        """Run this worker's share of a distributed crawl; returns all workers' links"""
+        try:
+            stored = coordinator.start(dict(params, num_workers=num_workers))
+            if (
+                stored["start_url"] != params["start_url"]
+                or stored["num_workers"] != num_workers
+            ):
+                self.is_running = False
+                raise ValueError(
+                    f"{coordinator.path} holds a different crawl "
+                    f"({stored['start_url']} with {stored['num_workers']} workers)"
+                )
+
+            # URLs claimed by an earlier run of this worker are crawled again
+            coordinator.release_partition(worker_index)
+            self._log_progress(
+                f"Distributed crawl: worker {worker_index + 1}/{num_workers}"
+            )
 
-            # Skip if depth exceeded
-            if current_depth > max_depth:
-                continue
+            try:
+                self._crawl_loop(params, None, DEFAULT_CHECKPOINT_INTERVAL)
+            finally:
+                self.frontier.close()
 
-            self.crawled_urls.add(current_url)
-            pages_crawled += 1
+            found_links = coordinator.found_links()
+            self._log_progress(
+                f"All workers together found {len(found_links)} unique links."
+            )
+            return found_links if self.keep_links else []
+        finally:
+            coordinator.close()
 
+    def resume(
+        self,
+        checkpoint_path,
+        checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+        export_path=None,
+        export_format=None,
+        export_interval=DEFAULT_FLUSH_INTERVAL,
+        archive_path=None,
+        **overrides,
+    ):
+        """
+        Continue a crawl from the state saved in a checkpoint file
+
+        Pages recorded as visited are not fetched again. Crawl parameters are
+        taken from the checkpoint; keyword arguments (e.g. max_pages, workers)
+        override them.
+
+        Args:
+            checkpoint_path: SQLite file written by crawl(checkpoint_path=...)
+            checkpoint_interval: Number of completed pages between checkpoints
+            export_path: File the links found from now on are appended to
+            export_format: Format of export_path (see crawl())
+            export_interval: Seconds between flushes of the export file
+            archive_path: WARC file the pages fetched from now on are
+                appended to (see crawl())
+        """
+        checkpoint = CrawlCheckpoint(checkpoint_path)
+        state = checkpoint.load()
+        if state is None:
+            checkpoint.close()
+            self._log_error(f"No crawl to resume in {checkpoint_path}")
+            return []
+
+        params = state["params"]
+        unknown = set(overrides) - set(params)
+        if unknown:
+            checkpoint.close()
+            raise ValueError(f"Unknown crawl parameters: {', '.join(sorted(unknown))}")
+        params.update(overrides)
+
+        self.keep_links = params.get("keep_links", True)
+        seen, self.crawled_urls, self.found_links = create_url_stores(
+            params.get("url_store", URL_STORE_EXACT),
+            params.get("bloom_capacity", DEFAULT_BLOOM_CAPACITY),
+            self.keep_links,
+        )
+        self.is_running = True
+        for url in state["visited"]:
+            self.crawled_urls.add(url)
+        for url in state["found"]:
+            self.found_links.add(url)
+
+        self.set_user_agent(
+            params["user_agent"]
+            or "Crawler Toolbox/1.0 (+https://github.com/crawler-toolbox)"
+        )
+
+        self.frontier = CrawlFrontier(params["max_depth"], seen, track_changes=True)
+        for url in state["visited"]:
+            self.frontier.mark_seen(url)
+        for url, depth in state["pending"]:
+            self.frontier.push(url, depth)
+
+        include_rules = params.get("include_rules") or []
+        exclude_rules = params.get("exclude_rules") or []
+        self.url_rules = UrlRules(
+            include_rules or [params["url_prefix"]], exclude_rules
+        )
+
+        self._log_progress(f"Resuming crawl from: {params['start_url']}")
+        self._log_url_rules(params["url_prefix"], include_rules, exclude_rules)
+        self._log_progress(
+            f"Already crawled {len(self.crawled_urls)} pages, "
+            f"{len(self.frontier)} pending, {len(self.found_links)} links found."
+        )
+
+        if export_path:
+            self._open_link_sink(export_path, export_format, export_interval, True)
+        if archive_path:
+            self._open_archive(archive_path, append=True)
+        try:
+            return self._crawl_loop(params, checkpoint, checkpoint_interval)
+        finally:
+            self._close_link_sink()
+            self._close_archive()
+
+    def _crawl_loop(self, params, checkpoint, checkpoint_interval):
+        """Crawl from self.frontier until it is exhausted, max_pages is reached or stopped"""
+        url_rules = self.url_rules
+        max_pages = params["max_pages"]
+        request_delay = params["request_delay"]
+        per_host_limit = params["per_host_limit"]
+        skip_extensions = frozenset(params["skip_extensions"])
+        self.extract_hrefs = get_link_extractor(params["link_extractor"])
+        self.read_timeout = params["read_timeout"]
+        self.max_body_bytes = params["max_body_bytes"]
+        self.canonical_urls = params.get("canonical_urls", False)
+        self.strip_params = frozenset(params.get("strip_params", ()))
+        self.pool_size = params.get("pool_size")
+        self.connect_retries = params.get("connect_retries", DEFAULT_CONNECT_RETRIES)
+        self.dns_cache.ttl = params.get("dns_ttl", DEFAULT_DNS_TTL)
+        self.skip_counts.clear()
+
+        workers = max(1, int(params["workers"] or self.default_workers))
+        if workers > 1:
+            self._log_progress(f"Concurrent workers: {workers}")
+
+        # Near-duplicate pages found so far: (url, original url, distance)
+        self.duplicate_pages = []
+        duplicates = None
+        self.fingerprint_pages = params.get("near_duplicates", False)
+        if self.fingerprint_pages:
+            duplicates = NearDuplicateIndex(
+                params.get("near_duplicate_distance", DEFAULT_MAX_DISTANCE)
+            )
+
+        traps = None
+        if params.get("trap_detection", False):
+            traps = TrapDetector(
+                max_url_length=params.get("max_url_length", DEFAULT_MAX_URL_LENGTH),
+                max_query_values=params.get(
+                    "max_query_values", DEFAULT_MAX_QUERY_VALUES
+                ),
+                max_sequence=params.get("max_url_sequence", DEFAULT_MAX_SEQUENCE),
+                log=self._log_progress,
+            )
+        self.trap_detector = traps
+
+        graph = None
+        if params.get("link_graph", False):
+            # Rooted at the start URL whichever page completes first
+            graph = LinkGraph(params["start_url"])
+        self.link_graph = graph
+
+        parse_workers = params.get("parse_workers") or 0
+        if parse_workers:
+            self.parse_pool = ParsePool(
+                parse_workers,
+                params["link_extractor"],
+                self.canonical_urls,
+                self.strip_params,
+                params.get("parse_queue"),
+                self.fingerprint_pages,
+            )
             self._log_progress(
-                f"Crawling [{pages_crawled}/{max_pages}] depth {current_depth}: {current_url[:60]}..."
+                f"Parser processes: {parse_workers} "
+                f"(up to {self.parse_pool.max_queued} pages queued)"
             )
 
-            # Get links from current page
-            page_links = self._get_links_from_page(current_url)
+        pages_crawled = len(self.crawled_urls)
+        self.metrics.reset()
+        self.pool_stats.reset()
+        if self.http_cache is not None:
+            self.http_cache.reset_stats()
 
-            # Process found links
-            for link in page_links:
-                if url_matches_prefix(link, url_prefix):
-                    self.found_links.add(link)
+        scheduler = HostScheduler(
+            self.session,
+            request_delay=request_delay,
+            max_concurrency=per_host_limit or workers,
+            respect_robots=params["respect_robots"],
+            log=self._log_progress,
+            failure_limit=params.get("host_failure_limit", DEFAULT_FAILURE_LIMIT),
+            cooldown=params.get("host_cooldown", DEFAULT_HOST_COOLDOWN),
+        )
 
-                    # Add to crawl queue if within depth limit
-                    if current_depth < max_depth and link not in self.crawled_urls:
-                        crawl_queue.append((link, current_depth + 1))
+        # URLs whose host cannot take a request yet wait in parked[host]. A
+        # host with parked URLs is always due for another look: either it is
+        # in wake_heap (rate limited or backing off until a given time), in
+        # ready_hosts, it has a request in flight whose completion re-adds it,
+        # or its robots.txt is still downloading.
+        parked = defaultdict(deque)
+        parked_count = 0
+        wake_heap = []
+        ready_hosts = deque()
+        backoff_retries = defaultdict(int)
 
-            # Respectful delay between requests
-            if request_delay > 0 and self.is_running:
-                time.sleep(request_delay)
+        # The fetcher reports (url, depth, host, future) here when a page is
+        # done, the parse pool (url, depth, None, future) when it is parsed
+        # and the scheduler (None, None, host, future) when a host's
+        # robots.txt is in
+        completed = queue.Queue()
+        in_flight = {}
+        parsing = {}
+
+        # State gathered since the last checkpoint
+        new_visited = []
+        new_found = []
+
+        def save_checkpoint():
+            # Only the frontier's changes are written: in-flight and parked
+            # pages stay in the saved frontier until they complete
+            checkpoint.save(new_visited, new_found, *self.frontier.take_changes())
+            new_visited.clear()
+            new_found.clear()
+
+        fetcher = self._open_fetcher(workers)
+        try:
+            while self.is_running:
+                # While paused, in-flight pages finish but nothing new is dispatched
+                while (
+                    not self.is_paused
+                    and len(in_flight) < workers
+                    and pages_crawled < max_pages
+                    and (
+                        self.parse_pool is None
+                        or len(parsing) < self.parse_pool.max_queued
+                    )
+                ):
+                    now = time.monotonic()
+                    while wake_heap and wake_heap[0][0] <= now:
+                        ready_hosts.append(heapq.heappop(wake_heap)[1])
+
+                    if ready_hosts:
+                        host = ready_hosts.popleft()
+                        if not parked[host]:
+                            continue
+                        current_url, current_depth = parked[host][0]
+                        from_parked = True
+                    elif self.frontier:
+                        current_url, current_depth = self.frontier.pop()
+                        from_parked = False
+
+                        if get_url_extension(current_url) in skip_extensions:
+                            self._record_skip(
+                                SKIP_EXTENSION, f"Skipped by extension: {current_url}"
+                            )
+                            self.frontier.complete(current_url)
+                            continue
+
+                        host = get_domain_from_url(current_url)
+                        robots = scheduler.host_ready(current_url)
+                        if robots is not None:
+                            # robots.txt still downloading: the host's URLs
+                            # wait for it without holding up other hosts
+                            if not parked[host]:
+                                robots.add_done_callback(
+                                    lambda f, host=host: completed.put(
+                                        (None, None, host, f)
+                                    )
+                                )
+                            parked[host].append((current_url, current_depth))
+                            parked_count += 1
+                            continue
+
+                        if not scheduler.allowed(current_url):
+                            self._record_skip(
+                                SKIP_ROBOTS, f"Skipped by robots.txt: {current_url}"
+                            )
+                            self.frontier.complete(current_url)
+                            continue
+
+                        if parked[host]:
+                            # Host is already waiting; keep its URLs in order
+                            parked[host].append((current_url, current_depth))
+                            parked_count += 1
+                            continue
+                    else:
+                        break
+
+                    wait = scheduler.acquire(host, now)
+                    if wait > 0:
+                        if not from_parked:
+                            parked[host].append((current_url, current_depth))
+                            parked_count += 1
+                        if wait != WAIT_FOR_SLOT:
+                            heapq.heappush(wake_heap, (now + wait, host))
+                        continue
+
+                    if from_parked:
+                        parked[host].popleft()
+                        parked_count -= 1
+                    if parked[host]:
+                        ready_hosts.append(host)
+
+                    self.crawled_urls.add(current_url)
+                    pages_crawled += 1
+
+                    self._log_progress(
+                        f"Crawling [{pages_crawled}/{max_pages}] depth {current_depth}: {current_url[:60]}..."
+                    )
+
+                    in_flight[current_url] = current_depth
+                    future = self._submit_fetch(fetcher, current_url)
+                    future.add_done_callback(
+                        lambda f, task=(current_url, current_depth, host): completed.put(
+                            (*task, f)
+                        )
+                    )
+
+                # Wake up in time for the next rate-limited host
+                timeout = 0.1
+                if wake_heap:
+                    timeout = min(timeout, max(0.0, wake_heap[0][0] - time.monotonic()))
+
+                if (
+                    parked_count
+                    and not in_flight
+                    and not parsing
+                    and not self.is_paused
+                    and not self.frontier
+                    and not self.frontier.waiting()
+                    and all(
+                        scheduler.failing(host) for host, urls in parked.items() if urls
+                    )
+                ):
+                    # Only hosts that keep failing their probes are left:
+                    # skip their URLs rather than wait on them
+                    for urls in parked.values():
+                        for url, _ in urls:
+                            self._record_skip(
+                                SKIP_FAILING_HOST, f"Skipped, host is failing: {url}"
+                            )
+                            self.frontier.complete(url)
+                    parked.clear()
+                    parked_count = 0
+
+                # Unless everything left is waiting on a host's rate limit or
+                # robots.txt (or, in a distributed crawl, on other workers)
+                if (
+                    not in_flight
+                    and not parsing
+                    and not (parked_count and pages_crawled < max_pages)
+                    and not self.is_paused
+                    and not self.frontier.waiting()
+                ):
+                    break
+
+                try:
+                    current_url, current_depth, host, future = completed.get(
+                        timeout=timeout
+                    )
+                except queue.Empty:
+                    continue
+
+                if current_url is None:
+                    # robots.txt of a host is in: skip the parked URLs it
+                    # disallows, the rest can be dispatched
+                    waiting = parked.pop(host, ())
+                    for url, depth in waiting:
+                        if scheduler.allowed(url):
+                            parked[host].append((url, depth))
+                        else:
+                            parked_count -= 1
+                            self._record_skip(
+                                SKIP_ROBOTS, f"Skipped by robots.txt: {url}"
+                            )
+                            self.frontier.complete(url)
+                    if parked[host]:
+                        ready_hosts.append(host)
+                    continue
+
+                if host is None:
+                    # Links of a page handed to the parse pool
+                    _, result = parsing.pop(current_url)
+                    try:
+                        result.links, parse_seconds, result.fingerprint = (
+                            future.result()
+                        )
+                        self.metrics.record_parse(parse_seconds)
+                    except Exception as e:
+                        self._log_error(f"Error parsing {current_url}: {str(e)}")
+                    else:
+                        self._cache_store(current_url, result.headers, result.links)
+                    result.content = None
+                else:
+                    del in_flight[current_url]
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self._log_error(f"Error crawling {current_url}: {str(e)}")
+                        result = PageResult()
+
+                    scheduler.release(
+                        host, result.elapsed, result.status, result.retry_after
+                    )
+                    self.metrics.record_fetch(
+                        result.elapsed, result.status, result.size
+                    )
+                    self.metrics.set_queues(
+                        self.frontier.stats()["pending"],
+                        len(in_flight),
+                        len(parsing),
+                        parked_count,
+                    )
+                    if parked[host]:
+                        ready_hosts.append(host)
+
+                    # Host asked us to slow down: try the page again later
+                    if (
+                        result.status in BACKOFF_STATUSES
+                        and backoff_retries[current_url] < MAX_BACKOFF_RETRIES
+                        and self.is_running
+                    ):
+                        backoff_retries[current_url] += 1
+                        self.crawled_urls.discard(current_url)
+                        pages_crawled -= 1
+                        parked[host].appendleft((current_url, current_depth))
+                        parked_count += 1
+                        ready_hosts.append(host)
+                        continue
+
+                    # Downloaded page for the parse pool: its links come later
+                    if result.content is not None:
+                        parsing[current_url] = (current_depth, result)
+                        parse_future = self.parse_pool.submit(
+                            current_url, result.content
+                        )
+                        parse_future.add_done_callback(
+                            lambda f, task=(current_url, current_depth): completed.put(
+                                (*task, None, f)
+                            )
+                        )
+                        continue
+
+                page_links = result.links
+                found_before = len(new_found)
+                expand = True
+
+                if duplicates is not None and result.fingerprint is not None:
+                    match = duplicates.find(result.fingerprint)
+                    if match:
+                        # Same content as a page crawled before: its links
+                        # are reported but, being (nearly) that page's
+                        # links, not followed
+                        self.duplicate_pages.append((current_url, *match))
+                        self._log_progress(
+                            f"Near-duplicate of {match[0]}: {current_url}"
+                        )
+                        expand = False
+                    else:
+                        duplicates.add(result.fingerprint, current_url)
+
+                # Process found links
+                if traps is not None:
+                    traps.begin_page(current_url)
+                graph_links = [] if graph is not None else None
+                for link in page_links:
+                    if url_rules.matches(link):
+                        if link not in self.found_links:
+                            self.found_links.add(link)
+                            new_found.append(link)
+                        if graph_links is not None:
+                            graph_links.append(link)
+                        if not expand:
+                            continue
+
+                        if (
+                            traps is not None
+                            and link not in self.frontier
+                            and traps.check(link)
+                        ):
+                            # Part of a generated URL space: reported as
+                            # found, never crawled
+                            self.frontier.mark_seen(link)
+                            continue
+
+                        # Queue for crawling (the frontier drops duplicates and
+                        # links beyond max_depth)
+                        if (
+                            self.frontier.push(link, current_depth + 1)
+                            and traps is not None
+                        ):
+                            traps.queued(link)
+                if graph is not None:
+                    graph.add_page(current_url, graph_links, current_depth)
+
+                self.frontier.complete(current_url, new_found[found_before:])
+                if self.link_sink is not None:
+                    self.link_sink.write(
+                        new_found[found_before:], current_url, current_depth + 1
+                    )
+                new_visited.append(current_url)
+                if checkpoint is None:
+                    # Only checkpoints need the batches
+                    new_visited.clear()
+                    new_found.clear()
+                elif len(new_visited) >= checkpoint_interval:
+                    save_checkpoint()
+        finally:
+            self._close_fetcher(fetcher)
+            scheduler.close()
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+            if checkpoint:
+                save_checkpoint()
+                checkpoint.close()
+            self.metrics.set_queues(self.frontier.stats()["pending"], 0, 0, parked_count)
+            self.metrics.finish()
 
         if self.is_running:
             self._log_progress(
@@ -175,8 +1249,99 @@ class SublinkCrawler:
         else:
             self._log_progress("Crawl stopped by user.")
 
+        if self.http_cache is not None:
+            cache_stats = self.http_cache.stats()
+            self._log_progress(
+                f"HTTP cache: {cache_stats['hits']} pages not modified, "
+                f"{cache_stats['misses']} downloaded."
+            )
+
+        if self.pool_stats.requests:
+            self._log_progress(self.pool_stats.summary())
+
+        if scheduler.backoffs:
+            self._log_progress(
+                f"Hosts asked to slow down {scheduler.backoffs} times (429/503)."
+            )
+
+        if self.skip_counts:
+            self._log_progress(
+                f"Skipped pages: {self.skip_counts[SKIP_EXTENSION]} by extension, "
+                f"{self.skip_counts[SKIP_ROBOTS]} by robots.txt, "
+                f"{self.skip_counts[SKIP_NON_HTML]} non-HTML, "
+                f"{self.skip_counts[SKIP_TOO_LARGE]} over size limit, "
+                f"{self.skip_counts[SKIP_FAILING_HOST]} on failing hosts."
+            )
+
+        if self.duplicate_pages:
+            originals = len({original for _, original, _ in self.duplicate_pages})
+            self._log_progress(
+                f"Near-duplicate pages: {len(self.duplicate_pages)} copies of "
+                f"{originals} pages (their links were not followed)."
+            )
+
+        if traps is not None:
+            trap_stats = traps.stats()
+            if trap_stats["families"]:
+                self._log_progress(
+                    f"Crawler traps: {trap_stats['quarantined']} links quarantined "
+                    f"in {trap_stats['families']} URL families."
+                )
+
+        if graph is not None:
+            graph_stats = graph.stats()
+            self._log_progress(
+                f"Link graph: {graph_stats['pages']} pages, "
+                f"{graph_stats['links']} links "
+                f"({graph_stats['bytes'] / 1024 / 1024:.1f} MiB of arrays)."
+            )
+
+        failing = scheduler.stats()["circuits"]
+        if failing:
+            self._log_progress(
+                f"Failing hosts ({scheduler.circuit_trips} circuit breaks): "
+                + ", ".join(f"{host} ({state})" for host, state in failing.items())
+            )
+
+        stats = self.frontier.stats()
+        self._log_progress(
+            f"Frontier: {stats['queued']} queued, {stats['duplicates']} duplicates, "
+            f"{stats['skipped']} beyond max depth, {stats['pending']} not crawled."
+        )
+
         self.is_running = False
-        return sorted(list(self.found_links))
+        return self._result_links()
+
+    def _open_link_sink(self, path, format, flush_interval, append=False):
+        """Start streaming found links to path"""
+        self.link_sink = open_link_sink(path, format, flush_interval, append)
+        self._log_progress(f"Streaming links to {path} ({self.link_sink.format})")
+
+    def _close_link_sink(self):
+        """Flush and close the export file of the crawl, if any"""
+        if self.link_sink is not None:
+            sink, self.link_sink = self.link_sink, None
+            sink.close()
+            self._log_progress(f"Exported {sink.count} links to {sink.path}")
+
+    def _open_archive(self, path, append=False):
+        """Start writing downloaded pages to a WARC archive"""
+        self.archive = PageArchive(path, append)
+        self._log_progress(f"Archiving pages to {path}")
+
+    def _close_archive(self):
+        """Flush and close the page archive of the crawl, if any"""
+        if self.archive is not None:
+            archive, self.archive = self.archive, None
+            archive.close()
+            self._log_progress(
+                f"Archived {archive.count} pages to {archive.path} "
+                f"({archive.bytes_written / 1024 / 1024:.1f} MiB compressed)"
+            )
+
+    def _result_links(self):
+        """The sorted found links crawl() returns (none unless keep_links)"""
+        return sorted(self.found_links) if self.keep_links else []
 
     def stop_crawl(self):
         """Stop the crawling process"""
@@ -193,8 +1358,110 @@ class SublinkCrawler:
         self.is_paused = False
         self._log_progress("Crawl resumed...")
 
-    def export_links_to_file(self, links, filename):
-        """Export found links to a text file in the new bracket format"""
+    def get_metrics(self):
+        """Return the current (or last) crawl's metrics as a dictionary"""
+        return self.metrics.snapshot()
+
+    def export_metrics(self, filename, format=METRICS_JSON):
+        """Write the crawl metrics to a file as JSON or Prometheus text"""
+        try:
+            self.metrics.export(filename, format)
+            return True
+        except Exception as e:
+            self._log_error(f"Error exporting metrics: {str(e)}")
+            return False
+
+    def get_duplicates(self):
+        """Return the near-duplicate pages of the last crawl, grouped by original"""
+        report = defaultdict(list)
+        for url, original, distance in self.duplicate_pages:
+            report[original].append({"url": url, "distance": distance})
+        return dict(report)
+
+    def export_duplicates_report(self, filename):
+        """Write the near-duplicate pages to a CSV file (url, duplicate_of, distance)"""
+        try:
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["url", "duplicate_of", "distance"])
+                writer.writerows(self.duplicate_pages)
+            return True
+        except Exception as e:
+            self._log_error(f"Error exporting duplicates: {str(e)}")
+            return False
+
+    def get_trap_report(self):
+        """
+        Return the URL families quarantined as crawler traps in the last crawl
+
+        Returns:
+            List of dicts (family, reason, quarantined, example), most
+            quarantined links first
+        """
+        if self.trap_detector is None:
+            return []
+        return self.trap_detector.report()
+
+    def export_trap_report(self, filename):
+        """Write the crawler trap report to a CSV file"""
+        try:
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(
+                    f, fieldnames=["family", "reason", "quarantined", "example"]
+                )
+                writer.writeheader()
+                writer.writerows(self.get_trap_report())
+            return True
+        except Exception as e:
+            self._log_error(f"Error exporting trap report: {str(e)}")
+            return False
+
+    def get_page_ranks(self, count=None):
+        """
+        Return the pages of the last crawl's link graph, highest PageRank first
+
+        Args:
+            count: Return only this many pages (None for all)
+
+        Returns:
+            List of dicts (url, rank, in_degree, out_degree, depth); empty
+            unless the crawl ran with link_graph=True
+        """
+        if self.link_graph is None:
+            return []
+        return self.link_graph.report(count)
+
+    def export_link_graph(self, filename, format=None):
+        """
+        Write the link graph of the last crawl to a file: compact binary
+        CSR, a tab-separated edge list or a CSV of page scores (see
+        LinkGraph.export; None picks the format from the file extension)
+        """
+        if self.link_graph is None:
+            self._log_error("No link graph: crawl with link_graph=True")
+            return False
+        try:
+            self.link_graph.export(filename, format)
+            return True
+        except Exception as e:
+            self._log_error(f"Error exporting link graph: {str(e)}")
+            return False
+
+    def export_links_to_file(self, links, filename, format=None):
+        """
+        Export found links to a file: the bracket text format, or JSONL, CSV
+        or SQLite (format, or picked from the filename extension)
+        """
+        format = format or export_format_for_path(filename)
+        if format != EXPORT_BRACKET:
+            try:
+                with open_link_sink(filename, format) as sink:
+                    sink.write(links)
+                return True
+            except Exception as e:
+                self._log_error(f"Error exporting to file: {str(e)}")
+                return False
+
         try:
             from datetime import datetime
 
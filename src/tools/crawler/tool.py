@@ -2,6 +2,7 @@ from typing import Dict, Any
 from ...core import BaseTool
 from .sublink_crawler import SublinkCrawler
 from .gui import CrawlerToolFrame
+from .backends import DEFAULT_BACKEND
 
 
 class CrawlerTool(BaseTool[CrawlerToolFrame]):
@@ -19,10 +20,17 @@ class CrawlerTool(BaseTool[CrawlerToolFrame]):
         return {
             "start_url": "",
             "url_prefix": None,
+            "include_rules": None,
+            "exclude_rules": None,
             "max_depth": 2,
             "max_pages": 100,
             "request_delay": 1.0,
             "user_agent": None,
+            "workers": None,
+            "per_host_limit": None,
+            "backend": DEFAULT_BACKEND,
+            "sitemaps": None,
+            "export_path": None,
         }
 
     def create_tool_gui(self, parent) -> CrawlerToolFrame:
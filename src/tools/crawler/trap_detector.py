@@ -0,0 +1,244 @@
+"""
+Trap detector - recognizes generated URL spaces (calendars, session IDs,
+repeating paths) when links are queued, so they do not use up the crawl
+"""
+
+import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlsplit
+
+# URLs longer than this are not crawled
+DEFAULT_MAX_URL_LENGTH = 512
+
+# A path segment occurring more often than this marks a repeating path
+# (e.g. /a/b/a/b/a/b/ produced by relative links)
+DEFAULT_MAX_SEGMENT_REPEATS = 2
+
+# Distinct values of one query parameter on one path before it is a trap.
+# Numeric values (IDs, page numbers) are not counted: they usually list real
+# content, and runaway number ranges are caught as numeric sequences.
+DEFAULT_MAX_QUERY_VALUES = 100
+
+# Links queued from a page of the same family that only step one of its
+# numbers by one (next month, next day, next page...) before the family is a
+# trap
+DEFAULT_MAX_SEQUENCE = 100
+
+# Query parameters that carry a session ID: every visitor sees new URLs
+SESSION_PARAMS = frozenset(
+    (
+        "sid",
+        "sessid",
+        "sessionid",
+        "session_id",
+        "jsessionid",
+        "phpsessid",
+        "aspsessionid",
+        "cfid",
+        "cftoken",
+    )
+)
+
+TRAP_LONG_URL = "long_url"
+TRAP_REPEATED_SEGMENTS = "repeated_segments"
+TRAP_SESSION_ID = "session_id"
+TRAP_QUERY_CARDINALITY = "query_cardinality"
+TRAP_NUMERIC_SEQUENCE = "numeric_sequence"
+
+# Longest family name kept for long URLs
+_FAMILY_LENGTH = 120
+
+_DIGITS = re.compile(r"\d+")
+
+
+class _TrapFamily:
+    """A quarantined URL family"""
+
+    def __init__(self, reason, example):
+        self.reason = reason
+        self.example = example
+        self.quarantined = 0
+
+
+class TrapDetector:
+    """
+    Checks links before they are queued and quarantines URL families that
+    look generated:
+
+    - URLs longer than max_url_length
+    - paths repeating a segment more than max_segment_repeats times
+    - session ID parameters (SESSION_PARAMS) and parameters taking more than
+      max_query_values distinct non-numeric values on the same path
+    - numeric sequences: more than max_sequence links queued from a page of
+      the same family that step one of its numbers by one, the way calendars
+      link to the next and previous month
+
+    A family is a host plus the path with its numbers replaced by "N" (and
+    the query parameter names); once a family is quarantined none of its
+    URLs are queued any more. Used from the crawl loop thread only.
+
+    Args:
+        max_url_length: Longest URL queued
+        max_segment_repeats: Most occurrences of one path segment
+        max_query_values: Most distinct non-numeric values of a query
+            parameter per path
+        max_sequence: Most "next/previous number" links queued per family
+        log: Called with a message when a family is quarantined
+    """
+
+    def __init__(
+        self,
+        max_url_length=DEFAULT_MAX_URL_LENGTH,
+        max_segment_repeats=DEFAULT_MAX_SEGMENT_REPEATS,
+        max_query_values=DEFAULT_MAX_QUERY_VALUES,
+        max_sequence=DEFAULT_MAX_SEQUENCE,
+        log=None,
+    ):
+        self.max_url_length = max_url_length
+        self.max_segment_repeats = max_segment_repeats
+        self.max_query_values = max_query_values
+        self.max_sequence = max_sequence
+        self.log = log
+        self._families = {}
+        # Values seen per "family?parameter" that is not quarantined yet
+        self._param_values = {}
+        # Next/previous number links queued per family
+        self._sequences = Counter()
+        # The page whose links are being checked: (family, numbers)
+        self._page = (None, ())
+        # Family of the last link that stepped a number of the page
+        self._step = (None, None)
+
+    def begin_page(self, url):
+        """Start checking the links of a crawled page"""
+        template = self._template(url)[0]
+        self._page = (template, self._numbers(url))
+
+    def check(self, url):
+        """
+        Check a link of the current page
+
+        Returns:
+            The trap reason if the link must not be queued, else None
+        """
+        template, path, params = self._template(url)
+
+        if len(url) > self.max_url_length:
+            family = template[:_FAMILY_LENGTH]
+            if len(family) < len(template):
+                family += "..."
+            return self._quarantine(family, TRAP_LONG_URL, url)
+
+        repeated = self._repeated_prefix(path)
+        if repeated is not None:
+            family = template.split("/", 1)[0] + repeated
+            return self._quarantine(family, TRAP_REPEATED_SEGMENTS, url)
+
+        trap = self._families.get(template)
+        if trap is not None:
+            trap.quarantined += 1
+            return trap.reason
+
+        base = template.split("?", 1)[0]
+        for name, value in params:
+            key = f"{base}?{name}="
+            trap = self._families.get(key)
+            if trap is not None:
+                trap.quarantined += 1
+                return trap.reason
+            if name.lower() in SESSION_PARAMS:
+                return self._quarantine(key, TRAP_SESSION_ID, url)
+            if value.isdigit():
+                # An ID or page number
+                continue
+            values = self._param_values.setdefault(key, set())
+            values.add(value)
+            if len(values) > self.max_query_values:
+                del self._param_values[key]
+                return self._quarantine(key, TRAP_QUERY_CARDINALITY, url)
+
+        page_family, page_numbers = self._page
+        if template == page_family and self._is_step(page_numbers, url):
+            if self._sequences[template] >= self.max_sequence:
+                del self._sequences[template]
+                return self._quarantine(template, TRAP_NUMERIC_SEQUENCE, url)
+            self._step = (url, template)
+        return None
+
+    def queued(self, url):
+        """Record that a link passed by check() was queued"""
+        step_url, template = self._step
+        if url == step_url:
+            self._sequences[template] += 1
+
+    @staticmethod
+    def _numbers(url):
+        """Numbers in the path and query of a URL"""
+        parts = urlsplit(url)
+        return tuple(int(n) for n in _DIGITS.findall(f"{parts.path}?{parts.query}"))
+
+    def _is_step(self, page_numbers, url):
+        """True if url changes exactly one of the page's numbers, by one"""
+        numbers = self._numbers(url)
+        if len(numbers) != len(page_numbers):
+            return False
+        changed = [abs(a - b) for a, b in zip(numbers, page_numbers) if a != b]
+        return changed == [1]
+
+    def _template(self, url):
+        """(family, path, [(parameter, value)]) of a URL"""
+        parts = urlsplit(url)
+        path = parts.path
+        if ";" in path:
+            # Path parameters such as ;jsessionid=... are query-like
+            path, _, extra = path.partition(";")
+            params = parse_qsl(extra.replace(";", "&"), keep_blank_values=True)
+        else:
+            params = []
+        params.extend(parse_qsl(parts.query, keep_blank_values=True))
+        family = parts.netloc.lower() + _DIGITS.sub("N", path)
+        if params:
+            family += "?" + "&".join(sorted({name for name, _ in params}))
+        return family, path, params
+
+    def _repeated_prefix(self, path):
+        """Path up to the segment repeated too often, or None"""
+        counts = Counter()
+        position = 0
+        for segment in path.split("/"):
+            position += len(segment) + 1
+            if not segment:
+                continue
+            counts[segment] += 1
+            if counts[segment] > self.max_segment_repeats:
+                return _DIGITS.sub("N", path[: position - 1])
+        return None
+
+    def _quarantine(self, family, reason, url):
+        trap = self._families.get(family)
+        if trap is None:
+            trap = self._families[family] = _TrapFamily(reason, url)
+            if self.log:
+                self.log(f"Crawler trap ({reason}), not following: {family}")
+        trap.quarantined += 1
+        return trap.reason
+
+    def report(self):
+        """Quarantined families, most quarantined URLs first"""
+        return [
+            {
+                "family": family,
+                "reason": trap.reason,
+                "quarantined": trap.quarantined,
+                "example": trap.example,
+            }
+            for family, trap in sorted(
+                self._families.items(), key=lambda item: -item[1].quarantined
+            )
+        ]
+
+    def stats(self):
+        return {
+            "families": len(self._families),
+            "quarantined": sum(trap.quarantined for trap in self._families.values()),
+        }
@@ -0,0 +1,175 @@
+"""
+URL rules - include/exclude rules (prefixes, globs, regexes) compiled into a
+single matcher for the links a crawl follows
+"""
+
+import fnmatch
+import re
+
+# Rule kinds, written as "<kind>:<pattern>"; a rule without one is a prefix
+RULE_PREFIX = "prefix"
+RULE_GLOB = "glob"
+RULE_REGEX = "re"
+RULE_KINDS = (RULE_PREFIX, RULE_GLOB, RULE_REGEX)
+
+# Up to this many prefix-only rules are checked with str.startswith, which
+# beats the regex engine for a handful of prefixes
+STARTSWITH_LIMIT = 16
+
+# Global inline flags at the start of a regex, e.g. "(?i)"
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def parse_rule(rule):
+    """
+    Split a rule into (kind, pattern)
+
+    Raises:
+        ValueError: The rule is empty
+    """
+    if not rule:
+        raise ValueError("Empty URL rule")
+    kind, separator, pattern = rule.partition(":")
+    if separator and kind in RULE_KINDS:
+        return kind, pattern
+    return RULE_PREFIX, rule
+
+
+def prefix_pattern(prefixes):
+    """
+    Regex matching a string that starts with any of prefixes
+
+    The prefixes are put in a trie first, so each character of a URL is
+    matched once however many prefixes share it (an alternation of the
+    prefixes would try them one after the other).
+    """
+    trie = {}
+    for prefix in prefixes:
+        node = trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        # A prefix ends here: anything may follow
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+def _trie_pattern(node):
+    if "" in node:
+        # A shorter prefix already matches, longer ones add nothing
+        return ""
+    branches = []
+    for char in sorted(node):
+        text = re.escape(char)
+        child = node[char]
+        # Follow single-child chains as one literal
+        while len(child) == 1 and "" not in child:
+            ((char, child),) = child.items()
+            text += re.escape(char)
+        branches.append(text + _trie_pattern(child))
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def _scoped_regex(pattern):
+    """Turn leading global flags like "(?i)x" into scoped ones, "(?i:x)" """
+    flags = _GLOBAL_FLAGS.match(pattern)
+    if flags:
+        return f"(?{flags.group(1)}:{pattern[flags.end():]})"
+    return pattern
+
+
+def compile_rules(rules):
+    """
+    Compile rules into one predicate
+
+    Regexes with groups are searched one by one: joined into one pattern,
+    their group names could clash and their backreferences would point at
+    the wrong groups.
+
+    Returns:
+        A function of a URL that is true if any rule matches it, or None
+        if there are no rules
+
+    Raises:
+        ValueError: A rule is empty or its regex does not compile
+    """
+    prefixes = []
+    anchored = []
+    searched = []
+    separate = []
+    for rule in rules:
+        kind, pattern = parse_rule(rule)
+        if kind == RULE_PREFIX:
+            prefixes.append(pattern)
+        elif kind == RULE_GLOB:
+            anchored.append(fnmatch.translate(pattern))
+        else:
+            pattern = _scoped_regex(pattern)
+            try:
+                regex = re.compile(pattern, re.DOTALL)
+            except re.error as e:
+                raise ValueError(f"Invalid URL rule {rule!r}: {e}") from e
+            if regex.groups:
+                separate.append(regex.search)
+            else:
+                searched.append(pattern)
+
+    if not (prefixes or anchored or searched or separate):
+        return None
+    if (
+        not (anchored or searched or separate)
+        and len(prefixes) <= STARTSWITH_LIMIT
+    ):
+        prefixes = tuple(prefixes)
+        return lambda url: url.startswith(prefixes)
+
+    matchers = separate
+    if prefixes or anchored or searched:
+        if prefixes:
+            anchored.insert(0, prefix_pattern(prefixes))
+        alternatives = [f"(?:{pattern})" for pattern in anchored]
+        if searched:
+            alternatives.append(
+                ".*?(?:" + "|".join(f"(?:{pattern})" for pattern in searched) + ")"
+            )
+        try:
+            combined = re.compile("|".join(alternatives), re.DOTALL)
+        except re.error as e:
+            raise ValueError(f"Invalid URL rules: {e}") from e
+        matchers.insert(0, combined.match)
+    if len(matchers) == 1:
+        return matchers[0]
+    return lambda url: any(match(url) for match in matchers)
+
+
+class UrlRules:
+    """
+    Include and exclude rules for the links a crawl follows.
+
+    A rule is a URL prefix, "glob:<pattern>" (fnmatch syntax, matched
+    against the whole URL; * also matches "/") or "re:<regex>" (searched
+    anywhere in the URL). A URL passes if it matches an include rule (or
+    there are none) and no exclude rule. Each side is compiled into one
+    regex, with the prefixes merged into a trie, so checking a URL does not
+    loop over the rules.
+
+    Args:
+        include: Rules a URL must match one of
+        exclude: Rules a URL must match none of
+    """
+
+    def __init__(self, include=(), exclude=()):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._include = compile_rules(self.include)
+        self._exclude = compile_rules(self.exclude)
+
+    def matches(self, url):
+        """True if the URL passes the rules"""
+        if self._include is not None and not self._include(url):
+            return False
+        return self._exclude is None or not self._exclude(url)
+
+    def __repr__(self):
+        return f"UrlRules(include={self.include!r}, exclude={self.exclude!r})"
@@ -0,0 +1,251 @@
+"""
+URL store - memory-compact sets of URLs for very large crawls
+
+A plain set of URL strings costs well over 100 bytes per URL. The stores
+here keep a 64-bit fingerprint per URL in a flat array instead (8 bytes per
+slot), or a Bloom filter (a couple of bytes per URL, with false positives).
+With 64-bit fingerprints the chance of any collision among a million URLs
+is about 3 in 100 million.
+"""
+
+import math
+from array import array
+from hashlib import blake2b
+
+URL_STORE_EXACT = "exact"
+URL_STORE_COMPACT = "compact"
+URL_STORE_BLOOM = "bloom"
+URL_STORES = (URL_STORE_EXACT, URL_STORE_COMPACT, URL_STORE_BLOOM)
+
+# Slot markers; real fingerprints are moved out of this range
+EMPTY = 0
+DELETED = 1
+
+MIN_SLOTS = 1024
+MAX_LOAD = 0.75
+
+DEFAULT_BLOOM_CAPACITY = 1_000_000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+
+def url_fingerprint(url):
+    """Return a stable 64-bit fingerprint of a URL (never EMPTY or DELETED)"""
+    digest = blake2b(url.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    fingerprint = int.from_bytes(digest, "little")
+    return fingerprint if fingerprint > DELETED else fingerprint + 2
+
+
+class FingerprintSet:
+    """
+    Set of URLs stored as 64-bit fingerprints in an open-addressing hash
+    table backed by array("Q"). Supports add, discard, membership and len;
+    the URLs themselves are not kept, so it cannot be iterated.
+    """
+
+    def __init__(self, capacity=0):
+        slots = MIN_SLOTS
+        while slots * MAX_LOAD < capacity:
+            slots *= 2
+        self._allocate(slots)
+
+    def _allocate(self, slots):
+        self._slots = array("Q", bytes(8 * slots))
+        self._mask = slots - 1
+        self._count = 0
+        self._used = 0  # live entries plus DELETED markers
+
+    def _find(self, fingerprint):
+        """Return the slot holding fingerprint, or the slot it should go in"""
+        slots = self._slots
+        mask = self._mask
+        index = fingerprint & mask
+        free = -1
+        while True:
+            value = slots[index]
+            if value == fingerprint:
+                return index
+            if value == EMPTY:
+                return index if free < 0 else free
+            if value == DELETED and free < 0:
+                free = index
+            index = (index + 1) & mask
+
+    def _grow(self):
+        """Rehash into a table large enough for the live entries, dropping DELETED"""
+        old = self._slots
+        slots = len(old)
+        if (self._count + 1) > slots * MAX_LOAD / 2:
+            slots *= 2
+        self._allocate(slots)
+        for fingerprint in old:
+            if fingerprint > DELETED:
+                self._insert(fingerprint)
+
+    def _insert(self, fingerprint):
+        """Add a fingerprint; returns True if it was not present"""
+        index = self._find(fingerprint)
+        value = self._slots[index]
+        if value == fingerprint:
+            return False
+        if value == EMPTY:
+            self._used += 1
+        self._slots[index] = fingerprint
+        self._count += 1
+        return True
+
+    def add(self, url):
+        """Add a URL; returns True if it was not already in the set"""
+        if self._used + 1 > len(self._slots) * MAX_LOAD:
+            self._grow()
+        return self._insert(url_fingerprint(url))
+
+    def discard(self, url):
+        """Remove a URL if present"""
+        fingerprint = url_fingerprint(url)
+        index = self._find(fingerprint)
+        if self._slots[index] == fingerprint:
+            self._slots[index] = DELETED
+            self._count -= 1
+
+    def clear(self):
+        self._allocate(MIN_SLOTS)
+
+    def __contains__(self, url):
+        fingerprint = url_fingerprint(url)
+        return self._slots[self._find(fingerprint)] == fingerprint
+
+    def __len__(self):
+        return self._count
+
+    def nbytes(self):
+        """Bytes used by the fingerprint table"""
+        return self._slots.itemsize * len(self._slots)
+
+
+class CompactUrlSet:
+    """
+    Deduplicated URL collection for results: membership is checked against a
+    FingerprintSet and each URL string is kept once, in insertion order,
+    without the per-entry overhead of a set. Iterating yields the URLs.
+    """
+
+    def __init__(self, urls=()):
+        self._fingerprints = FingerprintSet()
+        self._urls = []
+        for url in urls:
+            self.add(url)
+
+    def add(self, url):
+        """Add a URL; returns True if it was not already present"""
+        if self._fingerprints.add(url):
+            self._urls.append(url)
+            return True
+        return False
+
+    def clear(self):
+        self._fingerprints.clear()
+        self._urls = []
+
+    def __contains__(self, url):
+        return url in self._fingerprints
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __iter__(self):
+        return iter(self._urls)
+
+
+class BloomFilter:
+    """
+    Bloom filter over URL fingerprints in a bytearray.
+
+    Membership tests may return false positives (at about error_rate once
+    capacity URLs were added, more beyond that) but never false negatives.
+    URLs cannot be removed. len() counts the adds that were new to the filter.
+    """
+
+    def __init__(
+        self, capacity=DEFAULT_BLOOM_CAPACITY, error_rate=DEFAULT_BLOOM_ERROR_RATE
+    ):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError(
+                "Bloom filter needs a positive capacity and 0 < error_rate < 1"
+            )
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        """Bit positions for a URL (double hashing from one 64-bit fingerprint)"""
+        fingerprint = url_fingerprint(url)
+        first = fingerprint & 0xFFFFFFFF
+        step = (fingerprint >> 32) | 1
+        num_bits = self.num_bits
+        return [(first + i * step) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, url):
+        """Add a URL; returns True if it was (probably) not already present"""
+        bits = self._bits
+        added = False
+        for position in self._positions(url):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self._count += 1
+        return added
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
+
+    def __contains__(self, url):
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(url)
+        )
+
+    def __len__(self):
+        return self._count
+
+    def nbytes(self):
+        """Bytes used by the bit array"""
+        return len(self._bits)
+
+
+def create_url_stores(
+    kind=URL_STORE_EXACT, bloom_capacity=DEFAULT_BLOOM_CAPACITY, keep_found=True
+):
+    """
+    Create the (seen, visited, found) URL collections for a crawl
+
+    seen is the frontier's "already queued" check, visited holds the pages
+    fetched and found the links reported as results (the only store that
+    keeps URL strings).
+
+    Args:
+        kind: "exact" (plain sets), "compact" (fingerprint sets) or "bloom"
+            (fingerprint sets with a Bloom filter as the seen check)
+        bloom_capacity: Number of distinct URLs the Bloom filter is sized for
+        keep_found: False makes found a FingerprintSet that only deduplicates
+            (the links are streamed to an export file instead of returned)
+    """
+    if kind == URL_STORE_EXACT:
+        stores = set(), set(), set()
+    elif kind == URL_STORE_COMPACT:
+        stores = FingerprintSet(), FingerprintSet(), CompactUrlSet()
+    elif kind == URL_STORE_BLOOM:
+        stores = BloomFilter(bloom_capacity), FingerprintSet(), CompactUrlSet()
+    else:
+        raise ValueError(f"Unknown URL store: {kind}")
+    if not keep_found:
+        stores = stores[0], stores[1], FingerprintSet()
+    return stores
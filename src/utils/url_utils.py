@@ -2,9 +2,48 @@
 URL utility functions for the crawler
 """
 
-from urllib.parse import urljoin, urlparse, urlunparse
+from functools import lru_cache
+from urllib.parse import (
+    unquote_plus,
+    urljoin,
+    urlparse,
+    urlsplit,
+    urlunparse,
+    urlunsplit,
+)
 import re
 
+# Query parameters that only track where a visitor came from; removed by
+# canonicalize_url so the same page is not crawled once per campaign
+DEFAULT_TRACKING_PARAMS = frozenset(
+    {
+        "utm_source",
+        "utm_medium",
+        "utm_campaign",
+        "utm_term",
+        "utm_content",
+        "utm_id",
+        "gclid",
+        "dclid",
+        "fbclid",
+        "msclkid",
+        "yclid",
+        "mc_cid",
+        "mc_eid",
+        "igshid",
+        "_ga",
+        "_gl",
+    }
+)
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Resolved links remembered by resolve_link
+LINK_CACHE_SIZE = 65536
+
+PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+SCHEME_PREFIX = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
 
 def normalize_url(url):
     """
@@ -25,6 +64,80 @@ def normalize_url(url):
     return normalized
 
 
+def remove_dot_segments(path):
+    """
+    Resolve "." and ".." segments in an absolute URL path (RFC 3986 5.2.4)
+    """
+    if "." not in path:
+        return path
+
+    segments = path.split("/")
+    output = []
+    for segment in segments:
+        if segment == ".":
+            continue
+        if segment == "..":
+            # The leading empty segment (root) is never removed
+            if len(output) > 1:
+                output.pop()
+            continue
+        output.append(segment)
+    if segments[-1] in (".", ".."):
+        output.append("")
+    return "/".join(output)
+
+
+def _upper_escapes(value):
+    """Uppercase percent-escapes (%2f -> %2F), which are case-insensitive"""
+    if "%" not in value:
+        return value
+    return PERCENT_ESCAPE.sub(lambda match: match.group(0).upper(), value)
+
+
+def canonicalize_url(url, strip_params=DEFAULT_TRACKING_PARAMS):
+    """
+    Reduce a URL to a canonical form so equivalent URLs compare equal
+
+    Lowercases scheme and host, drops the default port, the fragment and
+    query parameters named in strip_params, resolves dot segments, sorts the
+    query parameters and uppercases percent-escapes. An empty path becomes "/".
+    """
+    parsed = urlsplit(url.strip())
+    scheme = parsed.scheme.lower()
+
+    netloc = parsed.netloc
+    if netloc:
+        userinfo, at, hostport = netloc.rpartition("@")
+        host, port = hostport, ""
+        if hostport.startswith("["):
+            # IPv6 literal: the port follows the closing bracket
+            end = hostport.find("]") + 1
+            if end and hostport[end : end + 1] == ":":
+                host, port = hostport[:end], hostport[end + 1 :]
+        elif ":" in hostport:
+            host, _, port = hostport.rpartition(":")
+        netloc = userinfo + at + host.lower()
+        if port and port != DEFAULT_PORTS.get(scheme):
+            netloc += ":" + port
+
+    path = _upper_escapes(remove_dot_segments(parsed.path))
+    if not path and netloc:
+        path = "/"
+
+    query = parsed.query
+    if query:
+        pairs = [pair for pair in query.split("&") if pair]
+        if strip_params:
+            pairs = [
+                pair
+                for pair in pairs
+                if unquote_plus(pair.split("=", 1)[0]).lower() not in strip_params
+            ]
+        query = _upper_escapes("&".join(sorted(pairs)))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
 def is_valid_url(url):
     """
     Check if a URL is valid
@@ -43,6 +156,65 @@ def resolve_relative_url(base_url, relative_url):
     return urljoin(base_url, relative_url)
 
 
+@lru_cache(maxsize=LINK_CACHE_SIZE)
+def _resolve_link_cached(base_url, href, canonical, strip_params):
+    url = urljoin(base_url, href)
+    if canonical:
+        url = canonicalize_url(url, strip_params)
+    else:
+        url = normalize_url(url)
+    return url if is_valid_url(url) else None
+
+
+def _link_cache_base(base_url, href):
+    """
+    The part of base_url an href actually depends on
+
+    Absolute hrefs ignore the base and root-relative ones only use its scheme
+    and host, so such links share one cache entry across all pages of a site.
+    """
+    if SCHEME_PREFIX.match(href):
+        return ""
+    scheme_end = base_url.find("://")
+    if scheme_end < 0 or not href.startswith("/"):
+        return base_url
+    if href.startswith("//"):
+        return base_url[: scheme_end + 1]
+
+    host_start = scheme_end + 3
+    host_end = len(base_url)
+    for separator in "/?#":
+        index = base_url.find(separator, host_start)
+        if 0 <= index < host_end:
+            host_end = index
+    return base_url[:host_end]
+
+
+def resolve_link(
+    base_url, href, canonical=True, strip_params=DEFAULT_TRACKING_PARAMS
+):
+    """
+    Resolve an href found on base_url, normalize it and validate it in one
+    memoized step
+
+    Args:
+        base_url: URL of the page the href appeared on
+        href: Raw href attribute value
+        canonical: Apply canonicalize_url (otherwise only normalize_url)
+        strip_params: Query parameter names removed when canonicalizing
+            (must be hashable, e.g. a frozenset)
+
+    Returns:
+        The absolute URL, or None if the href does not give a valid URL
+    """
+    href = href.strip()
+    if not href:
+        return None
+    return _resolve_link_cached(
+        _link_cache_base(base_url, href), href, canonical, strip_params
+    )
+
+
 def url_matches_prefix(url, prefix):
     """
     Check if a URL starts with the given prefix
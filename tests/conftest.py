@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic_site import SiteConfig, serve_site
+
+
+@pytest.fixture(scope="session")
+def site():
+    """(SiteConfig, base URL) of a small synthetic site served for the session"""
+    config = SiteConfig(pages=300, fanout=5, page_size=2000)
+    server, base_url = serve_site(config)
+    yield config, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def crawl_options(site):
+    """crawl() arguments that cover the whole synthetic site"""
+    config, base_url = site
+    return {
+        "url_prefix": base_url,
+        "max_depth": 10,
+        "max_pages": config.pages,
+        "request_delay": 0,
+        "workers": 4,
+    }
+
+
+@pytest.fixture
+def full_crawl(site, crawl_options):
+    """Links found by an uninterrupted threaded crawl of the site"""
+    from src.tools.crawler import SublinkCrawler
+
+    return SublinkCrawler().crawl(f"{site[1]}/p/0", **crawl_options)
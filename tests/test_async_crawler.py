@@ -0,0 +1,20 @@
+"""
+Tests for the asyncio crawl backend against the synthetic site
+"""
+
+import pytest
+
+from src.tools.crawler.backends import CRAWLER_BACKENDS, create_crawler
+
+
+@pytest.mark.parametrize("backend", sorted(CRAWLER_BACKENDS))
+def test_backend_finds_site_links(site, crawl_options, backend):
+    config, base_url = site
+    links = create_crawler(backend).crawl(f"{base_url}/p/0", **crawl_options)
+    expected = config.expected_links(base_url, crawl_options["max_depth"])
+    assert set(links) == expected
+
+
+def test_asyncio_matches_threaded_crawl(site, crawl_options, full_crawl):
+    links = create_crawler("asyncio").crawl(f"{site[1]}/p/0", **crawl_options)
+    assert links == full_crawl
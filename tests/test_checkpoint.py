@@ -0,0 +1,92 @@
+"""
+Tests for crawl checkpoints and resuming a crawl from one
+"""
+
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.checkpoint import CrawlCheckpoint
+from src.tools.crawler.frontier import CrawlFrontier
+
+
+def test_empty_checkpoint_holds_no_crawl(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "crawl.db"))
+    assert checkpoint.load() is None
+    checkpoint.close()
+
+
+def test_saves_are_incremental(tmp_path):
+    path = str(tmp_path / "crawl.db")
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.start({"start_url": "https://ex.com/", "max_depth": 3})
+    checkpoint.save([], ["https://ex.com/a"], [("https://ex.com/", 0)])
+    checkpoint.save(
+        ["https://ex.com/"],
+        ["https://ex.com/a", "https://ex.com/b"],
+        [("https://ex.com/b", 2), ("https://ex.com/a", 1)],
+        ["https://ex.com/"],
+    )
+    # Seen again at a shallower depth: keeps its place, takes the depth
+    checkpoint.save([], [], [("https://ex.com/b", 1)])
+    checkpoint.close()
+
+    state = CrawlCheckpoint(path).load()
+    assert state["params"] == {"start_url": "https://ex.com/", "max_depth": 3}
+    assert state["visited"] == {"https://ex.com/"}
+    assert state["found"] == {"https://ex.com/a", "https://ex.com/b"}
+    assert state["pending"] == [("https://ex.com/b", 1), ("https://ex.com/a", 1)]
+
+
+def test_start_discards_the_previous_crawl(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "crawl.db"))
+    checkpoint.start({"start_url": "https://ex.com/"})
+    checkpoint.save(
+        ["https://ex.com/"], ["https://ex.com/a"], [("https://ex.com/a", 1)]
+    )
+    checkpoint.start({"start_url": "https://other.com/"})
+    state = checkpoint.load()
+    checkpoint.close()
+    assert state == {
+        "params": {"start_url": "https://other.com/"},
+        "visited": set(),
+        "found": set(),
+        "pending": [],
+    }
+
+
+def test_frontier_changes_restore_the_frontier(tmp_path):
+    frontier = CrawlFrontier(max_depth=5, track_changes=True)
+    checkpoint = CrawlCheckpoint(str(tmp_path / "crawl.db"))
+    checkpoint.start({"max_depth": 5})
+    for depth, url in enumerate(["https://ex.com/", "https://ex.com/a"]):
+        frontier.push(url, depth)
+    checkpoint.save([], [], *frontier.take_changes())
+
+    url, depth = frontier.pop()
+    frontier.push("https://ex.com/b", depth + 1)
+    frontier.complete(url)
+    checkpoint.save([url], [], *frontier.take_changes())
+
+    assert checkpoint.load()["pending"] == frontier.pending()
+    checkpoint.close()
+
+
+def test_resume_matches_full_crawl(site, crawl_options, full_crawl, tmp_path):
+    checkpoint = str(tmp_path / "crawl.db")
+    crawler = SublinkCrawler()
+    pages = []
+
+    def stop_after_some_pages(message):
+        if message.startswith("Crawling"):
+            pages.append(message)
+            if len(pages) == 50:
+                crawler.stop_crawl()
+
+    crawler.set_progress_callback(stop_after_some_pages)
+    partial = crawler.crawl(
+        f"{site[1]}/p/0",
+        checkpoint_path=checkpoint,
+        checkpoint_interval=10,
+        **crawl_options,
+    )
+    assert len(partial) < len(full_crawl)
+
+    assert SublinkCrawler().resume(checkpoint) == full_crawl
@@ -0,0 +1,80 @@
+"""
+Tests for distributed crawls through a shared coordinator
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.distributed import run_local_workers
+
+
+def test_distributed_matches_full_crawl(site, crawl_options, full_crawl, tmp_path):
+    links = run_local_workers(
+        f"{site[1]}/p/0",
+        str(tmp_path / "coordinator.db"),
+        2,
+        quiet=True,
+        **crawl_options,
+    )
+    assert links == full_crawl
+
+
+class SitemapSiteHandler(BaseHTTPRequestHandler):
+    """/ links to /a; the sitemap also lists /hidden, which nothing links to"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/sitemap.xml":
+            body = (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"<url><loc>{self.server.base_url}/hidden</loc></url></urlset>"
+            )
+            content_type = "application/xml"
+        elif self.path in ("/", "/a", "/hidden"):
+            body = '<html><a href="/a">a</a></html>'
+            content_type = "text/html"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def sitemap_site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SitemapSiteHandler)
+    server.daemon_threads = True
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.base_url
+    server.shutdown()
+
+
+def test_distributed_crawl_reports_sitemap_links(sitemap_site, tmp_path):
+    options = {"url_prefix": sitemap_site, "request_delay": 0, "sitemaps": "seed"}
+    expected = SublinkCrawler().crawl(f"{sitemap_site}/", **options)
+    assert f"{sitemap_site}/hidden" in expected
+
+    links = run_local_workers(
+        f"{sitemap_site}/", str(tmp_path / "coordinator.db"), 2, quiet=True, **options
+    )
+    assert links == expected
+
+
+def test_sitemap_only_scan_is_not_distributed(sitemap_site, tmp_path):
+    with pytest.raises(ValueError):
+        SublinkCrawler().crawl(
+            f"{sitemap_site}/",
+            sitemaps="only",
+            coordinator_path=str(tmp_path / "coordinator.db"),
+            num_workers=1,
+        )
@@ -0,0 +1,40 @@
+"""
+Tests for the connection reuse statistics of the crawl's HTTP pool
+"""
+
+import socket
+
+import pytest
+
+from src.tools.crawler.backends import CRAWLER_BACKENDS, create_crawler
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("backend", sorted(CRAWLER_BACKENDS))
+def test_keep_alive_connections_are_reused(site, crawl_options, backend):
+    crawler = create_crawler(backend)
+    crawler.crawl(f"{site[1]}/p/0", **crawl_options)
+    stats = crawler.pool_stats.stats()
+    assert stats["reused"] > stats["connections"]
+    assert stats["reused"] + stats["connections"] == stats["requests"]
+
+
+@pytest.mark.parametrize("backend", sorted(CRAWLER_BACKENDS))
+def test_failed_requests_are_not_reuse(backend):
+    crawler = create_crawler(backend)
+    crawler.crawl(
+        f"http://127.0.0.1:{unused_port()}/",
+        request_delay=0,
+        connect_retries=0,
+        respect_robots=False,
+    )
+    stats = crawler.pool_stats.stats()
+    assert stats["requests"] and stats["connect_errors"]
+    assert stats["connections"] == 0
+    assert stats["reused"] == 0
+    assert "(0% reused)" in crawler.pool_stats.summary()
@@ -0,0 +1,161 @@
+"""
+Tests for the link graph
+"""
+
+import pytest
+
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.link_graph import (
+    GRAPH_BINARY,
+    GRAPH_EDGES,
+    GRAPH_SCORES,
+    LinkGraph,
+    graph_format_for_path,
+    load_link_graph,
+)
+
+
+def small_graph():
+    # a -> b, c; b -> c; c -> a; d only found (linked from c)
+    graph = LinkGraph("a")
+    graph.add_page("a", ["b", "c", "b", "a"], depth=0)
+    graph.add_page("b", ["c"], depth=1)
+    graph.add_page("c", ["a", "d"], depth=1)
+    return graph
+
+
+def test_nodes_and_edges():
+    graph = small_graph()
+    assert graph.urls == ["a", "b", "c", "d"]
+    assert graph.node_id("a") == 0
+    assert "d" in graph and "e" not in graph
+    assert graph.edge_count == 5
+    offsets, targets = graph.csr()
+    assert list(offsets) == [0, 2, 3, 5, 5]
+    assert list(targets) == [1, 2, 2, 0, 3]
+    assert list(graph.out_degree()) == [2, 1, 2, 0]
+    assert list(graph.in_degree()) == [1, 1, 2, 1]
+    assert graph.stats()["links"] == 5
+
+
+def test_root_is_node_zero():
+    graph = LinkGraph("start")
+    graph.add_page("other", ["start"])
+    assert graph.node_id("start") == 0
+    assert list(graph.depths()) == [0, -1]
+
+
+def test_add_page_replaces_links():
+    graph = small_graph()
+    graph.csr()
+    graph.add_page("b", ["d", "a"], depth=1)
+    offsets, targets = graph.csr()
+    assert list(targets[offsets[1] : offsets[2]]) == [3, 0]
+    assert graph.edge_count == 6
+
+
+def test_depths():
+    graph = small_graph()
+    assert list(graph.depths()) == [0, 1, 1, 2]
+
+    # A page crawled at a known depth seeds the search even without a path
+    # to it in the graph (e.g. crawled before a resume)
+    graph = LinkGraph("root")
+    graph.add_page("root", [], depth=0)
+    graph.add_page("deep", ["deeper"], depth=3)
+    graph.add_page("unreached", ["deeper"])
+    assert list(graph.depths()) == [0, 3, 4, -1]
+
+
+def test_pagerank():
+    graph = small_graph()
+    rank = graph.pagerank()
+    assert sum(rank) == pytest.approx(1.0)
+    assert max(range(len(graph)), key=rank.__getitem__) == graph.node_id("c")
+    assert LinkGraph().pagerank().tolist() == []
+
+    report = graph.report()
+    assert [row["rank"] for row in report] == sorted(rank, reverse=True)
+    assert graph.report(count=2) == report[:2]
+    assert report[0] == {
+        "url": "c",
+        "rank": rank[2],
+        "in_degree": 2,
+        "out_degree": 2,
+        "depth": 1,
+    }
+
+
+def test_save_and_load(tmp_path):
+    graph = small_graph()
+    path = tmp_path / "graph.csr"
+    graph.save(path)
+    loaded = load_link_graph(path)
+    assert loaded.urls == graph.urls
+    assert loaded.csr() == graph.csr()
+    assert loaded.depths() == graph.depths()
+    assert loaded.pagerank() == graph.pagerank()
+
+    # A loaded graph can take more pages
+    loaded.add_page("d", ["a"], depth=2)
+    assert loaded.edge_count == 6
+
+    empty = tmp_path / "empty.csr"
+    LinkGraph().save(empty)
+    assert len(load_link_graph(empty)) == 0
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "graph.csr"
+    path.write_bytes(b"not a graph")
+    with pytest.raises(ValueError):
+        load_link_graph(path)
+
+    small_graph().save(path)
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(ValueError):
+        load_link_graph(path)
+
+
+def test_export(tmp_path):
+    graph = small_graph()
+    edges = tmp_path / "graph.tsv"
+    graph.export(edges)
+    assert edges.read_text().splitlines() == [
+        "a\tb",
+        "a\tc",
+        "b\tc",
+        "c\ta",
+        "c\td",
+    ]
+
+    scores = tmp_path / "graph.csv"
+    graph.export(scores)
+    lines = scores.read_text().splitlines()
+    assert lines[0] == "url,rank,in_degree,out_degree,depth"
+    assert len(lines) == 5
+
+    binary = tmp_path / "graph.bin"
+    graph.export(binary)
+    assert load_link_graph(binary).urls == graph.urls
+
+    with pytest.raises(ValueError):
+        graph.export(tmp_path / "graph.txt", format="xml")
+
+
+def test_graph_format_for_path():
+    assert graph_format_for_path("graph.CSR") == GRAPH_BINARY
+    assert graph_format_for_path("scores.csv") == GRAPH_SCORES
+    assert graph_format_for_path("links.txt") == GRAPH_EDGES
+
+
+def test_crawl_records_the_link_graph(site, crawl_options, full_crawl):
+    config, base_url = site
+    crawler = SublinkCrawler()
+    crawler.crawl(f"{base_url}/p/0", link_graph=True, **crawl_options)
+    graph = crawler.link_graph
+    assert graph.node_id(f"{base_url}/p/0") == 0
+    assert set(graph.urls) >= set(full_crawl)
+    depths = graph.depths()
+    assert all(depths[graph.node_id(url)] >= 0 for url in crawler.crawled_urls)
+    assert sum(graph.pagerank()) == pytest.approx(1.0)
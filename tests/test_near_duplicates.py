@@ -0,0 +1,65 @@
+"""
+Tests for near-duplicate detection in a crawl
+"""
+
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.tools.crawler import SublinkCrawler
+
+WORDS = [f"word{i}" for i in range(2000)]
+TEXT = " ".join(random.Random(0).choice(WORDS) for _ in range(300))
+
+# /original and /copy share their text; only the copy links to /unique
+PAGES = {
+    "/": '<a href="/original">original</a>',
+    "/original": f'<p>{TEXT}</p><a href="/copy">copy</a><a href="/shared">x</a>',
+    "/copy": f'<p>{TEXT}</p><a href="/shared">x</a><a href="/unique">y</a>',
+    "/shared": "<p>Shared</p>",
+    "/unique": "<p>Unique</p>",
+}
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path not in PAGES:
+            self.send_error(404)
+            return
+        body = f"<html><body>{PAGES[self.path]}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_links_of_near_duplicates_are_reported_not_followed(base_url, parse_workers):
+    crawler = SublinkCrawler()
+    links = crawler.crawl(
+        f"{base_url}/",
+        url_prefix=base_url,
+        request_delay=0,
+        workers=1,
+        near_duplicates=True,
+        parse_workers=parse_workers,
+    )
+    assert f"{base_url}/unique" in links
+    assert [url for url, _, _ in crawler.duplicate_pages] == [f"{base_url}/copy"]
+    assert f"{base_url}/unique" not in crawler.crawled_urls
+    assert f"{base_url}/shared" in crawler.crawled_urls
@@ -0,0 +1,34 @@
+"""
+Tests for parsing crawled pages in a process pool
+"""
+
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.parse_pool import ParsePool
+
+PAGE = (
+    b'<html><body><a href="/docs/a#intro">a</a><a href="b?utm_source=x">b</a>'
+    b'<a href="mailto:me@ex.com">mail</a><a href="https://other.com/">o</a>'
+    b"</body></html>"
+)
+
+
+def test_pool_resolves_and_normalizes_links():
+    pool = ParsePool(1, "lxml", strip_params={"utm_source"})
+    try:
+        links, seconds, fingerprint = pool.submit(
+            "https://ex.com/docs/", PAGE
+        ).result(timeout=60)
+    finally:
+        pool.shutdown()
+    assert links == {
+        "https://ex.com/docs/a",
+        "https://ex.com/docs/b",
+        "https://other.com/",
+    }
+    assert seconds >= 0
+    assert fingerprint is None
+
+
+def test_parse_workers_match_full_crawl(site, crawl_options, full_crawl):
+    links = SublinkCrawler().crawl(f"{site[1]}/p/0", parse_workers=2, **crawl_options)
+    assert links == full_crawl
@@ -0,0 +1,142 @@
+"""
+Tests for per-host scheduling
+"""
+
+from email.utils import formatdate
+import time
+
+import pytest
+
+from src.tools.crawler.rate_limiter import (
+    WAIT_FOR_SLOT,
+    HostScheduler,
+    parse_crawl_delay,
+    parse_retry_after,
+)
+
+ROBOTS = """
+User-agent: *
+Crawl-delay: 2  # everyone
+Disallow: /private/
+
+User-agent: SublinkCrawler
+User-agent: OtherBot
+Crawl-delay: 0.25
+Disallow: /drafts/
+"""
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self, robots, user_agent="SublinkCrawler/1.0"):
+        self.robots = robots
+        self.headers = {"User-Agent": user_agent}
+
+    def get(self, url, timeout=None):
+        return FakeResponse(self.robots)
+
+
+def ready_scheduler(robots, url="https://ex.com/", **options):
+    scheduler = HostScheduler(FakeSession(robots), **options)
+    future = scheduler.host_ready(url)
+    if future is not None:
+        future.result()
+    assert scheduler.host_ready(url) is None
+    return scheduler
+
+
+def test_parse_crawl_delay():
+    lines = ROBOTS.splitlines()
+    assert parse_crawl_delay(lines, "SublinkCrawler/1.0") == 0.25
+    assert parse_crawl_delay(lines, "otherbot") == 0.25
+    assert parse_crawl_delay(lines, "Mozilla/5.0") == 2.0
+    assert parse_crawl_delay(["User-agent: bot", "Crawl-delay: 1"], "me") is None
+    assert parse_crawl_delay(["User-agent: *", "Crawl-delay: soon"], "me") is None
+    assert parse_crawl_delay([], "me") is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("whenever") is None
+    retry_at = formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(retry_at) <= 61
+    assert parse_retry_after(formatdate(0, usegmt=True)) == 0.0
+
+
+def test_robots_rules_and_crawl_delay():
+    scheduler = ready_scheduler(ROBOTS, request_delay=0.1)
+    # Only the group naming the crawler applies, not the "*" rules
+    assert scheduler.allowed("https://ex.com/private/page")
+    assert not scheduler.allowed("https://ex.com/drafts/page")
+    assert scheduler.stats()["robots_blocked"] == 1
+    # The Crawl-delay is slower than request_delay, so it is where hosts start
+    state = scheduler.hosts["ex.com"]
+    assert state.interval == 0.25
+    assert state.min_interval == 0.25
+
+
+def test_healthy_host_ramps_past_request_delay():
+    scheduler = ready_scheduler("", request_delay=1.0, max_concurrency=8)
+    state = scheduler.hosts["ex.com"]
+    now = time.monotonic()
+    for _ in range(10):
+        now += state.interval
+        assert scheduler.acquire("ex.com", now=now) == 0
+        scheduler.release("ex.com", 0.01, 200, now=now)
+    assert state.interval < 1.0
+    assert state.concurrency == 8
+
+
+def test_crawl_delay_is_never_undercut():
+    robots = "User-agent: *\nCrawl-delay: 0.5\n"
+    scheduler = ready_scheduler(robots, request_delay=0.0, max_concurrency=4)
+    state = scheduler.hosts["ex.com"]
+    now = time.monotonic()
+    for _ in range(20):
+        now += 1.0
+        assert scheduler.acquire("ex.com", now=now) == 0
+        scheduler.release("ex.com", 0.01, 200, now=now)
+    assert state.interval == 0.5
+    assert scheduler.acquire("ex.com", now=now) == pytest.approx(0.5)
+
+
+def test_slow_responses_return_to_request_delay():
+    scheduler = ready_scheduler("", request_delay=1.0, respect_robots=False)
+    state = scheduler.hosts["ex.com"]
+    now = time.monotonic()
+    for _ in range(3):
+        now += 1.0
+        assert scheduler.acquire("ex.com", now=now) == 0
+        scheduler.release("ex.com", 0.01, 200, now=now)
+    assert state.interval < 1.0
+    now += 1.0
+    assert scheduler.acquire("ex.com", now=now) == 0
+    scheduler.release("ex.com", 5.0, 200, now=now)
+    assert state.interval == 1.0
+
+
+def test_concurrency_limit():
+    scheduler = ready_scheduler("", max_concurrency=2, respect_robots=False)
+    assert scheduler.acquire("ex.com", now=1) == 0
+    assert scheduler.acquire("ex.com", now=1) == 0
+    assert scheduler.acquire("ex.com", now=1) == WAIT_FOR_SLOT
+    scheduler.release("ex.com", 0.01, 200, now=1)
+    assert scheduler.acquire("ex.com", now=1) == 0
+
+
+def test_backoff_on_429():
+    scheduler = ready_scheduler("", max_concurrency=4, respect_robots=False)
+    state = scheduler.hosts["ex.com"]
+    scheduler.acquire("ex.com", now=0)
+    scheduler.release("ex.com", 0.01, 429, retry_after=30, now=0)
+    assert scheduler.stats()["backoffs"] == 1
+    assert state.concurrency == 1
+    assert state.interval >= 0.5
+    assert scheduler.acquire("ex.com", now=10) == pytest.approx(20)
+    assert scheduler.acquire("ex.com", now=30) == 0
@@ -0,0 +1,17 @@
+"""
+Tests for replaying a crawl from its page archive
+"""
+
+import pytest
+
+from src.tools.crawler import ReplayCrawler, SublinkCrawler
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_replay_matches_network_crawl(site, crawl_options, tmp_path, parse_workers):
+    archive = str(tmp_path / "site.warc.gz")
+    start_url = f"{site[1]}/p/0"
+    links = SublinkCrawler().crawl(start_url, archive_path=archive, **crawl_options)
+
+    options = dict(crawl_options, parse_workers=parse_workers)
+    assert ReplayCrawler(archive).crawl(start_url, **options) == links
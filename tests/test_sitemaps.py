@@ -0,0 +1,92 @@
+"""
+Tests for sitemap parsing
+"""
+
+import gzip
+
+from src.tools.crawler.sitemaps import SitemapReader
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+
+class FakeSession:
+    def __init__(self, files):
+        self.files = files
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.files[url])
+
+
+URLSET = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+    ' xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">'
+    "{}</urlset>"
+)
+
+
+def read(files, *sitemaps):
+    return list(SitemapReader(FakeSession(files)).iter_urls(sitemaps))
+
+
+def test_lists_page_urls():
+    body = URLSET.format(
+        "<url><loc>https://ex.com/a</loc><lastmod>2024-01-01</lastmod></url>"
+        "<url><loc> https://ex.com/b </loc></url>"
+    )
+    files = {"https://ex.com/sitemap.xml": body.encode()}
+    assert read(files, "https://ex.com/sitemap.xml") == [
+        "https://ex.com/a",
+        "https://ex.com/b",
+    ]
+
+
+def test_image_locations_are_not_pages():
+    body = URLSET.format(
+        "<url><loc>https://ex.com/page1</loc>"
+        "<image:image><image:loc>https://ex.com/img1.jpg</image:loc></image:image>"
+        "</url>"
+        "<url><image:image><image:loc>https://ex.com/img2.jpg</image:loc>"
+        "</image:image><loc>https://ex.com/page2</loc></url>"
+    )
+    files = {"https://ex.com/sitemap.xml": body.encode()}
+    assert read(files, "https://ex.com/sitemap.xml") == [
+        "https://ex.com/page1",
+        "https://ex.com/page2",
+    ]
+
+
+def test_follows_sitemap_index_and_gzip():
+    index = (
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        "<sitemap><loc>https://ex.com/pages.xml.gz</loc></sitemap>"
+        "</sitemapindex>"
+    )
+    pages = URLSET.format("<url><loc>https://ex.com/a</loc></url>")
+    files = {
+        "https://ex.com/index.xml": index.encode(),
+        "https://ex.com/pages.xml.gz": gzip.compress(pages.encode()),
+    }
+    assert read(files, "https://ex.com/index.xml") == ["https://ex.com/a"]
+
+
+def test_sitemap_without_namespace():
+    body = b"<urlset><url><loc>https://ex.com/a</loc></url></urlset>"
+    files = {"https://ex.com/sitemap.xml": body}
+    assert read(files, "https://ex.com/sitemap.xml") == ["https://ex.com/a"]
@@ -0,0 +1,104 @@
+"""
+Tests for crawler trap detection
+"""
+
+from benchmarks.synthetic_site import TRAPS, SiteConfig, serve_site
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.trap_detector import (
+    TRAP_LONG_URL,
+    TRAP_NUMERIC_SEQUENCE,
+    TRAP_QUERY_CARDINALITY,
+    TRAP_REPEATED_SEGMENTS,
+    TRAP_SESSION_ID,
+    TrapDetector,
+)
+
+
+def check_from(detector, page, url):
+    detector.begin_page(page)
+    reason = detector.check(url)
+    if reason is None:
+        detector.queued(url)
+    return reason
+
+
+def test_plain_links_pass():
+    detector = TrapDetector()
+    detector.begin_page("https://ex.com/docs/")
+    assert detector.check("https://ex.com/docs/intro") is None
+    assert detector.check("https://ex.com/docs/api?lang=en") is None
+    assert detector.stats() == {"families": 0, "quarantined": 0}
+
+
+def test_long_urls():
+    detector = TrapDetector(max_url_length=50)
+    detector.begin_page("https://ex.com/")
+    assert detector.check("https://ex.com/" + "a" * 50) == TRAP_LONG_URL
+
+
+def test_repeated_path_segments():
+    detector = TrapDetector()
+    detector.begin_page("https://ex.com/")
+    assert detector.check("https://ex.com/a/b/a/b/") is None
+    assert detector.check("https://ex.com/a/b/a/b/a/") == TRAP_REPEATED_SEGMENTS
+
+
+def test_session_ids_quarantine_the_parameter():
+    detector = TrapDetector()
+    detector.begin_page("https://ex.com/")
+    assert detector.check("https://ex.com/page?sid=123") == TRAP_SESSION_ID
+    assert detector.check("https://ex.com/page;jsessionid=ab") == TRAP_SESSION_ID
+    assert detector.check("https://ex.com/page?sid=456&x=1") == TRAP_SESSION_ID
+    assert detector.stats()["quarantined"] == 3
+
+
+def test_query_cardinality_ignores_numeric_values():
+    detector = TrapDetector(max_query_values=10)
+    detector.begin_page("https://ex.com/")
+    for i in range(50):
+        assert detector.check(f"https://ex.com/item?id={i * 7}") is None
+    for i in range(10):
+        assert detector.check(f"https://ex.com/search?q=term{i}") is None
+    assert detector.check("https://ex.com/search?q=more") == TRAP_QUERY_CARDINALITY
+    assert detector.check("https://ex.com/search?q=term0") == TRAP_QUERY_CARDINALITY
+
+
+def test_numeric_sequences():
+    detector = TrapDetector(max_sequence=5)
+    for month in range(1, 6):
+        page = f"https://ex.com/calendar/2024/{month}"
+        link = f"https://ex.com/calendar/2024/{month + 1}"
+        assert check_from(detector, page, link) is None
+    reason = check_from(
+        detector, "https://ex.com/calendar/2024/6", "https://ex.com/calendar/2024/7"
+    )
+    assert reason == TRAP_NUMERIC_SEQUENCE
+    # The whole family is quarantined, not only the next step
+    assert detector.check("https://ex.com/calendar/2030/1") == TRAP_NUMERIC_SEQUENCE
+    assert detector.report()[0]["family"] == "ex.com/calendar/N/N"
+
+
+def test_trap_links_are_found_but_not_crawled():
+    site = SiteConfig(pages=200, fanout=5, page_size=2000, traps=TRAPS)
+    server, base_url = serve_site(site)
+    try:
+        crawler = SublinkCrawler()
+        links = crawler.crawl(
+            f"{base_url}/p/0",
+            url_prefix=base_url,
+            max_depth=10,
+            max_pages=2000,
+            request_delay=0,
+            workers=4,
+            trap_detection=True,
+            max_url_sequence=20,
+        )
+    finally:
+        server.shutdown()
+
+    session_links = {link for link in links if "?sid=" in link}
+    assert session_links
+    assert not session_links & set(crawler.crawled_urls)
+    assert site.expected_links(base_url, 10) <= set(links)
+    calendar_pages = [url for url in crawler.crawled_urls if "/calendar/" in url]
+    assert len(calendar_pages) < 200
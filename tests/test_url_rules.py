@@ -0,0 +1,75 @@
+"""
+Tests for the compiled include/exclude URL rules
+"""
+
+import pytest
+
+from src.tools.crawler.url_rules import (
+    RULE_GLOB,
+    RULE_PREFIX,
+    RULE_REGEX,
+    UrlRules,
+    compile_rules,
+    parse_rule,
+)
+
+
+def test_parse_rule():
+    assert parse_rule("https://ex.com/docs/") == (RULE_PREFIX, "https://ex.com/docs/")
+    assert parse_rule("glob:*/api/*") == (RULE_GLOB, "*/api/*")
+    assert parse_rule("re:\\.pdf$") == (RULE_REGEX, "\\.pdf$")
+    with pytest.raises(ValueError):
+        parse_rule("")
+
+
+def test_no_rules():
+    assert compile_rules([]) is None
+    assert UrlRules().matches("https://ex.com/anything")
+
+
+def test_prefixes():
+    rules = UrlRules(["https://ex.com/docs/", "https://ex.com/api/"])
+    assert rules.matches("https://ex.com/docs/intro")
+    assert rules.matches("https://ex.com/api/v1")
+    assert not rules.matches("https://ex.com/blog/")
+
+
+def test_many_prefixes_use_the_trie():
+    prefixes = [f"https://ex.com/s{i}/" for i in range(40)]
+    rules = UrlRules(prefixes)
+    assert rules.matches("https://ex.com/s39/page")
+    assert not rules.matches("https://ex.com/s40/page")
+
+
+def test_mixed_rules_and_excludes():
+    rules = UrlRules(
+        ["https://ex.com/docs/", "glob:*/api/*", "re:(?i)/guide/"],
+        ["glob:*/print/*", "re:\\.pdf$"],
+    )
+    assert rules.matches("https://ex.com/docs/intro")
+    assert rules.matches("https://other.com/v1/api/users")
+    assert rules.matches("https://ex.com/GUIDE/start")
+    assert not rules.matches("https://ex.com/docs/print/intro")
+    assert not rules.matches("https://ex.com/docs/manual.pdf")
+    assert not rules.matches("https://ex.com/blog/")
+
+
+def test_regexes_with_the_same_group_name():
+    rules = UrlRules([r"re:/docs/(?P<v>\d+)/", r"re:/api/(?P<v>\d+)/"])
+    assert rules.matches("https://ex.com/docs/3/")
+    assert rules.matches("https://ex.com/api/3/")
+    assert not rules.matches("https://ex.com/blog/3/")
+
+
+def test_backreferences_refer_to_their_own_rule():
+    rules = UrlRules(["re:(a)x", r"re:(b)\1", "https://ex.com/docs/"])
+    assert rules.matches("http://x/bb")
+    assert rules.matches("http://x/ax")
+    assert rules.matches("https://ex.com/docs/")
+    assert not rules.matches("http://x/ab")
+
+
+@pytest.mark.parametrize("rule", ["re:(", "re:[a-", r"re:(?P<v>a)(?P<v>b)"])
+def test_invalid_regex_raises_value_error(rule):
+    with pytest.raises(ValueError):
+        UrlRules([rule])
@@ -0,0 +1,109 @@
+"""
+Tests for the compact URL stores
+"""
+
+import pytest
+
+from src.tools.crawler import SublinkCrawler
+from src.tools.crawler.url_store import (
+    MIN_SLOTS,
+    URL_STORE_BLOOM,
+    URL_STORE_COMPACT,
+    BloomFilter,
+    CompactUrlSet,
+    FingerprintSet,
+    create_url_stores,
+    url_fingerprint,
+)
+
+URLS = [f"https://example.com/page/{i}" for i in range(5000)]
+
+
+def test_url_fingerprint():
+    assert url_fingerprint("https://example.com/") == url_fingerprint(
+        "https://example.com/"
+    )
+    assert url_fingerprint("https://example.com/a") != url_fingerprint(
+        "https://example.com/b"
+    )
+    assert url_fingerprint("https://example.com/\ud800") > 1
+
+
+def test_fingerprint_set_matches_a_set():
+    store = FingerprintSet()
+    assert all(store.add(url) for url in URLS)
+    assert not store.add(URLS[0])
+    assert len(store) == len(URLS)
+    assert all(url in store for url in URLS)
+    assert "https://example.com/other" not in store
+    assert store.nbytes() > MIN_SLOTS * 8
+
+
+def test_fingerprint_set_discard_and_reuse():
+    store = FingerprintSet()
+    for url in URLS:
+        store.add(url)
+    for url in URLS[::2]:
+        store.discard(url)
+    store.discard("https://example.com/never-added")
+    assert len(store) == len(URLS) // 2
+    assert all((url in store) == (i % 2 == 1) for i, url in enumerate(URLS))
+
+    # Re-adding after many deletions rehashes without losing live entries
+    for _ in range(3):
+        for url in URLS[::2]:
+            assert store.add(url)
+        for url in URLS[::2]:
+            store.discard(url)
+    assert len(store) == len(URLS) // 2
+    assert all(url in store for url in URLS[1::2])
+
+    store.clear()
+    assert len(store) == 0
+    assert URLS[1] not in store
+
+
+def test_fingerprint_set_capacity():
+    assert FingerprintSet(100_000).nbytes() >= 100_000 * 8
+
+
+def test_compact_url_set_keeps_insertion_order():
+    urls = CompactUrlSet(["https://a/", "https://b/", "https://a/"])
+    assert urls.add("https://c/")
+    assert not urls.add("https://b/")
+    assert list(urls) == ["https://a/", "https://b/", "https://c/"]
+    assert len(urls) == 3
+    assert "https://b/" in urls
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=len(URLS), error_rate=0.01)
+    for url in URLS:
+        bloom.add(url)
+    assert all(url in bloom for url in URLS)
+    false_positives = sum(
+        f"https://example.com/other/{i}" in bloom for i in range(10000)
+    )
+    assert false_positives < 300
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=1)
+
+
+def test_create_url_stores():
+    seen, visited, found = create_url_stores(URL_STORE_BLOOM, bloom_capacity=10)
+    assert isinstance(seen, BloomFilter)
+    assert isinstance(visited, FingerprintSet)
+    assert isinstance(found, CompactUrlSet)
+    assert isinstance(create_url_stores(keep_found=False)[2], FingerprintSet)
+    with pytest.raises(ValueError):
+        create_url_stores("disk")
+
+
+@pytest.mark.parametrize("url_store", [URL_STORE_COMPACT, URL_STORE_BLOOM])
+def test_crawl_with_compact_stores(site, crawl_options, full_crawl, url_store):
+    links = SublinkCrawler().crawl(
+        f"{site[1]}/p/0", url_store=url_store, **crawl_options
+    )
+    assert set(links) == set(full_crawl)
@@ -0,0 +1,86 @@
+"""
+Tests for URL canonicalization and link resolution
+"""
+
+import pytest
+
+from src.utils.url_utils import canonicalize_url, remove_dot_segments, resolve_link
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("HTTP://Example.COM/Path", "http://example.com/Path"),
+        ("https://example.com:443/a", "https://example.com/a"),
+        ("http://example.com:80/a", "http://example.com/a"),
+        ("https://example.com:8443/a", "https://example.com:8443/a"),
+        ("http://example.com:443/a", "http://example.com:443/a"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com/a#section", "https://example.com/a"),
+        ("https://example.com/a/./b/../c", "https://example.com/a/c"),
+        ("https://example.com/../a", "https://example.com/a"),
+        ("https://example.com/a/..", "https://example.com/"),
+        ("https://example.com/a%2fb?q=%7e", "https://example.com/a%2Fb?q=%7E"),
+        ("https://example.com/?b=2&a=1&&c=3", "https://example.com/?a=1&b=2&c=3"),
+        ("https://User@Example.com/", "https://User@example.com/"),
+        ("http://[::1]:80/a", "http://[::1]/a"),
+        ("http://[::1]:8080/a", "http://[::1]:8080/a"),
+        ("  https://example.com/a  ", "https://example.com/a"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_tracking_params_are_stripped():
+    url = "https://example.com/a?utm_source=x&id=3&UTM_Medium=y&fbclid=z"
+    assert canonicalize_url(url) == "https://example.com/a?id=3"
+    assert canonicalize_url("https://example.com/a?utm_source=x") == (
+        "https://example.com/a"
+    )
+    assert canonicalize_url(url, strip_params=frozenset()) == (
+        "https://example.com/a?UTM_Medium=y&fbclid=z&id=3&utm_source=x"
+    )
+    assert canonicalize_url(url, strip_params=frozenset({"id"})) == (
+        "https://example.com/a?UTM_Medium=y&fbclid=z&utm_source=x"
+    )
+
+
+def test_canonicalize_url_is_idempotent():
+    url = canonicalize_url("HTTPS://Ex.com:443/a/../b%2f?z=1&a=%7e#top")
+    assert canonicalize_url(url) == url
+
+
+def test_remove_dot_segments():
+    assert remove_dot_segments("/a/b/c/./../../g") == "/a/g"
+    assert remove_dot_segments("/a/b/.") == "/a/b/"
+    assert remove_dot_segments("/..") == "/"
+    assert remove_dot_segments("/a.b/c") == "/a.b/c"
+
+
+def test_resolve_link():
+    base = "https://example.com/docs/guide/intro?x=1"
+    assert resolve_link(base, "next") == "https://example.com/docs/guide/next"
+    assert resolve_link(base, "../api") == "https://example.com/docs/api"
+    assert resolve_link(base, "/about#team") == "https://example.com/about"
+    assert resolve_link(base, "//cdn.example.com/a") == "https://cdn.example.com/a"
+    assert resolve_link(base, "HTTP://Other.com") == "http://other.com/"
+    assert resolve_link(base, "?page=2") == (
+        "https://example.com/docs/guide/intro?page=2"
+    )
+    assert resolve_link(base, " ") is None
+    assert resolve_link(base, "mailto:me@example.com") is None
+
+
+def test_resolve_link_without_canonicalizing():
+    base = "https://example.com/docs/"
+    assert resolve_link(base, "A?b=2&a=1#x", canonical=False) == (
+        "https://example.com/docs/A?b=2&a=1"
+    )
+
+
+def test_root_relative_links_share_cache_entries():
+    first = resolve_link("https://example.com/a/b", "/c")
+    second = resolve_link("https://example.com/x/y?z", "/c")
+    assert first == second == "https://example.com/c"
+    assert resolve_link("https://other.com/a", "/c") == "https://other.com/c"